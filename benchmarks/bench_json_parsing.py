@@ -0,0 +1,107 @@
+"""
+Micro-benchmark metadata_dashboard.json parsing backends and modes.
+
+Usage:
+    python benchmarks/bench_json_parsing.py [--sizes 1K,10K,100K,1M,10M]
+
+For each synthetic dashboard size, every installed backend is timed in full
+mode (decode everything) and lazy mode (decode only the fields the scripts
+use), reporting the median parse time and the peak Python memory per parse.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from metadata_parser import METADATA_FIELDS, available_backends, parse_metadata
+
+
+UNITS = {"K": 1024, "M": 1024 ** 2}
+
+
+def parse_size(text):
+    text = text.strip().upper()
+    if text[-1] in UNITS:
+        return int(float(text[:-1]) * UNITS[text[-1]])
+    return int(text)
+
+
+def make_dashboard(target_bytes):
+    """Build a dashboard JSON document of roughly target_bytes.
+
+    The padding (per-token records) sits between the leading fields and the
+    description, so a lazy parser has to skip over it.
+    """
+    document = {
+        "project_name": "Synthetic Project",
+        "contract_address": "0x" + "ab" * 20,
+        "total_supply": 10000,
+        "tokens": [],
+        "description": "A synthetic collection used for parser benchmarks. " * 8,
+        "official_url": "https://example.com",
+        "opensea_url": "https://opensea.io/collection/synthetic",
+    }
+    base = len(json.dumps(document))
+    token = {"token_id": 0, "name": "Token #0", "attributes": [{"trait_type": "Fur", "value": "Golden"}]}
+    per_token = len(json.dumps(token)) + 2
+    document["tokens"] = [
+        {**token, "token_id": i, "name": f"Token #{i}"}
+        for i in range(max(0, (target_bytes - base) // per_token))
+    ]
+    return json.dumps(document).encode('utf-8')
+
+
+def measure(data, backend, lazy, min_time=0.2, max_runs=200):
+    """Return (median seconds, peak bytes) for parsing data."""
+    fields = METADATA_FIELDS if lazy else None
+    tracemalloc.start()
+    parse_metadata(data, fields, backend, lazy)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while len(timings) < 3 or (time.perf_counter() < deadline and len(timings) < max_runs):
+        start = time.perf_counter()
+        parse_metadata(data, fields, backend, lazy)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), peak
+
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024:
+            return f"{n:,.0f} {unit}"
+        n /= 1024
+    return f"{n:,.1f} TB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1K,10K,100K,1M,10M")
+    args = parser.parse_args()
+    
+    print(f"{'='*72}")
+    print(f"JSON PARSING BENCHMARK (backends: {', '.join(available_backends())})")
+    print(f"{'='*72}")
+    print(f"{'size':>8s}  {'backend':10s} {'mode':5s} {'median':>12s} {'peak memory':>14s}")
+    print("-" * 72)
+    
+    for size_text in args.sizes.split(","):
+        data = make_dashboard(parse_size(size_text))
+        for backend in available_backends():
+            for lazy in (False, True):
+                seconds, peak = measure(data, backend, lazy)
+                print(f"{format_bytes(len(data)):>8s}  {backend:10s} {'lazy' if lazy else 'full':5s} "
+                      f"{seconds * 1e6:10,.1f} µs {format_bytes(peak):>14s}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
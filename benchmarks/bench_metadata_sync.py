@@ -0,0 +1,113 @@
+"""
+Benchmark the metadata-only mirror against the per-file download loop.
+
+Usage:
+    python benchmarks/bench_metadata_sync.py [--projects 300] [--latency 0.05] [--image-kb 64]
+
+A synthetic NFT1000 tree, where every project also has an images/ directory,
+is served by the fake hub with simulated round-trip latency. The benchmark
+times, on that tree:
+
+- the per-file loop: download_metadata() for one project after another into
+  a fresh Hugging Face cache (what fetch_descriptions_for_coding.py does
+  with --workers 1)
+- a cold sync_metadata() into an empty mirror
+- a warm sync of the same revision (the no-change case)
+- extract_nft_descriptions.py's extraction run offline on the mirror
+
+and reports the requests and bytes each one asked the hub for; no image
+bytes should ever be sent.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fake_hf_server import FakeHubServer
+from synthetic_nftnet import generate
+
+
+DEFAULT_PROJECTS = 300
+DEFAULT_LATENCY = 0.05
+DEFAULT_IMAGES = 3
+DEFAULT_IMAGE_KB = 64
+
+
+def add_images(root, projects, count, size_kb):
+    """Give every project an images/ directory of dummy files; return their total bytes."""
+    data = b"\0" * (size_kb * 1024)
+    for project in projects:
+        image_dir = Path(root) / "NFT1000" / project / "images"
+        image_dir.mkdir(exist_ok=True)
+        for i in range(count):
+            (image_dir / f"{i}.png").write_bytes(data)
+    return len(projects) * count * len(data)
+
+
+def measure(server, func, *args):
+    """Run func(*args) quietly; return (seconds, requests, bytes sent, result)."""
+    requests, sent = server.request_count, server.bytes_sent
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func(*args)
+    return time.perf_counter() - start, server.request_count - requests, server.bytes_sent - sent, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--projects", type=int, default=DEFAULT_PROJECTS)
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="simulated seconds per request")
+    parser.add_argument("--images", type=int, default=DEFAULT_IMAGES, help="dummy images per project")
+    parser.add_argument("--image-kb", type=int, default=DEFAULT_IMAGE_KB, help="size of each dummy image")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="nft_sync_bench_"))
+    mirror_dir = work_dir / "mirror"
+    projects = generate(work_dir / "repo", args.projects)
+    image_bytes = add_images(work_dir / "repo", projects, args.images, args.image_kb)
+
+    try:
+        with FakeHubServer(work_dir / "repo", latency=args.latency) as server:
+            # huggingface_hub reads these when it is first imported
+            os.environ["HF_ENDPOINT"] = server.endpoint
+            os.environ["HF_HUB_CACHE"] = str(work_dir / "hf_cache")
+            os.environ["HF_HUB_DISABLE_PROGRESS_BARS"] = "1"
+            from extract_nft_descriptions import extract_project_descriptions
+            from fetch_descriptions_for_coding import download_metadata
+            from metadata_sync import sync_metadata
+
+            loop = measure(server, lambda: [download_metadata(project) for project in projects])
+            cold = measure(server, sync_metadata, mirror_dir)
+            warm = measure(server, sync_metadata, mirror_dir)
+            offline = measure(server, extract_project_descriptions, str(mirror_dir),
+                              str(work_dir / "descriptions.json"))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    assert cold[3].downloaded == args.projects, "the cold sync did not mirror every project"
+    assert warm[3].downloaded == 0 and warm[1] == 1, "the warm sync did more than resolve the revision"
+    assert len(offline[3]) == args.projects, "the mirror is missing projects"
+
+    print(f"{'='*72}")
+    print(f"METADATA SYNC BENCHMARK: {args.projects} projects, {args.latency * 1000:.0f} ms latency, "
+          f"{image_bytes / 1e6:.0f} MB of images in the repo")
+    print(f"{'='*72}")
+    print(f"{'':28s} {'seconds':>9s} {'requests':>10s} {'bytes':>14s}")
+    print("-" * 72)
+    for name, (seconds, requests, sent, _) in (("Per-file loop", loop), ("Cold sync", cold),
+                                               ("Warm sync (no change)", warm), ("Offline extract", offline)):
+        print(f"{name:28s} {seconds:9.2f} {requests:10d} {sent:14,d}")
+    print(f"\nCold sync vs loop: {loop[0] / cold[0]:.1f}x faster, {cold[1]} vs {loop[1]} requests")
+    print(f"✓ No image bytes requested ({max(loop[2], cold[2]):,} bytes at most vs {image_bytes:,} in images/)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Run a sharded collection on one machine and check it against a single run.
+
+Usage:
+    python benchmarks/bench_sharding.py [--projects 400] [--shards 4] [--latency 0.05]
+
+A synthetic NFT1000 tree (two categories) is served by the fake hub. The
+benchmark runs fetch_descriptions_for_coding.py once as a single node, then
+--shards processes with --shard i/N at the same time plus `sharding.py
+merge`, each as its own interpreter like separate machines would. The merged
+student file, instructor key and statistics must be byte-identical to the
+single run's (the code registry is copied over, as it would be to the
+merging machine).
+"""
+
+import argparse
+import filecmp
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from fake_hf_server import FakeHubServer
+from project_lists import save_project_lists
+from synthetic_nftnet import generate
+
+
+DEFAULT_PROJECTS = 400
+DEFAULT_SHARDS = 4
+DEFAULT_LATENCY = 0.05
+COMPARED = ("student_descriptions.txt", "instructor_key.json", "collection_stats.json")
+
+
+def script_command(script, *args):
+    return [sys.executable, str(ROOT / script), *args]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--projects", type=int, default=DEFAULT_PROJECTS)
+    parser.add_argument("--shards", type=int, default=DEFAULT_SHARDS)
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="simulated seconds per request")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="nft_shard_bench_"))
+    names = generate(work_dir / "repo", args.projects)
+    lists_path = work_dir / "project_lists.json"
+    save_project_lists({"CATEGORY_A_ANIMAL_APE": names[0::2], "CATEGORY_B_FANTASY_ART": names[1::2]}, lists_path)
+    single_dir, sharded_dir = work_dir / "single", work_dir / "sharded"
+    single_dir.mkdir()
+    sharded_dir.mkdir()
+    common = ["--projects", str(lists_path), "--columnar", "none"]
+
+    try:
+        with FakeHubServer(work_dir / "repo", latency=args.latency) as server:
+            env = dict(os.environ, HF_ENDPOINT=server.endpoint, HF_HUB_DISABLE_PROGRESS_BARS="1")
+
+            start = time.perf_counter()
+            subprocess.run(script_command("fetch_descriptions_for_coding.py", *common,
+                                          "--cache-dir", str(work_dir / "cache_single")),
+                           cwd=single_dir, env=dict(env, HF_HUB_CACHE=str(work_dir / "hf_single")),
+                           capture_output=True, check=True)
+            single = time.perf_counter() - start
+
+            shutil.copy(single_dir / "code_registry.json", sharded_dir)
+            start = time.perf_counter()
+            shards = [
+                subprocess.Popen(script_command("fetch_descriptions_for_coding.py", *common, "--shard",
+                                                f"{index}/{args.shards}",
+                                                "--cache-dir", str(work_dir / "cache_sharded")),
+                                 cwd=sharded_dir, env=dict(env, HF_HUB_CACHE=str(work_dir / "hf_sharded")),
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+                for index in range(1, args.shards + 1)
+            ]
+            for index, process in enumerate(shards, 1):
+                _, stderr = process.communicate()
+                if process.returncode:
+                    raise RuntimeError(f"shard {index} failed:\n{stderr.decode()}")
+            fetched = time.perf_counter() - start
+            subprocess.run(script_command("sharding.py", "merge"), cwd=sharded_dir, capture_output=True, check=True)
+            merged = time.perf_counter() - start
+
+        identical = {name: filecmp.cmp(single_dir / name, sharded_dir / name, shallow=False) for name in COMPARED}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"{'='*60}")
+    print(f"SHARDING: {args.projects} projects, {args.shards} shards, {args.latency * 1000:.0f} ms latency")
+    print(f"{'='*60}")
+    print(f"Single node:              {single:7.2f} s")
+    print(f"{args.shards} shard processes:       {fetched:7.2f} s")
+    print(f"Shards + merge:           {merged:7.2f} s  ({single / merged:.1f}x)")
+    for name, same in identical.items():
+        print(f"{'✓' if same else '✗'} {name} {'identical' if same else 'DIFFERS'}")
+    if not all(identical.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
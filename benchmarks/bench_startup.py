@@ -0,0 +1,118 @@
+"""
+Startup-time check for the fetch entry points.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5] [--budget-ms 100]
+
+Each fetch script is started in a fresh interpreter, best of --repeat runs
+after one warm-up run (so bytecode and file system caches are warm):
+
+- import+parse: importing the script and parsing an empty command line,
+  timed inside the interpreter. This is what the script controls, and it
+  must stay under --budget-ms.
+- --help: the whole `python <script> --help` process, for reference; it
+  adds interpreter startup, which depends on the installed site-packages.
+
+A `-X importtime` run lists the slowest imports, and the check fails if any
+heavy dependency (HEAVY_MODULES) is imported before a backend needs it.
+Exits with status 1 on a failure.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS = ("fetch_descriptions_for_coding", "fetch_using_nfthub")
+HEAVY_MODULES = ("huggingface_hub", "utils.downloader", "pandas", "thefuzz", "numpy", "pyarrow",
+                 "rapidfuzz", "asyncio")
+DEFAULT_BUDGET_MS = 100.0
+DEFAULT_REPEAT = 5
+DEFAULT_TOP = 8
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+{module}.parse_args([])
+seconds = time.perf_counter() - start
+import json
+print(json.dumps({{"seconds": seconds, "modules": sorted(sys.modules)}}))
+"""
+
+
+def probe(module, importtime=False):
+    """Import module and parse its options in a new interpreter; return (result dict, stderr)."""
+    command = [sys.executable] + (["-X", "importtime"] if importtime else [])
+    command += ["-c", PROBE.format(module=module)]
+    completed = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1]), completed.stderr
+
+
+def time_help(module):
+    """Wall time of `python <module>.py --help`."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, f"{module}.py", "--help"], cwd=ROOT, capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+def slowest_imports(importtime_output, top=DEFAULT_TOP):
+    """[(self microseconds, module)] of the slowest imports in -X importtime output."""
+    imports = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        imports.append((int(self_us), name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help=f"runs per script; the best is kept (default {DEFAULT_REPEAT})")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"allowed import+parse time in milliseconds (default {DEFAULT_BUDGET_MS:.0f})")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP,
+                        help=f"slowest imports to list per script (default {DEFAULT_TOP})")
+    args = parser.parse_args()
+
+    rows, failures = [], []
+    for module in SCRIPTS:
+        probe(module)
+        startup = min(probe(module)[0]["seconds"] for _ in range(args.repeat))
+        help_time = min(time_help(module) for _ in range(args.repeat))
+        result, importtime_output = probe(module, importtime=True)
+        heavy = [name for name in HEAVY_MODULES if name in result["modules"]]
+        rows.append((module, startup, help_time, heavy, slowest_imports(importtime_output, args.top)))
+        if startup * 1000 > args.budget_ms:
+            failures.append(f"{module}.py takes {startup * 1000:.1f} ms to start (budget {args.budget_ms:.0f} ms)")
+        if heavy:
+            failures.append(f"{module}.py imports {', '.join(heavy)} at startup")
+
+    print(f"\n{'='*72}")
+    print(f"STARTUP (best of {args.repeat}, budget {args.budget_ms:.0f} ms for import+parse)")
+    print(f"{'='*72}")
+    print(f"{'script':36s} {'import+parse':>14s} {'--help':>12s}")
+    print("-" * 72)
+    for module, startup, help_time, heavy, _ in rows:
+        print(f"{module + '.py':36s} {startup * 1000:11.1f} ms {help_time * 1000:9.1f} ms")
+    for module, _, _, _, imports in rows:
+        print(f"\nSlowest imports of {module}.py (self time):")
+        for self_us, name in imports:
+            print(f"  {self_us / 1000:7.2f} ms  {name}")
+
+    if failures:
+        print()
+        for failure in failures:
+            print(f"✗ {failure}")
+        sys.exit(1)
+    print(f"\n✓ Both scripts start within {args.budget_ms:.0f} ms without loading {', '.join(HEAVY_MODULES)}")
+
+
+if __name__ == "__main__":
+    main()
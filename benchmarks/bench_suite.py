@@ -0,0 +1,225 @@
+"""
+End-to-end benchmark suite with a stored baseline.
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes 50,1000] [--repeat 3]
+    python benchmarks/bench_suite.py --sizes 50,1000,10000 --update-baseline
+
+For each corpus size a synthetic NFT1000 tree is generated (see
+synthetic_nftnet) and these stages are timed, best of --repeat runs:
+
+- extract: extract_project_descriptions over the local tree
+- fetch_hf: fetch_descriptions_for_coding.fetch_descriptions against the
+  local stand-in for the Hugging Face endpoint (cold download cache)
+- fetch_nfthub: fetch_using_nfthub.fetch_descriptions with a local
+  NFT1000.query() stand-in
+- student_file, instructor_key, metadata_log: the three output writers
+  over the fetched records
+
+Results are compared with benchmarks/baseline.json. Timings are scaled by a
+short pure-Python calibration loop so a baseline recorded on another machine
+stays meaningful; a case more than --tolerance slower than its baseline (and
+by more than --min-delta seconds) is a regression, and the suite exits with
+status 1.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fake_hf_server import FakeHubServer
+from synthetic_nftnet import DEFAULT_SEED, MAX_PROJECTS, MIN_PROJECTS, LocalNFT1000, generate
+
+
+DEFAULT_BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_SIZES = "50,1000"
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_MIN_DELTA = 0.02
+
+def calibrate(rounds=5):
+    """Best time of a fixed pure-Python workload (JSON round trips and string work)."""
+    document = {"description": "A collection of digital collectibles. " * 40, "total_supply": 10000}
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for i in range(3000):
+            text = json.dumps(dict(document, rank=i))
+            json.loads(text)
+            text.lower().split()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def best_of(repeat, func, setup=None):
+    """Run func() repeat times with stdout silenced; return (best seconds, last result)."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+    return best, result
+
+
+def run_size(size, work_dir, server, repeat, seed=DEFAULT_SEED):
+    """Time every case for one corpus size; return {case: seconds}."""
+    import fetch_descriptions_for_coding as hf_script
+    import fetch_using_nfthub as nfthub_script
+    from extract_nft_descriptions import extract_project_descriptions
+
+    root = work_dir / f"nftnet_{size}"
+    names = generate(root, size, seed)
+    server.root = root
+    out_dir = work_dir / f"out_{size}"
+    out_dir.mkdir()
+    hf_cache = Path(os.environ["HF_HUB_CACHE"])
+    timings = {}
+
+    timings["extract"], extracted = best_of(
+        repeat, lambda: extract_project_descriptions(root, out_dir / "extract.json"))
+    timings["fetch_hf"], hf_records = best_of(
+        repeat, lambda: hf_script.fetch_descriptions(names, "BENCHMARK"),
+        setup=lambda: shutil.rmtree(hf_cache, ignore_errors=True))
+    nft1000 = LocalNFT1000(root)
+    timings["fetch_nfthub"], hub_records = best_of(
+        repeat, lambda: nfthub_script.fetch_descriptions(nft1000, names, "BENCHMARK"))
+
+    expected = sorted(record["project_name"] for record in extracted if record["description"])
+    for label, records in (("fetch_hf", hf_records), ("fetch_nfthub", hub_records)):
+        if sorted(record["project_name"] for record in records) != expected:
+            raise AssertionError(f"{label} returned different projects than extract")
+
+    category_counts = {"BENCHMARK": len(hf_records)}
+    timings["student_file"], _ = best_of(
+        repeat, lambda: hf_script.create_student_file(hf_records, out_dir / "student.txt"))
+    timings["instructor_key"], _ = best_of(
+        repeat, lambda: hf_script.create_instructor_key(hf_records, out_dir / "key.json"))
+    timings["metadata_log"], _ = best_of(
+        repeat, lambda: hf_script.create_metadata_log(hf_records, category_counts, out_dir / "log.txt"))
+    return timings
+
+
+def load_baseline(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def compare(results, calibration, baseline, tolerance=DEFAULT_TOLERANCE, min_delta=DEFAULT_MIN_DELTA):
+    """
+    Compare timings with a baseline.
+
+    Returns:
+        list of (key, seconds, scaled baseline or None, ratio or None, regressed)
+    """
+    scale = calibration / baseline["calibration"] if baseline else 1.0
+    rows = []
+    for key, seconds in results.items():
+        reference = baseline["results"].get(key) if baseline else None
+        if reference is None:
+            rows.append((key, seconds, None, None, False))
+            continue
+        expected = reference * scale
+        regressed = seconds > expected * (1 + tolerance) and seconds - expected > min_delta
+        rows.append((key, seconds, expected, seconds / expected if expected else None, regressed))
+    return rows
+
+
+def parse_sizes(text):
+    sizes = [int(size) for size in text.split(",")]
+    for size in sizes:
+        if not MIN_PROJECTS <= size <= MAX_PROJECTS:
+            raise argparse.ArgumentTypeError(f"sizes must be between {MIN_PROJECTS} and {MAX_PROJECTS}")
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=parse_sizes, default=parse_sizes(DEFAULT_SIZES),
+                        help=f"comma-separated project counts (default {DEFAULT_SIZES})")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help=f"runs per case; the best is kept (default {DEFAULT_REPEAT})")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="simulated seconds per request to the fake hub (default 0)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH,
+                        help="baseline file (default benchmarks/baseline.json)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"allowed fractional slowdown before failing (default {DEFAULT_TOLERANCE})")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA,
+                        help=f"ignore slowdowns smaller than this many seconds (default {DEFAULT_MIN_DELTA})")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store these results as the new baseline instead of comparing")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="nft_suite_"))
+    results = {}
+    try:
+        with FakeHubServer(work_dir, latency=args.latency) as server:
+            # huggingface_hub reads these when it is first imported
+            os.environ["HF_ENDPOINT"] = server.endpoint
+            os.environ["HF_HUB_CACHE"] = str(work_dir / "hf_cache")
+            os.environ["HF_HUB_DISABLE_PROGRESS_BARS"] = "1"
+            for size in args.sizes:
+                print(f"Running {size} projects...", flush=True)
+                for case, seconds in run_size(size, work_dir, server, args.repeat).items():
+                    results[f"{case}/{size}"] = seconds
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    calibration = calibrate()
+
+    if args.update_baseline:
+        baseline = {
+            "created": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "calibration": round(calibration, 6),
+            "results": {key: round(seconds, 6) for key, seconds in results.items()},
+        }
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+
+    baseline = None if args.update_baseline else load_baseline(args.baseline)
+    rows = compare(results, calibration, baseline, args.tolerance, args.min_delta)
+
+    print(f"\n{'='*72}")
+    print(f"BENCHMARK SUITE (repeat {args.repeat}, calibration {calibration * 1000:.1f} ms)")
+    print(f"{'='*72}")
+    print(f"{'case':28s} {'seconds':>10s} {'baseline':>10s} {'ratio':>8s}")
+    print("-" * 72)
+    for key, seconds, expected, ratio, regressed in rows:
+        reference = f"{expected:10.3f}" if expected is not None else f"{'-':>10s}"
+        change = f"{ratio:7.2f}x" if ratio is not None else f"{'-':>8s}"
+        print(f"{key:28s} {seconds:10.3f} {reference} {change}{'  ✗ REGRESSION' if regressed else ''}")
+
+    regressions = [row for row in rows if row[4]]
+    if args.update_baseline:
+        print(f"\n✓ Baseline saved to: {args.baseline}")
+    elif baseline is None:
+        print(f"\n⚠️  No baseline at {args.baseline} (record one with --update-baseline)")
+    elif regressions:
+        print(f"\n✗ {len(regressions)} case(s) slower than baseline by more than {args.tolerance:.0%}")
+        sys.exit(1)
+    else:
+        print(f"\n✓ No regressions against baseline ({args.tolerance:.0%} tolerance)")
+
+
+if __name__ == "__main__":
+    main()
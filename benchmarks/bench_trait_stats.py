@@ -0,0 +1,126 @@
+"""
+Benchmark the trait aggregation engine on synthetic metadata/ directories.
+
+Usage:
+    python benchmarks/bench_trait_stats.py [--projects 50] [--tokens 2000] [--workers N]
+
+A synthetic NFT1000 tree is given a metadata/ directory per project with one
+token JSON file per token (random traits with skewed value frequencies). The
+benchmark times:
+
+- a plain loop that parses every file with json in one process
+- a cold TraitAggregator.update() that builds trait_stats.bin in a process pool
+- the summary query of a repeat run, answered from the memory-mapped store
+- an update after one project changed, which rescans just that project
+
+and checks that the store's tables match the plain loop's counts.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from synthetic_nftnet import generate
+from trait_stats import TraitAggregator, read_store, token_traits
+
+
+DEFAULT_PROJECTS = 50
+DEFAULT_TOKENS = 2000
+TRAITS = ("Background", "Fur", "Eyes", "Mouth", "Hat", "Clothes", "Earring")
+
+
+def add_token_metadata(root, projects, tokens, seed=1):
+    """Write metadata/<token id> for every project; return the number of files."""
+    rng = random.Random(seed)
+    for project in projects:
+        metadata_dir = Path(root) / "NFT1000" / project / "metadata"
+        metadata_dir.mkdir()
+        values = {trait: [f"{trait} {i}" for i in range(rng.randint(4, 40))] for trait in TRAITS}
+        weights = {trait: [1 / (i + 1) for i in range(len(names))] for trait, names in values.items()}
+        for token_id in range(tokens):
+            attributes = [{"trait_type": trait, "value": rng.choices(values[trait], weights[trait])[0]}
+                          for trait in TRAITS if trait in ("Background", "Fur", "Eyes") or rng.random() < 0.7]
+            (metadata_dir / str(token_id)).write_text(json.dumps(
+                {"name": f"{project} #{token_id}", "token_id": token_id, "attributes": attributes}))
+    return len(projects) * tokens
+
+
+def plain_counts(root, projects):
+    """{project: Counter of (trait, value)} parsed one file after another."""
+    counts = {}
+    for project in projects:
+        metadata_dir = Path(root) / "NFT1000" / project / "metadata"
+        counts[project] = Counter()
+        for path in sorted(metadata_dir.iterdir()):
+            counts[project].update(token_traits(json.loads(path.read_bytes())).items())
+    return counts
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--projects", type=int, default=DEFAULT_PROJECTS)
+    parser.add_argument("--tokens", type=int, default=DEFAULT_TOKENS, help="token files per project")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="nft_trait_bench_"))
+    store_path = str(work_dir / "trait_stats.bin")
+    try:
+        projects = generate(work_dir, args.projects)
+        files = add_token_metadata(work_dir, projects, args.tokens)
+
+        plain = timed(plain_counts, work_dir, projects)
+        cold = timed(TraitAggregator(work_dir, store_path, args.workers).update, projects)
+        repeat_aggregator = TraitAggregator(work_dir, store_path, args.workers)
+        repeat = timed(repeat_aggregator.summary, projects)
+
+        changed = Path(work_dir) / "NFT1000" / projects[0] / "metadata" / str(args.tokens)
+        changed.write_text(json.dumps({"attributes": [{"trait_type": "Fur", "value": "One of One"}]}))
+        os.utime(changed.parent, ns=(time.time_ns() + 10**9,) * 2)
+        incremental_aggregator = TraitAggregator(work_dir, store_path, args.workers)
+        incremental = timed(incremental_aggregator.update, projects)
+
+        store = read_store(store_path)
+        plain[1][projects[0]][("Fur", "One of One")] += 1
+        matches = all(
+            Counter({(trait, value): count for trait, value, count, _ in store.table(project)}) == plain[1][project]
+            for project in projects
+        )
+        store_bytes = os.path.getsize(store_path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    assert repeat_aggregator.scanned == 0, "the repeat query rescanned projects"
+    assert incremental_aggregator.scanned == 1, "the update rescanned more than the changed project"
+
+    print(f"{'='*72}")
+    print(f"TRAIT STATISTICS: {args.projects} projects, {files:,} token files, "
+          f"{repeat_aggregator.max_workers} worker processes")
+    print(f"{'='*72}")
+    print(f"Plain json loop:            {plain[0]:8.3f} s")
+    print(f"Cold scan into the store:   {cold[0]:8.3f} s  ({plain[0] / cold[0]:.1f}x)")
+    print(f"Repeat summary query:       {repeat[0] * 1000:8.1f} ms")
+    print(f"One project changed:        {incremental[0]:8.3f} s")
+    print(f"Store size:                 {store_bytes:8,d} bytes")
+    print(f"{'✓' if matches else '✗'} Store tables {'match' if matches else 'DIFFER FROM'} the plain counts")
+    if not matches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Local stand-in for the Hugging Face file endpoint, used by the benchmarks.
+
+Serves a directory laid out like the shuxunoo/NFT-Net dataset repository
+(NFT1000/<project>/metadata_dashboard.json) over HTTP, answering the same
+resolve URLs that hf_hub_download requests, the dataset info API used to
+resolve a branch name to a commit hash, the batched paths-info API and the
+tree listing API. An optional per-request delay simulates network round-trip
+latency so speedups can be measured offline; request_count and bytes_sent
+tell how much a run asked for.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote
+
+
+FAKE_COMMIT = "0123456789abcdef0123456789abcdef01234567"
+
+RESOLVE_PATTERN = re.compile(r"^/datasets/([^/]+/[^/]+)/resolve/([^/]+)/(.+)$")
+INFO_PATTERN = re.compile(r"^/api/datasets/([^/]+/[^/]+)(?:/revision/([^/]+))?$")
+PATHS_INFO_PATTERN = re.compile(r"^/api/datasets/([^/]+/[^/]+)/paths-info/([^/]+)$")
+TREE_PATTERN = re.compile(r"^/api/datasets/([^/]+/[^/]+)/tree/([^/]+)(?:/(.+))?$")
+
+
+def git_blob_id(data):
+    """Git blob hash of file contents, which the Hub reports as a file's oid."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def write_fixture(root, projects, description_chars=3000):
+    """Write a minimal NFT1000 tree with one metadata_dashboard.json per project."""
+    root = Path(root)
+    for i, project in enumerate(projects):
+        project_dir = root / "NFT1000" / project
+        project_dir.mkdir(parents=True, exist_ok=True)
+        metadata = {
+            "project_name": project,
+            "contract_address": f"0x{i:040x}",
+            "total_supply": 10000,
+            "description": (f"{project} is a collection of digital collectibles. " * 100)[:description_chars],
+            "official_url": f"https://example.com/{i}",
+            "opensea_url": f"https://opensea.io/collection/{i}",
+        }
+        with open(project_dir / "metadata_dashboard.json", 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2)
+    return root
+
+
+class FakeHubHandler(BaseHTTPRequestHandler):
+    """Answer HEAD/GET on resolve URLs, GET dataset info and tree listings, POST paths-info."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        match = INFO_PATTERN.match(path)
+        tree_match = TREE_PATTERN.match(path)
+        if match:
+            self._serve_info(match.group(1))
+        elif tree_match:
+            recursive = parse_qs(query).get("recursive", ["False"])[0].lower() == "true"
+            self._serve_tree(unquote(tree_match.group(3) or ""), recursive)
+        else:
+            self._serve(send_body=True)
+
+    def do_POST(self):
+        self._count_request()
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+        if not PATHS_INFO_PATTERN.match(self.path.split("?")[0]):
+            self._send_json([], status=404)
+            return
+        
+        infos = []
+        for path in parse_qs(body).get("paths", []):
+            file_path = self.server.root / path
+            if file_path.is_file():
+                data = file_path.read_bytes()
+                infos.append({"type": "file", "path": path, "size": len(data), "oid": git_blob_id(data)})
+        self._send_json(infos)
+
+    def _send_json(self, payload, status=200):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        self._count_bytes(len(data))
+
+    def _count_request(self):
+        with self.server.lock:
+            self.server.request_count += 1
+        time.sleep(self.server.latency)
+
+    def _count_bytes(self, n):
+        with self.server.lock:
+            self.server.bytes_sent += n
+
+    def _serve_info(self, repo_id):
+        self._count_request()
+        root = self.server.root
+        siblings = [
+            {"rfilename": path.relative_to(root).as_posix(), "size": path.stat().st_size}
+            for path in sorted(root.rglob("*")) if path.is_file()
+        ]
+        self._send_json({"id": repo_id, "sha": FAKE_COMMIT, "siblings": siblings})
+
+    def _serve_tree(self, path_in_repo, recursive):
+        self._count_request()
+        root = self.server.root
+        directory = root / path_in_repo
+        if not directory.is_dir():
+            self._send_json({"error": "not found"}, status=404)
+            return
+        entries = []
+        for path in sorted(directory.rglob("*") if recursive else directory.iterdir()):
+            relative = path.relative_to(root).as_posix()
+            if path.is_dir():
+                entries.append({"type": "directory", "path": relative,
+                                "oid": hashlib.sha1(relative.encode()).hexdigest()})
+            else:
+                data = path.read_bytes()
+                entries.append({"type": "file", "path": relative, "size": len(data), "oid": git_blob_id(data)})
+        self._send_json(entries)
+
+    def _serve(self, send_body):
+        self._count_request()
+        match = RESOLVE_PATTERN.match(self.path.split("?")[0])
+        file_path = self.server.root / unquote(match.group(3)) if match else None
+        
+        if file_path is None or not file_path.is_file():
+            self.send_response(404)
+            self.send_header("X-Error-Code", "EntryNotFound")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        
+        data = file_path.read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", f'"{git_blob_id(data)}"')
+        self.send_header("X-Repo-Commit", FAKE_COMMIT)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(data)
+            self._count_bytes(len(data))
+
+
+class FakeHubServer:
+    """Run the fake endpoint on a background thread (use as a context manager)."""
+
+    def __init__(self, root, latency=0.0, host="127.0.0.1", port=0):
+        self.httpd = ThreadingHTTPServer((host, port), FakeHubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.root = Path(root)
+        self.httpd.latency = latency
+        self.httpd.request_count = 0
+        self.httpd.bytes_sent = 0
+        self.httpd.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def endpoint(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def root(self):
+        return self.httpd.root
+
+    @root.setter
+    def root(self, root):
+        """Serve another fixture tree from the same endpoint."""
+        self.httpd.root = Path(root)
+
+    @property
+    def request_count(self):
+        return self.httpd.request_count
+
+    @property
+    def bytes_sent(self):
+        return self.httpd.bytes_sent
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
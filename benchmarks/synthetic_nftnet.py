@@ -0,0 +1,169 @@
+"""
+Synthetic NFT-Net fixture generator for the benchmarks.
+
+Writes a tree laid out like the shuxunoo/NFT-Net dataset
+(NFT1000/<project>/metadata_dashboard.json) with any number of projects and
+realistic, variable-length descriptions. Output depends only on the project
+count and the seed, so every benchmark run sees byte-identical input.
+
+Descriptions are built from two themed vocabularies (animal/ape and
+fantasy/art, like the challenge's two categories) plus shared NFT filler,
+with lengths drawn from a log-normal distribution; a small share of projects
+has an empty description, as in the real dataset.
+
+LocalNFT1000 answers NFT-NET-Hub style query() calls from such a tree, so
+fetch_using_nfthub.py can be timed without the Hub.
+
+Usage:
+    python benchmarks/synthetic_nftnet.py /tmp/nftnet --projects 1000 [--seed 1]
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from metadata_parser import METADATA_FIELDS, load_metadata
+
+
+MIN_PROJECTS = 50
+MAX_PROJECTS = 10000
+DEFAULT_SEED = 1
+DEFAULT_MEDIAN_CHARS = 700
+DEFAULT_MAX_CHARS = 6000
+EMPTY_SHARE = 0.02
+
+THEMES = {
+    "animal": (
+        "ape apes primate jungle banana kong gorilla chimp monkey yacht club swamp "
+        "lion lions cat cats penguin penguins seal seals kennel dog fur tail wild "
+        "zoo habitat pack roar mutant serum"
+    ).split(),
+    "fantasy": (
+        "art artist artists anime painting canvas portrait fantasy realm spirit "
+        "dragon magic enchanted myth legend warrior samurai women illustration "
+        "hand-drawn generative colors story lore world dream"
+    ).split(),
+}
+FILLER = (
+    "the a of and to in collection nft nfts holders community unique digital "
+    "collectibles ethereum blockchain tokens exclusive access members utility "
+    "roadmap metaverse generated traits rare minted owners project each"
+).split()
+NAME_PARTS = (
+    "Bored Mutant Cool Lazy Pudgy Azuki Moon Crypto Doodle Cyber Alpha Rumble "
+    "Tubby Sappy Boss Clone Digi Imaginary Wild Golden Pixel Neon Lucky Royal"
+).split()
+NAME_SUFFIXES = "Apes Kongs Cats Lions Penguins Seals Birds Punks Women Ones Club Society Friends Spirits".split()
+
+
+def project_names(count, seed=DEFAULT_SEED):
+    """Deterministic, unique, NFT-style project names."""
+    rng = random.Random(seed)
+    names, seen = [], set()
+    while len(names) < count:
+        name = f"{rng.choice(NAME_PARTS)} {rng.choice(NAME_SUFFIXES)}"
+        if name in seen:
+            name = f"{name} {len(names)}"
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def make_description(rng, target_chars, theme):
+    """Sentences of themed words and filler, cut to about target_chars."""
+    vocabulary = THEMES[theme]
+    sentences, length = [], 0
+    while length < target_chars:
+        words = [rng.choice(vocabulary) if rng.random() < 0.4 else rng.choice(FILLER)
+                 for _ in range(rng.randint(8, 20))]
+        sentence = " ".join(words).capitalize() + "."
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)[:target_chars].rstrip()
+
+
+def description_length(rng, median_chars=DEFAULT_MEDIAN_CHARS, max_chars=DEFAULT_MAX_CHARS):
+    """Log-normal description length, clipped to [40, max_chars]."""
+    return int(min(max(rng.lognormvariate(math.log(median_chars), 0.8), 40), max_chars))
+
+
+def generate(root, count, seed=DEFAULT_SEED, median_chars=DEFAULT_MEDIAN_CHARS,
+             max_chars=DEFAULT_MAX_CHARS):
+    """
+    Write a synthetic NFT1000 tree under root.
+
+    Args:
+        root: Directory that will contain NFT1000/
+        count: Number of projects (MIN_PROJECTS to MAX_PROJECTS)
+        seed: Random seed; the same seed always writes the same files
+        median_chars: Median description length
+        max_chars: Longest description
+
+    Returns:
+        list of project names in rank order
+    """
+    if not MIN_PROJECTS <= count <= MAX_PROJECTS:
+        raise ValueError(f"Project count must be between {MIN_PROJECTS} and {MAX_PROJECTS}, got {count}")
+    root = Path(root)
+    rng = random.Random(seed)
+    names = project_names(count, seed)
+    for i, project in enumerate(names):
+        theme = "animal" if i % 2 == 0 else "fantasy"
+        if rng.random() < EMPTY_SHARE:
+            description = ""
+        else:
+            description = make_description(rng, description_length(rng, median_chars, max_chars), theme)
+        metadata = {
+            "project_name": project,
+            "contract_address": f"0x{rng.getrandbits(160):040x}",
+            "total_supply": rng.choice((1000, 3333, 5000, 8888, 10000)),
+            "description": description,
+            "official_url": f"https://example.com/{i}",
+            "opensea_url": f"https://opensea.io/collection/synthetic-{i}",
+        }
+        project_dir = root / "NFT1000" / project
+        project_dir.mkdir(parents=True, exist_ok=True)
+        with open(project_dir / "metadata_dashboard.json", 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2)
+    return names
+
+
+class LocalNFT1000:
+    """Answer NFT-NET-Hub NFT1000.query() calls from a local NFT1000 tree."""
+
+    def __init__(self, root):
+        self.nft1000_path = Path(root) / "NFT1000"
+
+    def get_NFT_name_list(self):
+        return sorted(path.name for path in self.nft1000_path.iterdir() if path.is_dir())
+
+    def query(self, name):
+        path = self.nft1000_path / name / "metadata_dashboard.json"
+        if not path.is_file():
+            raise ValueError(f"{name} not found in NFT1000")
+        return load_metadata(path, METADATA_FIELDS, lazy=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("root", help="directory to write NFT1000/ into")
+    parser.add_argument("--projects", type=int, default=1000,
+                        help=f"number of projects ({MIN_PROJECTS}-{MAX_PROJECTS}, default 1000)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--median-chars", type=int, default=DEFAULT_MEDIAN_CHARS)
+    parser.add_argument("--max-chars", type=int, default=DEFAULT_MAX_CHARS)
+    args = parser.parse_args()
+    if not MIN_PROJECTS <= args.projects <= MAX_PROJECTS:
+        parser.error(f"--projects must be between {MIN_PROJECTS} and {MAX_PROJECTS}")
+
+    names = generate(args.root, args.projects, args.seed, args.median_chars, args.max_chars)
+    print(f"✓ Wrote {len(names)} projects to {Path(args.root) / 'NFT1000'}")
+
+
+if __name__ == "__main__":
+    main()
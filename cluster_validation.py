@@ -0,0 +1,374 @@
+"""
+Check that the collected descriptions really form the intended clusters.
+
+The challenge only works if students can find two distinct clusters in the
+descriptions. This module checks that before a session: descriptions are
+vectorized as a sparse TF-IDF matrix, clustered with spherical k-means and
+average-linkage agglomerative clustering (both on cosine similarity), and the
+clusters are scored against the ``category`` of each record:
+
+- purity: share of descriptions in their cluster's majority category
+- silhouette: how much closer descriptions are to their own cluster than to
+  the nearest other one (-1 to 1)
+- adjusted Rand index (ARI): agreement with the categories, corrected for
+  chance (0 = random, 1 = identical)
+
+Everything is plain NumPy; the TF-IDF matrix is kept in CSR form, and only
+the n x n similarity matrix needed for the silhouette and agglomerative
+clustering is dense (it is built from a few hundred densified rows at a
+time, never the whole n x V matrix). All 1,001 NFT1000 descriptions take a
+few seconds.
+
+Usage:
+    python cluster_validation.py [instructor_key.json] [--k 2] [--json report.json]
+"""
+
+import argparse
+import json
+from array import array
+from collections import Counter
+
+import numpy as np
+
+from corpus_stats import tokenize
+
+
+DEFAULT_MIN_DF = 2
+DEFAULT_MAX_DF = 0.9
+DEFAULT_N_INIT = 10
+DEFAULT_MAX_ITER = 100
+DEFAULT_SEED = 0
+DEFAULT_BLOCK_ROWS = 256
+TOP_TERMS = 8
+
+ALGORITHMS = ("kmeans", "agglomerative")
+
+
+class TfidfMatrix:
+    """Row-normalized TF-IDF vectors in CSR form (indptr, indices, data)."""
+
+    def __init__(self, indptr, indices, data, vocabulary):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.vocabulary = vocabulary
+        self.shape = (len(indptr) - 1, len(vocabulary))
+        self.row_ids = np.repeat(np.arange(self.shape[0]), np.diff(indptr))
+
+    def dot(self, dense):
+        """Sparse x dense product: (n x V) @ (V x k) -> n x k."""
+        n = self.shape[0]
+        gathered = dense[self.indices]
+        return np.column_stack([
+            np.bincount(self.row_ids, weights=self.data * gathered[:, c], minlength=n)
+            for c in range(dense.shape[1])
+        ])
+
+    def dense_rows(self, start, stop):
+        """Rows start:stop as a dense (stop - start) x V array."""
+        dense = np.zeros((stop - start, self.shape[1]))
+        lo, hi = self.indptr[start], self.indptr[stop]
+        dense[self.row_ids[lo:hi] - start, self.indices[lo:hi]] = self.data[lo:hi]
+        return dense
+
+    def similarity(self, block_rows=DEFAULT_BLOCK_ROWS):
+        """Cosine similarity of every pair of rows (rows are L2-normalized).
+
+        Built one pair of row blocks at a time, so apart from the n x n
+        result only two block_rows x V slices are ever dense.
+        """
+        n = self.shape[0]
+        result = np.empty((n, n))
+        for start in range(0, n, block_rows):
+            stop = min(start + block_rows, n)
+            left = self.dense_rows(start, stop)
+            for other in range(start, n, block_rows):
+                other_stop = min(other + block_rows, n)
+                right = left if other == start else self.dense_rows(other, other_stop)
+                product = left @ right.T
+                result[start:stop, other:other_stop] = product
+                result[other:other_stop, start:stop] = product.T
+        return result
+
+
+def tfidf(texts, min_df=DEFAULT_MIN_DF, max_df=DEFAULT_MAX_DF):
+    """Build a TfidfMatrix with sublinear tf and smoothed idf.
+
+    Terms found in fewer than ``min_df`` documents or in more than
+    ``max_df`` (a fraction) of them are dropped.
+    """
+    term_ids = {}
+    indptr = array('q', [0])
+    indices = array('q')
+    counts = array('d')
+    for text in texts:
+        row = Counter(term_ids.setdefault(token, len(term_ids)) for token in tokenize(text))
+        indices.extend(row.keys())
+        counts.extend(row.values())
+        indptr.append(len(indices))
+
+    n = len(indptr) - 1
+    indptr = np.frombuffer(indptr, dtype=np.int64)
+    indices = np.frombuffer(indices, dtype=np.int64) if indices else np.zeros(0, np.int64)
+    counts = np.frombuffer(counts, dtype=np.float64) if counts else np.zeros(0)
+
+    df = np.bincount(indices, minlength=len(term_ids))
+    keep = (df >= min_df) & (df <= max_df * n)
+    new_ids = np.cumsum(keep) - 1
+    entry_mask = keep[indices]
+    row_ids = np.repeat(np.arange(n), np.diff(indptr))[entry_mask]
+
+    idf = np.log((1 + n) / (1 + df[keep])) + 1
+    indices = new_ids[indices[entry_mask]]
+    data = (1 + np.log(counts[entry_mask])) * idf[indices]
+
+    norms = np.sqrt(np.bincount(row_ids, weights=data ** 2, minlength=n))
+    data /= np.where(norms > 0, norms, 1)[row_ids]
+
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(row_ids, minlength=n))))
+    terms = sorted(term_ids, key=term_ids.get)
+    vocabulary = [term for term, kept in zip(terms, keep) if kept]
+    return TfidfMatrix(indptr, indices, data, vocabulary)
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1)
+
+
+def kmeans(matrix, k, n_init=DEFAULT_N_INIT, max_iter=DEFAULT_MAX_ITER, seed=DEFAULT_SEED):
+    """Spherical k-means (cosine) with k-means++ seeding.
+
+    Returns (labels, centroids) of the best of ``n_init`` runs.
+    """
+    n, vocab_size = matrix.shape
+    rng = np.random.default_rng(seed)
+    row_entries = [(matrix.indices[s:e], matrix.data[s:e])
+                   for s, e in zip(matrix.indptr[:-1], matrix.indptr[1:])]
+    best = None
+
+    for _ in range(n_init):
+        # k-means++: later seeds are drawn far (in cosine distance) from earlier ones
+        centroids = np.zeros((k, vocab_size))
+        closest = np.full(n, np.inf)
+        choice = rng.integers(n)
+        for c in range(k):
+            idx, values = row_entries[choice]
+            centroids[c, idx] = values
+            closest = np.minimum(closest, 1 - matrix.dot(centroids[c:c + 1].T)[:, 0])
+            weights = np.clip(closest, 0, None) ** 2
+            choice = rng.choice(n, p=weights / weights.sum()) if weights.sum() > 0 else rng.integers(n)
+
+        labels = None
+        for _ in range(max_iter):
+            similarities = matrix.dot(centroids.T)
+            new_labels = similarities.argmax(axis=1)
+            if labels is not None and np.array_equal(new_labels, labels):
+                break
+            labels = new_labels
+            centroids = np.zeros((k, vocab_size))
+            np.add.at(centroids, (labels[matrix.row_ids], matrix.indices), matrix.data)
+            centroids = _normalize_rows(centroids)
+
+        score = similarities[np.arange(n), labels].sum()
+        if best is None or score > best[0]:
+            best = (score, labels, centroids)
+    return best[1], best[2]
+
+
+def agglomerative(similarity, k):
+    """Average-linkage clustering on cosine distance, stopped at k clusters."""
+    n = len(similarity)
+    distance = 1 - similarity
+    np.fill_diagonal(distance, np.inf)
+    sizes = np.ones(n)
+    labels = np.arange(n)
+
+    for _ in range(n - k):
+        i, j = divmod(int(distance.argmin()), n)
+        if i > j:
+            i, j = j, i
+        # Lance-Williams update for average linkage
+        merged = (sizes[i] * distance[i] + sizes[j] * distance[j]) / (sizes[i] + sizes[j])
+        distance[i, :] = merged
+        distance[:, i] = merged
+        distance[i, i] = np.inf
+        distance[j, :] = np.inf
+        distance[:, j] = np.inf
+        sizes[i] += sizes[j]
+        labels[labels == j] = i
+
+    _, labels = np.unique(labels, return_inverse=True)
+    return labels
+
+
+def purity(labels, truth):
+    contingency = _contingency(labels, truth)
+    return float(contingency.max(axis=1).sum() / len(labels)) if len(labels) else 0.0
+
+
+def adjusted_rand_index(labels, truth):
+    contingency = _contingency(labels, truth)
+    n = len(labels)
+
+    def pairs(x):
+        return (x * (x - 1) / 2).sum()
+
+    index = pairs(contingency)
+    row_pairs, col_pairs = pairs(contingency.sum(axis=1)), pairs(contingency.sum(axis=0))
+    expected = row_pairs * col_pairs / (n * (n - 1) / 2) if n > 1 else 0.0
+    maximum = (row_pairs + col_pairs) / 2
+    if maximum == expected:
+        return 1.0
+    return float((index - expected) / (maximum - expected))
+
+
+def silhouette(similarity, labels):
+    """Mean silhouette coefficient using cosine distance."""
+    n = len(labels)
+    k = labels.max() + 1 if n else 0
+    if k < 2 or k >= n:
+        return 0.0
+    distance = 1 - similarity
+    np.fill_diagonal(distance, 0)
+    onehot = np.eye(k)[labels]
+    sums = distance @ onehot
+    sizes = onehot.sum(axis=0)
+
+    own = sizes[labels] - 1
+    a = np.where(own > 0, sums[np.arange(n), labels] / np.maximum(own, 1), 0)
+    others = sums / sizes
+    others[np.arange(n), labels] = np.inf
+    b = others.min(axis=1)
+    scores = np.where(own > 0, (b - a) / np.maximum(np.maximum(a, b), 1e-12), 0)
+    return float(scores.mean())
+
+
+def _contingency(labels, truth, k=None):
+    k, m = max(k or 0, labels.max() + 1), truth.max() + 1
+    return np.bincount(labels * m + truth, minlength=k * m).reshape(k, m).astype(np.float64)
+
+
+def validate(records, k=None, algorithms=ALGORITHMS, min_df=DEFAULT_MIN_DF, max_df=DEFAULT_MAX_DF,
+             seed=DEFAULT_SEED):
+    """
+    Cluster records and score the clusters against their categories.
+
+    Args:
+        records: dicts with 'description' and 'category' (e.g. the instructor key)
+        k: Number of clusters (default: number of categories)
+        algorithms: Any of "kmeans" and "agglomerative"
+        min_df, max_df: TF-IDF vocabulary pruning (see tfidf)
+        seed: Random seed for k-means
+
+    Returns:
+        dict with per-algorithm purity, silhouette, ARI, and cluster make-up
+    """
+    categories = sorted({record['category'] for record in records})
+    truth = np.array([categories.index(record['category']) for record in records], dtype=np.int64)
+    k = k or len(categories)
+    report = {"documents": len(records), "k": k, "categories": categories, "algorithms": {}}
+    if len(records) < max(k, 2):
+        return report
+
+    matrix = tfidf([record['description'] for record in records], min_df, max_df)
+    similarity = matrix.similarity()
+    report["vocabulary_size"] = matrix.shape[1]
+
+    for algorithm in algorithms:
+        top_terms = None
+        if algorithm == "kmeans":
+            labels, centroids = kmeans(matrix, k, seed=seed)
+            top_terms = [[matrix.vocabulary[t] for t in np.argsort(-row)[:TOP_TERMS] if row[t] > 0]
+                         for row in centroids]
+        elif algorithm == "agglomerative":
+            labels = agglomerative(similarity, k)
+        else:
+            raise ValueError(f"Unknown algorithm '{algorithm}' (expected one of {', '.join(ALGORITHMS)})")
+
+        contingency = _contingency(labels, truth, k)
+        clusters = []
+        for c in range(contingency.shape[0]):
+            cluster = {
+                "size": int(contingency[c].sum()),
+                "categories": {categories[m]: int(contingency[c, m]) for m in range(len(categories))},
+            }
+            if top_terms is not None:
+                cluster["top_terms"] = top_terms[c]
+            clusters.append(cluster)
+
+        report["algorithms"][algorithm] = {
+            "purity": round(purity(labels, truth), 4),
+            "silhouette": round(silhouette(similarity, labels), 4),
+            "adjusted_rand_index": round(adjusted_rand_index(labels, truth), 4),
+            "clusters": clusters,
+        }
+    return report
+
+
+def format_report(report):
+    """Render a validation report as lines of text."""
+    lines = [f"{report['documents']} descriptions, {report['k']} clusters, "
+             f"vocabulary {report.get('vocabulary_size', 0):,} terms"]
+    if not report["algorithms"]:
+        lines.append("Not enough descriptions to cluster.")
+    for algorithm, result in report["algorithms"].items():
+        lines.append("")
+        lines.append(f"{algorithm}: purity {result['purity']:.3f}, silhouette {result['silhouette']:.3f}, "
+                     f"ARI {result['adjusted_rand_index']:.3f}")
+        for number, cluster in enumerate(result["clusters"], 1):
+            make_up = ", ".join(f"{category}: {count}" for category, count in cluster["categories"].items())
+            lines.append(f"  Cluster {number} ({cluster['size']}): {make_up}")
+            if cluster.get("top_terms"):
+                lines.append(f"    top terms: {', '.join(cluster['top_terms'])}")
+    return lines
+
+
+def verdict(report, min_ari=0.5):
+    """True if every algorithm recovered the categories with ARI >= min_ari."""
+    results = report["algorithms"].values()
+    return bool(results) and all(result["adjusted_rand_index"] >= min_ari for result in results)
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Check that collected descriptions separate into their categories.")
+    parser.add_argument("instructor_key", nargs="?", default="instructor_key.json",
+                        help="instructor key to validate (default instructor_key.json)")
+    parser.add_argument("--k", type=int, default=None,
+                        help="number of clusters (default: number of categories)")
+    parser.add_argument("--algorithm", choices=ALGORITHMS, action="append",
+                        help="clustering algorithm to run (repeatable, default: both)")
+    parser.add_argument("--min-df", type=int, default=DEFAULT_MIN_DF,
+                        help=f"ignore terms in fewer documents than this (default {DEFAULT_MIN_DF})")
+    parser.add_argument("--max-df", type=float, default=DEFAULT_MAX_DF,
+                        help=f"ignore terms in more than this fraction of documents (default {DEFAULT_MAX_DF})")
+    parser.add_argument("--json", dest="json_path", default=None,
+                        help="also write the report as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with open(args.instructor_key, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+
+    report = validate(records, args.k, args.algorithm or ALGORITHMS, args.min_df, args.max_df)
+
+    print(f"\n{'='*60}")
+    print(f"CLUSTER VALIDATION: {args.instructor_key}")
+    print(f"{'='*60}")
+    for line in format_report(report):
+        print(line)
+    print()
+    print("✓ Categories separate cleanly" if verdict(report)
+          else "⚠️  Categories do not separate cleanly - consider revising the project lists")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"✓ Saved report to: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Persistent registry of anonymization codes.
+
+Codes used to be an MD5 of f"{project_name}{index}", so moving a project
+within its list changed its code, and nothing noticed two projects sharing
+one. The registry derives each code from the project name alone with keyed
+BLAKE2 (the key is random and kept in the registry, so students cannot
+recompute codes from project names), checks every new code against the ones
+already issued with a dict lookup, and remembers it. Later runs reuse the
+stored codes without hashing anything or reading old instructor keys.
+
+Each cohort has its own key and code table, so different student groups get
+unrelated codes while every group keeps its codes from run to run. The file
+is JSON:
+
+    {
+      "version": 1,
+      "cohorts": {
+        "default": {"key": "<64 hex digits>", "codes": {"Azuki": "NFT1A2B3C4D", ...}}
+      }
+    }
+
+Keep it private, like instructor_key.json.
+"""
+
+import hashlib
+import json
+import os
+import secrets
+
+
+DEFAULT_REGISTRY_PATH = "code_registry.json"
+DEFAULT_COHORT = "default"
+CODE_PREFIX = "NFT"
+CODE_HEX_DIGITS = 8
+KEY_BYTES = 32
+VERSION = 1
+
+
+class CodeRegistry:
+    """Stable, collision-free project codes for one cohort."""
+
+    def __init__(self, path=None, cohort=DEFAULT_COHORT, key=None, data=None):
+        """
+        Open (or start) a registry.
+
+        Args:
+            path: Registry file; None keeps the registry in memory only
+            cohort: Code table to use within the file
+            key: Key (bytes) for a new cohort; a random one by default.
+                Raises ValueError if the cohort already has a different key.
+            data: Contents of the file if already read (see open_cohorts)
+        """
+        self.path = path
+        self.cohort = cohort
+        self._data = data if data is not None else self._read(path)
+        entry = self._data["cohorts"].get(cohort)
+        if entry is None:
+            entry = {"key": (key or secrets.token_bytes(KEY_BYTES)).hex(), "codes": {}}
+            self._data["cohorts"][cohort] = entry
+            self._dirty = True
+        else:
+            if key is not None and bytes.fromhex(entry["key"]) != key:
+                raise ValueError(f"Cohort '{cohort}' in {path} already has a different key")
+            self._dirty = False
+        self.key = bytes.fromhex(entry["key"])
+        self.codes = entry["codes"]
+        self._projects = {code: project for project, code in self.codes.items()}
+        if len(self._projects) != len(self.codes):
+            raise ValueError(f"{path} gives the same code to more than one project in cohort '{cohort}'")
+        self._hasher = hashlib.blake2b(key=self.key, digest_size=CODE_HEX_DIGITS // 2)
+        self.collisions = 0
+
+    @classmethod
+    def open_cohorts(cls, path, cohorts):
+        """Open several cohorts of one registry file, reading it once."""
+        data = cls._read(path)
+        return [cls(path, cohort, data=data) for cohort in cohorts]
+
+    @staticmethod
+    def _read(path):
+        if path is None or not os.path.exists(path):
+            return {"version": VERSION, "cohorts": {}}
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or not isinstance(data.get("cohorts"), dict):
+            raise ValueError(f"{path} is not a code registry (expected a 'cohorts' mapping)")
+        return data
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, project):
+        return project in self.codes
+
+    def _hash(self, project, attempt):
+        hasher = self._hasher.copy()
+        hasher.update(project.encode('utf-8'))
+        if attempt:
+            hasher.update(f"\0{attempt}".encode())
+        return CODE_PREFIX + hasher.hexdigest().upper()
+
+    def assign(self, projects):
+        """Return the code of every project, issuing codes for new ones in one pass."""
+        codes, taken = self.codes, self._projects
+        for project in projects:
+            if project in codes:
+                continue
+            attempt = 0
+            code = self._hash(project, attempt)
+            # Probe with a counter until the code is free; the first probe almost always is
+            while code in taken:
+                attempt += 1
+                self.collisions += 1
+                code = self._hash(project, attempt)
+            codes[project] = code
+            taken[code] = project
+            self._dirty = True
+        return [codes[project] for project in projects]
+
+    def code(self, project):
+        """The project's code, issuing one if it has none yet."""
+        code = self.codes.get(project)
+        return code if code is not None else self.assign([project])[0]
+
+    def project(self, code):
+        """The project a code was issued to, or None."""
+        return self._projects.get(code)
+
+    def save(self):
+        """Write the registry back to its file if anything changed."""
+        return save_cohorts([self])
+
+
+def save_cohorts(registries):
+    """Write the changed cohorts of one registry file with a single write."""
+    changed = [registry for registry in registries if registry._dirty and registry.path is not None]
+    if not changed:
+        return None
+    path = changed[0].path
+    # Another process may have added cohorts since the file was read
+    data = CodeRegistry._read(path)
+    data["version"] = VERSION
+    for registry in changed:
+        data["cohorts"][registry.cohort] = {"key": registry.key.hex(), "codes": registry.codes}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    for registry in changed:
+        registry._dirty = False
+    return path
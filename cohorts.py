@@ -0,0 +1,177 @@
+"""
+Batch generation of cohort packages from one collection.
+
+When the challenge runs for several student groups, each group should get
+its own anonymized file: codes that mean nothing to the other groups and
+descriptions in a different order. Rather than fetching everything again
+per group, the packages are built from the records of a single collection
+(its instructor_key.json, or straight from a fetch run with --cohorts K):
+
+1. every cohort gets a table in the code registry with its own random key
+   (the cohort's salt); codes for all cohorts are issued in the parent
+   process and the registry is written once
+2. the packages are written by a process pool. Each worker receives the
+   records once, when it starts, and then only a cohort's codes and seed.
+   It shuffles the records with a seed derived from the cohort key, so the
+   order is the same every time that cohort is rebuilt
+
+Each package is a directory with the cohort's student_descriptions.txt and
+instructor_key.json. Codes in near_duplicate_of are translated as well.
+
+Usage:
+    python cohorts.py 100                       # from instructor_key.json
+    python cohorts.py 12 --key other_key.json --output-dir spring_cohorts
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import time
+from pathlib import Path
+
+from code_registry import DEFAULT_REGISTRY_PATH, CodeRegistry, save_cohorts
+from output_writers import STUDENT_INSTRUCTIONS, InstructorKeyWriter, StudentFileWriter
+
+
+DEFAULT_COHORT_DIR = "cohorts"
+DEFAULT_COHORT_PREFIX = "cohort"
+STUDENT_FILENAME = "student_descriptions.txt"
+KEY_FILENAME = "instructor_key.json"
+
+# Records of the collection, set once per worker process by _init_worker
+_records = None
+
+
+def cohort_names(count, prefix=DEFAULT_COHORT_PREFIX):
+    """cohort_001, cohort_002, ... (zero-padded so they sort in order)."""
+    width = max(3, len(str(count)))
+    return [f"{prefix}_{i:0{width}d}" for i in range(1, count + 1)]
+
+
+def cohort_count(value):
+    """argparse type for a number of cohorts (at least one)."""
+    count = int(value)
+    if count < 1:
+        raise argparse.ArgumentTypeError(f"need at least one cohort, got {value}")
+    return count
+
+
+def shuffle_seed(key):
+    """Shuffle seed derived from a cohort key."""
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8, person=b"shuffle").digest(), "big")
+
+
+def plan_cohorts(projects, names, registry_path=DEFAULT_REGISTRY_PATH):
+    """
+    Issue codes for every cohort and save them to the registry.
+
+    Returns:
+        {cohort: ({project: code}, shuffle seed)}
+    """
+    registries = CodeRegistry.open_cohorts(registry_path, names)
+    plans = {}
+    for registry in registries:
+        codes = registry.assign(projects)
+        plans[registry.cohort] = (dict(zip(projects, codes)), shuffle_seed(registry.key))
+    save_cohorts(registries)
+    return plans
+
+
+def _init_worker(records):
+    global _records
+    _records = records
+
+
+def write_package(name, codes, seed, output_dir, instructions=STUDENT_INSTRUCTIONS):
+    """Write one cohort's student file and instructor key; return (name, records written)."""
+    records = _records
+    source_codes = {record["code"]: record["project_name"] for record in records}
+    order = list(range(len(records)))
+    random.Random(seed).shuffle(order)
+
+    package_dir = Path(output_dir) / name
+    package_dir.mkdir(parents=True, exist_ok=True)
+    with StudentFileWriter(package_dir / STUDENT_FILENAME, instructions) as student, \
+            InstructorKeyWriter(package_dir / KEY_FILENAME) as key:
+        for i in order:
+            record = records[i]
+            item = dict(record, code=codes[record["project_name"]])
+            if record.get("near_duplicate_of"):
+                target = source_codes.get(record["near_duplicate_of"])
+                item["near_duplicate_of"] = codes.get(target)
+            student.write(item)
+            key.write(item)
+    return name, len(order)
+
+
+def build_cohorts(records, count, output_dir=DEFAULT_COHORT_DIR, registry_path=DEFAULT_REGISTRY_PATH,
+                  max_workers=None, prefix=DEFAULT_COHORT_PREFIX, instructions=STUDENT_INSTRUCTIONS):
+    """
+    Build ``count`` cohort packages from one collection's records.
+
+    Args:
+        records: Instructor key records (with code, project_name, description, ...)
+        count: Number of cohorts
+        output_dir: Directory that receives one subdirectory per cohort
+        registry_path: Code registry holding each cohort's key and codes
+        max_workers: Worker processes (default: one per CPU, 1 = no pool)
+        prefix: Cohort name prefix
+        instructions: Instructions at the top of each student file
+
+    Returns:
+        list of cohort names, in order
+    """
+    names = cohort_names(count, prefix)
+    projects = [record["project_name"] for record in records]
+    plans = plan_cohorts(projects, names, registry_path)
+
+    workers = min(max_workers or os.cpu_count() or 1, count)
+    if workers <= 1:
+        _init_worker(records)
+        for name in names:
+            write_package(name, *plans[name], output_dir, instructions)
+        return names
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(records,)) as executor:
+        futures = [executor.submit(write_package, name, *plans[name], output_dir, instructions)
+                   for name in names]
+        for future in futures:
+            future.result()
+    return names
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Build per-cohort student packages from one collection.")
+    parser.add_argument("count", type=cohort_count, help="number of cohorts")
+    parser.add_argument("--key", default=KEY_FILENAME,
+                        help=f"instructor key of the collection (default {KEY_FILENAME})")
+    parser.add_argument("--output-dir", default=DEFAULT_COHORT_DIR,
+                        help=f"directory for the packages (default {DEFAULT_COHORT_DIR})")
+    parser.add_argument("--code-registry", default=DEFAULT_REGISTRY_PATH,
+                        help=f"code registry holding the cohort keys (default {DEFAULT_REGISTRY_PATH})")
+    parser.add_argument("--prefix", default=DEFAULT_COHORT_PREFIX,
+                        help=f"cohort name prefix (default {DEFAULT_COHORT_PREFIX})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with open(args.key, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+
+    start = time.perf_counter()
+    names = build_cohorts(records, args.count, args.output_dir, args.code_registry, args.workers, args.prefix)
+    elapsed = time.perf_counter() - start
+    print(f"✓ Built {len(names)} cohort packages of {len(records)} descriptions in {elapsed:.2f}s")
+    print(f"✓ Saved to: {args.output_dir}/{names[0]} ... {args.output_dir}/{names[-1]}")
+    print(f"✓ Cohort keys and codes: {args.code_registry} (keep private)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Dataset state of the last collection, for incremental refreshes.
+
+After a run, fetch_descriptions_for_coding.py records next to
+collection_metadata.txt which dataset commit it collected and, per project,
+the blob id of its metadata_dashboard.json and how the fetch ended (the
+run_journal statuses):
+
+    {
+      "version": 1,
+      "revision": "<commit hash>",
+      "projects_digest": "<digest of the project lists>",
+      "projects": {"Azuki": {"category": "...", "blob_id": "<sha1>", "status": "success"}, ...}
+    }
+
+A --refresh run compares this with the current revision:
+
+1. if the branch still points at the same commit, the project lists are
+   unchanged and every project finished last time, there is nothing to do
+   (one dataset info call)
+2. otherwise the blob ids are listed again (batched paths-info) and
+   plan_refresh() picks the projects to fetch: new projects, changed files
+   and earlier errors (so a failed project is retried even when nothing
+   changed upstream). Every other record is taken from the existing
+   instructor key, and projects no longer in the dataset are dropped
+"""
+
+import json
+import os
+from collections import namedtuple
+
+from run_journal import ERROR, FINISHED, SUCCESS, projects_digest
+
+
+DEFAULT_STATE_PATH = "collection_state.json"
+VERSION = 1
+
+RefreshPlan = namedtuple("RefreshPlan", "fetch reuse empty removed")
+
+
+def read_state(path=DEFAULT_STATE_PATH):
+    """The saved state, or None if there is none (or it is unreadable)."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if state.get("version") != VERSION:
+        return None
+    return state
+
+
+def write_state(path, revision, categories, outcomes, blob_ids):
+    """
+    Save the state of a finished run.
+
+    Args:
+        path: State file
+        revision: Dataset commit the run collected
+        categories: {category: [project, ...]} that was collected
+        outcomes: {(category, project): status} (run_journal statuses)
+        blob_ids: {project: blob id} of the metadata files in that revision
+    """
+    projects = {}
+    for category, names in categories.items():
+        for project in names:
+            if project in blob_ids:
+                projects[project] = {"category": category, "blob_id": blob_ids[project],
+                                     "status": outcomes.get((category, project), ERROR)}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": VERSION, "revision": revision, "projects_digest": projects_digest(categories),
+                   "projects": projects}, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def is_current(state, revision, categories):
+    """True if the state already describes this revision and these project lists, with no project left to retry."""
+    return (state["revision"] == revision and state["projects_digest"] == projects_digest(categories)
+            and all(entry["status"] in FINISHED for entry in state["projects"].values()))
+
+
+def plan_refresh(state, categories, blob_ids, keyed):
+    """
+    Decide which projects a refresh fetches again.
+
+    Args:
+        state: The saved state (read_state)
+        categories: {category: [project, ...]} to collect now
+        blob_ids: {project: blob id} in the new revision (absent = not in the dataset)
+        keyed: Projects that have a record in the existing instructor key
+
+    Returns:
+        RefreshPlan(fetch={category: [project, ...]}, reuse=set of projects whose
+        key record is kept, empty=set of unchanged projects without a description,
+        removed=[projects no longer in the dataset])
+    """
+    saved = state["projects"]
+    fetch = {}
+    reuse = set()
+    empty = set()
+    removed = []
+    for category, names in categories.items():
+        fetch[category] = []
+        for project in names:
+            entry = saved.get(project)
+            if project not in blob_ids:
+                if entry is not None:
+                    removed.append(project)
+                continue
+            unchanged = (entry is not None and entry["category"] == category
+                         and entry["blob_id"] == blob_ids[project] and entry["status"] in FINISHED)
+            if not unchanged:
+                # New, modified or failed last time
+                fetch[category].append(project)
+            elif entry["status"] != SUCCESS:
+                empty.add(project)
+            elif project in keyed:
+                reuse.add(project)
+            else:
+                # Its record is not in the key (collapsed as a near-duplicate)
+                fetch[category].append(project)
+    return RefreshPlan(fetch, reuse, empty, removed)
@@ -0,0 +1,180 @@
+"""
+Columnar export of the instructor key (Parquet or Arrow IPC).
+
+instructor_key.json is an indented JSON array: easy to read, but slow to
+load and bulky once it holds the whole corpus. ColumnarKeyWriter writes the
+same records, in record batches, to a file with a fixed schema (SCHEMA), so
+pandas/pyarrow can read just the columns they need:
+
+    pd.read_parquet("instructor_key.parquet", columns=["code", "category"])
+
+    with pa.memory_map("instructor_key.arrow") as source:   # zero-copy
+        table = pa.ipc.open_file(source).read_all()
+
+pyarrow is optional (and only imported when a file is written); without it
+the fetch scripts simply skip this file.
+An existing key can be converted with:
+
+    python columnar_export.py instructor_key.json [--format arrow]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+from datetime import datetime, timezone
+
+# pyarrow and pyarrow.parquet, imported by _load_pyarrow()
+pa = pq = None
+
+
+PARQUET = "parquet"
+ARROW = "arrow"
+FORMATS = (PARQUET, ARROW)
+EXTENSIONS = {PARQUET: ".parquet", ARROW: ".arrow"}
+
+DEFAULT_BATCH_SIZE = 256
+
+# (column, arrow type name); total_supply values that are not whole numbers become null
+COLUMNS = (
+    ("code", "string"),
+    ("project_name", "string"),
+    ("category", "string"),
+    ("description", "large_string"),
+    ("total_supply", "int64"),
+    ("contract_address", "string"),
+    ("official_url", "string"),
+    ("opensea_url", "string"),
+    ("near_duplicate_of", "string"),
+    ("fetched_at", "timestamp"),
+    ("dataset_revision", "string"),
+)
+
+
+def available():
+    """True if pyarrow is installed."""
+    return pa is not None or importlib.util.find_spec("pyarrow") is not None
+
+
+def _load_pyarrow():
+    global pa, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("pyarrow is required for Parquet/Arrow export (pip install pyarrow)") from None
+        pa, pq = pyarrow, pyarrow.parquet
+
+
+def schema():
+    """The Arrow schema of the export."""
+    _load_pyarrow()
+    types = {
+        "string": pa.string(),
+        "large_string": pa.large_string(),
+        "int64": pa.int64(),
+        "timestamp": pa.timestamp("ms", tz="UTC"),
+    }
+    return pa.schema([pa.field(name, types[type_name]) for name, type_name in COLUMNS])
+
+
+def output_path(base_path, format):
+    """instructor_key.json -> instructor_key.parquet / .arrow"""
+    return os.path.splitext(base_path)[0] + EXTENSIONS[format]
+
+
+def _supply(value):
+    try:
+        return int(str(value).replace(",", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+class ColumnarKeyWriter:
+    """Write instructor key records to Parquet or Arrow IPC, one batch at a time."""
+
+    def __init__(self, output_path, format=PARQUET, revision=None, batch_size=DEFAULT_BATCH_SIZE):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown columnar format '{format}' (expected one of {', '.join(FORMATS)})")
+        self.output_path = output_path
+        self.format = format
+        self.revision = revision
+        self.batch_size = batch_size
+        self.schema = schema()
+        self.count = 0
+        self._columns = {name: [] for name, _ in COLUMNS}
+        if format == PARQUET:
+            self._writer = pq.ParquetWriter(output_path, self.schema, compression="zstd")
+        else:
+            self._sink = pa.OSFile(output_path, 'wb')
+            self._writer = pa.ipc.new_file(self._sink, self.schema)
+
+    def write(self, item, fetched_at=None):
+        columns = self._columns
+        for name in ("code", "project_name", "category", "description", "contract_address",
+                     "official_url", "opensea_url", "near_duplicate_of"):
+            columns[name].append(item.get(name) or None)
+        columns["total_supply"].append(_supply(item.get("total_supply")))
+        columns["fetched_at"].append(fetched_at or datetime.now(timezone.utc))
+        columns["dataset_revision"].append(self.revision)
+        self.count += 1
+        if len(columns["code"]) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._columns["code"]:
+            return
+        batch = pa.RecordBatch.from_pydict(self._columns, schema=self.schema)
+        if self.format == PARQUET:
+            self._writer.write_batch(batch)
+        else:
+            self._writer.write(batch)
+        self._columns = {name: [] for name, _ in COLUMNS}
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+        if self.format == ARROW:
+            self._sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Convert an instructor key to Parquet or Arrow IPC.")
+    parser.add_argument("instructor_key", nargs="?", default="instructor_key.json",
+                        help="instructor key to convert (default instructor_key.json)")
+    parser.add_argument("--format", choices=FORMATS, default=PARQUET,
+                        help=f"output format (default {PARQUET})")
+    parser.add_argument("--revision", default=None,
+                        help="dataset revision to record in the dataset_revision column")
+    parser.add_argument("--output", default=None,
+                        help="output path (default: the key's name with .parquet/.arrow)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not available():
+        print("✗ pyarrow is not installed (pip install pyarrow)")
+        return
+
+    with open(args.instructor_key, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+    path = args.output or output_path(args.instructor_key, args.format)
+    # The key carries no fetch times; use the key file's modification time
+    fetched_at = datetime.fromtimestamp(os.path.getmtime(args.instructor_key), timezone.utc)
+    with ColumnarKeyWriter(path, args.format, args.revision) as writer:
+        for record in records:
+            writer.write(record, fetched_at)
+    print(f"✓ Wrote {writer.count} records to: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+One-pass corpus profiling for collected descriptions.
+
+CorpusProfiler is fed one record at a time (so it works with the streaming
+writers) and only keeps compact per-document arrays plus vocabularies. The
+statistics are then computed with NumPy in a single grouping pass:
+documents are sorted once by (category, length) and every per-category
+figure - counts, sums, percentiles, duplicate rates - is read off that order.
+NumPy is imported when the statistics are computed, not with the module.
+
+Duplicates are counted two ways: exact (identical text) and near-duplicate
+(identical after lowercasing and stripping punctuation and extra spaces).
+"""
+
+import hashlib
+import json
+import re
+from array import array
+from collections import Counter
+
+
+TOKEN_PATTERN = re.compile(r"[0-9a-z]+(?:'[0-9a-z]+)*")
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Assumed characters per printed page, as in the original log
+CHARS_PER_PAGE = 3000
+
+
+def tokenize(text):
+    """Lowercase word tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _text_hash(text):
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), "little")
+
+
+def _duplicate_mask(hashes):
+    """True for every document whose hash already appeared earlier."""
+    import numpy as np
+
+    mask = np.ones(len(hashes), dtype=bool)
+    if len(hashes):
+        _, first = np.unique(hashes, return_index=True)
+        mask[first] = False
+    return mask
+
+
+def _percentiles(sorted_values):
+    import numpy as np
+
+    if not len(sorted_values):
+        return {f"p{p}": 0 for p in PERCENTILES}
+    values = np.percentile(sorted_values, PERCENTILES)
+    return {f"p{p}": round(float(v), 1) for p, v in zip(PERCENTILES, values)}
+
+
+class CorpusProfiler:
+    """Accumulate descriptions and compute corpus statistics."""
+
+    def __init__(self, categories=()):
+        self.category_ids = {}
+        self.category_vocab = []
+        for category in categories:
+            self._category_id(category)
+        self.lengths = array('q')
+        self.token_counts = array('q')
+        self.doc_categories = array('q')
+        self.exact_hashes = array('Q')
+        self.normalized_hashes = array('Q')
+        self.vocabulary = Counter()
+
+    def _category_id(self, category):
+        if category not in self.category_ids:
+            self.category_ids[category] = len(self.category_ids)
+            self.category_vocab.append(set())
+        return self.category_ids[category]
+
+    def add(self, item):
+        """Profile one record (needs 'description' and 'category')."""
+        text = item['description']
+        tokens = tokenize(text)
+        category_id = self._category_id(item['category'])
+
+        self.lengths.append(len(text))
+        self.token_counts.append(len(tokens))
+        self.doc_categories.append(category_id)
+        self.exact_hashes.append(_text_hash(text))
+        self.normalized_hashes.append(_text_hash(" ".join(tokens)))
+        self.vocabulary.update(tokens)
+        self.category_vocab[category_id].update(tokens)
+
+    def summary(self):
+        """Compute the statistics as a JSON-serializable dict."""
+        import numpy as np
+
+        lengths = np.frombuffer(self.lengths, dtype=np.int64) if self.lengths else np.zeros(0, np.int64)
+        tokens = np.frombuffer(self.token_counts, dtype=np.int64) if self.token_counts else np.zeros(0, np.int64)
+        categories = np.frombuffer(self.doc_categories, dtype=np.int64) if self.doc_categories else np.zeros(0, np.int64)
+        exact_dup = _duplicate_mask(np.frombuffer(self.exact_hashes, dtype=np.uint64))
+        near_dup = _duplicate_mask(np.frombuffer(self.normalized_hashes, dtype=np.uint64))
+
+        n = len(lengths)
+        total_tokens = int(tokens.sum())
+        summary = {
+            "documents": n,
+            "total_characters": int(lengths.sum()),
+            "mean_length": round(float(lengths.mean()), 1) if n else 0,
+            "min_length": int(lengths.min()) if n else 0,
+            "max_length": int(lengths.max()) if n else 0,
+            "estimated_pages": round(float(lengths.sum()) / CHARS_PER_PAGE, 1),
+            "length_percentiles": _percentiles(np.sort(lengths)),
+            "total_tokens": total_tokens,
+            "token_percentiles": _percentiles(np.sort(tokens)),
+            "vocabulary_size": len(self.vocabulary),
+            "type_token_ratio": round(len(self.vocabulary) / total_tokens, 4) if total_tokens else 0,
+            "duplicate_rate": round(float(exact_dup.mean()), 4) if n else 0,
+            "near_duplicate_rate": round(float(near_dup.mean()), 4) if n else 0,
+            "categories": {},
+        }
+
+        # Single grouping pass: one sort by (category, length), then slice
+        k = len(self.category_ids)
+        order = np.lexsort((lengths, categories))
+        bounds = np.searchsorted(categories[order], np.arange(k + 1))
+        counts = np.bincount(categories, minlength=k)
+        char_sums = np.bincount(categories, weights=lengths, minlength=k)
+        token_sums = np.bincount(categories, weights=tokens, minlength=k)
+        exact_dups = np.bincount(categories, weights=exact_dup, minlength=k)
+        near_dups = np.bincount(categories, weights=near_dup, minlength=k)
+
+        for category, cid in self.category_ids.items():
+            count = int(counts[cid])
+            vocab_size = len(self.category_vocab[cid])
+            summary["categories"][category] = {
+                "documents": count,
+                "total_characters": int(char_sums[cid]),
+                "mean_length": round(float(char_sums[cid]) / count, 1) if count else 0,
+                "length_percentiles": _percentiles(lengths[order[bounds[cid]:bounds[cid + 1]]]),
+                "total_tokens": int(token_sums[cid]),
+                "vocabulary_size": vocab_size,
+                "type_token_ratio": round(vocab_size / token_sums[cid], 4) if token_sums[cid] else 0,
+                "duplicate_rate": round(float(exact_dups[cid]) / count, 4) if count else 0,
+                "near_duplicate_rate": round(float(near_dups[cid]) / count, 4) if count else 0,
+            }
+        return summary
+
+
+def format_profile(summary):
+    """Render the extended statistics as lines for the metadata log."""
+    def pct(p):
+        return " / ".join(f"{v:,.0f}" for v in p.values())
+
+    labels = "/".join(f"p{p}" for p in PERCENTILES)
+    lines = [
+        f"Length percentiles ({labels}): {pct(summary['length_percentiles'])} characters",
+        f"Total tokens: {summary['total_tokens']:,}",
+        f"Token percentiles ({labels}): {pct(summary['token_percentiles'])} tokens",
+        f"Vocabulary size: {summary['vocabulary_size']:,} distinct tokens",
+        f"Type/token ratio: {summary['type_token_ratio']:.3f}",
+        f"Exact duplicate rate: {summary['duplicate_rate']:.1%}",
+        f"Near-duplicate rate: {summary['near_duplicate_rate']:.1%}",
+    ]
+    for category, stats in summary["categories"].items():
+        lines.append("")
+        lines.append(f"{category}:")
+        lines.append(f"  Documents: {stats['documents']}, characters: {stats['total_characters']:,}, "
+                     f"mean length: {stats['mean_length']:,.0f}")
+        lines.append(f"  Length percentiles: {pct(stats['length_percentiles'])}")
+        lines.append(f"  Tokens: {stats['total_tokens']:,}, vocabulary: {stats['vocabulary_size']:,}, "
+                     f"type/token: {stats['type_token_ratio']:.3f}")
+        lines.append(f"  Duplicates: {stats['duplicate_rate']:.1%} exact, "
+                     f"{stats['near_duplicate_rate']:.1%} near")
+    return lines
+
+
+def write_summary(summary, output_path):
+    """Write the statistics as a JSON summary."""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    return output_path
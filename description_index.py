@@ -0,0 +1,423 @@
+"""
+Inverted index and search over collected descriptions.
+
+Builds a compact on-disk index from instructor_key.json (or the
+nft1000_descriptions.json written by extract_nft_descriptions.py) and
+answers boolean and phrase queries with keyword-in-context output.
+
+Index file layout (a single file, memory-mapped when searching):
+
+    MAGIC | header length (8 bytes) | JSON header | arrays... | text blob
+
+The header holds the document list (code, project name, category) and the
+sorted vocabulary. Postings are flat NumPy arrays:
+
+- term_offsets[t] .. term_offsets[t + 1]: the term's entries in post_docs
+- post_docs: document ids, ascending within each term
+- pos_offsets[p] .. pos_offsets[p + 1]: that entry's token positions
+- positions: token positions within the document
+- text_offsets: where each description starts in the UTF-8 text blob
+
+Query syntax:
+    ape club              both terms (AND is implicit)
+    ape OR kong           either term
+    ape NOT mutant        first without second
+    "yacht club"          phrase
+    anim*                 prefix
+    (ape OR kong) AND "digital art"
+
+Usage:
+    python description_index.py build [instructor_key.json] [--index descriptions.idx]
+    python description_index.py search 'ape AND "yacht club"' [--index descriptions.idx]
+"""
+
+import argparse
+import bisect
+import json
+import mmap
+import re
+import struct
+import time
+from array import array
+from collections import defaultdict
+
+import numpy as np
+
+from corpus_stats import TOKEN_PATTERN
+
+
+MAGIC = b"NFTIDX1\n"
+DEFAULT_INDEX_PATH = "descriptions.idx"
+DEFAULT_SOURCE_PATH = "instructor_key.json"
+DEFAULT_CONTEXT_CHARS = 40
+DEFAULT_LIMIT = 20
+
+ARRAY_DTYPES = {
+    "term_offsets": np.int64,
+    "post_docs": np.int32,
+    "pos_offsets": np.int64,
+    "positions": np.int32,
+    "text_offsets": np.int64,
+}
+
+QUERY_TOKEN = re.compile(r'"([^"]*)"|(\()|(\))|([^\s()"]+)')
+# Matches the original text so spans are offsets into it; str.lower() can
+# change the length of a string and shift every later offset
+TOKEN_SPAN_PATTERN = re.compile(TOKEN_PATTERN.pattern, re.IGNORECASE)
+
+
+class QueryError(ValueError):
+    """Raised for a query that cannot be parsed."""
+
+
+def _token_spans(text):
+    """(token, start, end) for each token, matching corpus_stats.tokenize."""
+    return [(m.group().lower(), m.start(), m.end()) for m in TOKEN_SPAN_PATTERN.finditer(text)]
+
+
+def build_index(records, index_path=DEFAULT_INDEX_PATH):
+    """
+    Write an index over records (dicts with description and code or project_name).
+
+    Returns:
+        (documents indexed, distinct terms)
+    """
+    postings = defaultdict(list)
+    documents = []
+    texts = []
+    for doc_id, record in enumerate(records):
+        text = record.get("description") or ""
+        documents.append({
+            "code": record.get("code") or record.get("project_name", str(doc_id)),
+            "project_name": record.get("project_name", ""),
+            "category": record.get("category", ""),
+        })
+        texts.append(text.encode('utf-8'))
+        doc_terms = defaultdict(list)
+        for position, (token, _, _) in enumerate(_token_spans(text)):
+            doc_terms[token].append(position)
+        for token, token_positions in doc_terms.items():
+            postings[token].append((doc_id, token_positions))
+
+    terms = sorted(postings)
+    term_offsets = array('q', [0])
+    post_docs = array('i')
+    pos_offsets = array('q', [0])
+    positions = array('i')
+    for term in terms:
+        for doc_id, token_positions in postings[term]:
+            post_docs.append(doc_id)
+            positions.extend(token_positions)
+            pos_offsets.append(len(positions))
+        term_offsets.append(len(post_docs))
+
+    text_offsets = array('q', [0])
+    for encoded in texts:
+        text_offsets.append(text_offsets[-1] + len(encoded))
+
+    arrays = {
+        "term_offsets": term_offsets,
+        "post_docs": post_docs,
+        "pos_offsets": pos_offsets,
+        "positions": positions,
+        "text_offsets": text_offsets,
+    }
+    layout = {}
+    offset = 0
+    for name, values in arrays.items():
+        layout[name] = [offset, len(values)]
+        offset += len(values) * values.itemsize
+        offset += -offset % 8
+    header = json.dumps({
+        "documents": documents,
+        "terms": terms,
+        "arrays": layout,
+        "text_start": offset,
+    }, ensure_ascii=False).encode('utf-8')
+    header += b" " * (-(len(MAGIC) + 8 + len(header)) % 8)
+
+    with open(index_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for name, values in arrays.items():
+            data = values.tobytes()
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 8))
+        for encoded in texts:
+            f.write(encoded)
+    return len(documents), len(terms)
+
+
+class DescriptionIndex:
+    """Read-only, memory-mapped view of an index file."""
+
+    def __init__(self, index_path=DEFAULT_INDEX_PATH):
+        with open(index_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = self._mmap
+        if buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{index_path} is not a description index")
+        (header_length,) = struct.unpack_from("<Q", buffer, len(MAGIC))
+        base = len(MAGIC) + 8
+        header = json.loads(bytes(buffer[base:base + header_length]))
+        base += header_length
+
+        self.documents = header["documents"]
+        self.terms = header["terms"]
+        for name, (offset, count) in header["arrays"].items():
+            setattr(self, name, np.frombuffer(buffer, dtype=ARRAY_DTYPES[name], count=count, offset=base + offset))
+        self._text_start = base + header["text_start"]
+        self.all_docs = np.arange(len(self.documents), dtype=np.int32)
+
+    def close(self):
+        for name in ARRAY_DTYPES:
+            setattr(self, name, None)
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def text(self, doc_id):
+        start = self._text_start + int(self.text_offsets[doc_id])
+        end = self._text_start + int(self.text_offsets[doc_id + 1])
+        return self._mmap[start:end].decode('utf-8')
+
+    def _term_id(self, term):
+        i = bisect.bisect_left(self.terms, term)
+        return i if i < len(self.terms) and self.terms[i] == term else None
+
+    def _prefix_ids(self, prefix):
+        start = bisect.bisect_left(self.terms, prefix)
+        end = bisect.bisect_left(self.terms, prefix + "\uffff")
+        return range(start, end)
+
+    def postings(self, term_id):
+        """(doc ids, entry indices) for a term."""
+        start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+        return self.post_docs[start:end], np.arange(start, end)
+
+    def term_positions(self, entry):
+        return self.positions[self.pos_offsets[entry]:self.pos_offsets[entry + 1]]
+
+    def term_hits(self, term):
+        """{doc id: token positions} for a term (prefix if it ends with *)."""
+        term_ids = self._prefix_ids(term[:-1]) if term.endswith("*") else [self._term_id(term)]
+        hits = {}
+        for term_id in term_ids:
+            if term_id is None:
+                continue
+            docs, entries = self.postings(term_id)
+            for doc_id, entry in zip(docs.tolist(), entries.tolist()):
+                positions = self.term_positions(entry)
+                hits[doc_id] = np.union1d(hits[doc_id], positions) if doc_id in hits else positions
+        return hits
+
+    def phrase_hits(self, words):
+        """{doc id: start positions} of an exact phrase."""
+        if not words:
+            return {}
+        per_word = [self.term_hits(word) for word in words]
+        docs = set(per_word[0])
+        for hits in per_word[1:]:
+            docs &= set(hits)
+        result = {}
+        for doc_id in docs:
+            starts = per_word[0][doc_id]
+            for offset, hits in enumerate(per_word[1:], 1):
+                starts = np.intersect1d(starts, hits[doc_id] - offset, assume_unique=True)
+            if len(starts):
+                result[doc_id] = starts
+        return result
+
+    def search(self, query):
+        """
+        Run a query.
+
+        Returns:
+            (doc ids ascending, {doc id: [(start token, token count), ...]})
+            where the second item locates the positive matches for KWIC
+        """
+        node = parse_query(query)
+        highlights = defaultdict(list)
+        docs = self._evaluate(node, highlights)
+        matched = set(docs.tolist())
+        return docs, {doc_id: sorted(spans) for doc_id, spans in highlights.items() if doc_id in matched}
+
+    def _evaluate(self, node, highlights, negated=False):
+        kind = node[0]
+        if kind in ("term", "phrase"):
+            if kind == "term":
+                hits, width = self.term_hits(node[1]), 1
+            else:
+                hits, width = self.phrase_hits(node[1]), len(node[1])
+            if not negated:
+                for doc_id, starts in hits.items():
+                    highlights[doc_id].extend((int(start), width) for start in starts)
+            return np.array(sorted(hits), dtype=np.int32)
+        if kind == "not":
+            return np.setdiff1d(self.all_docs, self._evaluate(node[1], highlights, not negated))
+        results = [self._evaluate(child, highlights, negated) for child in node[1]]
+        combine = np.intersect1d if kind == "and" else np.union1d
+        docs = results[0]
+        for result in results[1:]:
+            docs = combine(docs, result)
+        return docs
+
+
+def parse_query(query):
+    """Parse a query into a tree of ("term"|"phrase"|"and"|"or"|"not", ...)."""
+    tokens = []
+    for phrase, open_paren, close_paren, word in QUERY_TOKEN.findall(query):
+        if open_paren or close_paren:
+            tokens.append(open_paren or close_paren)
+        elif word in ("AND", "OR", "NOT"):
+            tokens.append(word)
+        elif word:
+            prefix = word.endswith("*")
+            words = [match.group() for match in TOKEN_PATTERN.finditer(word.lower())]
+            if len(words) == 1:
+                tokens.append(("term", words[0] + ("*" if prefix else "")))
+            elif words:
+                tokens.append(("phrase", words))
+        else:
+            words = [match.group() for match in TOKEN_PATTERN.finditer(phrase.lower())]
+            if words:
+                tokens.append(("phrase", words) if len(words) > 1 else ("term", words[0]))
+
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def parse_or():
+        children = [parse_and()]
+        while peek() == "OR":
+            take()
+            children.append(parse_and())
+        return children[0] if len(children) == 1 else ("or", children)
+
+    def parse_and():
+        children = [parse_not()]
+        while peek() not in (None, "OR", ")"):
+            if peek() == "AND":
+                take()
+            children.append(parse_not())
+        return children[0] if len(children) == 1 else ("and", children)
+
+    def parse_not():
+        if peek() == "NOT":
+            take()
+            return ("not", parse_not())
+        return parse_atom()
+
+    def parse_atom():
+        token = peek()
+        if token is None:
+            raise QueryError("query ended unexpectedly")
+        take()
+        if token == "(":
+            node = parse_or()
+            if peek() != ")":
+                raise QueryError("missing closing parenthesis")
+            take()
+            return node
+        if isinstance(token, tuple):
+            return token
+        raise QueryError(f"unexpected '{token}'")
+
+    if not tokens:
+        raise QueryError("empty query")
+    node = parse_or()
+    if peek() is not None:
+        raise QueryError(f"unexpected '{peek()}'")
+    return node
+
+
+def keyword_in_context(text, spans, context=DEFAULT_CONTEXT_CHARS):
+    """One line per match: context, the match in [brackets], context."""
+    token_spans = _token_spans(text)
+    lines = []
+    for start, width in spans:
+        if start + width > len(token_spans):
+            continue
+        char_start, char_end = token_spans[start][1], token_spans[start + width - 1][2]
+        left = text[max(0, char_start - context):char_start].replace("\n", " ")
+        right = text[char_end:char_end + context].replace("\n", " ")
+        lines.append(f"{left:>{context}}[{text[char_start:char_end]}]{right}")
+    return lines
+
+
+def load_records(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Build and search an index of collected descriptions.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="index instructor_key.json or nft1000_descriptions.json")
+    build.add_argument("source", nargs="?", default=DEFAULT_SOURCE_PATH,
+                       help=f"records to index (default {DEFAULT_SOURCE_PATH})")
+    build.add_argument("--index", default=DEFAULT_INDEX_PATH,
+                       help=f"index file to write (default {DEFAULT_INDEX_PATH})")
+
+    search = subparsers.add_parser("search", help="run a boolean/phrase query")
+    search.add_argument("query", help='e.g. ape AND "yacht club" NOT mutant')
+    search.add_argument("--index", default=DEFAULT_INDEX_PATH,
+                        help=f"index file to search (default {DEFAULT_INDEX_PATH})")
+    search.add_argument("--context", type=int, default=DEFAULT_CONTEXT_CHARS,
+                        help=f"characters of context around each match (default {DEFAULT_CONTEXT_CHARS})")
+    search.add_argument("--limit", type=int, default=DEFAULT_LIMIT,
+                        help=f"show at most this many documents (default {DEFAULT_LIMIT}, 0 = all)")
+    search.add_argument("--codes-only", action="store_true",
+                        help="print matching codes only")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        documents, terms = build_index(load_records(args.source), args.index)
+        print(f"✓ Indexed {documents} descriptions ({terms:,} terms) in "
+              f"{time.perf_counter() - start:.2f}s -> {args.index}")
+        return
+
+    start = time.perf_counter()
+    with DescriptionIndex(args.index) as index:
+        try:
+            docs, highlights = index.search(args.query)
+        except QueryError as e:
+            print(f"✗ Invalid query: {e}")
+            return
+        elapsed = time.perf_counter() - start
+
+        print(f"{len(docs)} of {len(index.documents)} descriptions match ({elapsed * 1000:.1f} ms)")
+        shown = docs if args.limit == 0 else docs[:args.limit]
+        for doc_id in shown.tolist():
+            document = index.documents[doc_id]
+            if args.codes_only:
+                print(document["code"])
+                continue
+            label = " - ".join(part for part in (document["project_name"], document["category"]) if part)
+            print(f"\n{document['code']}" + (f" ({label})" if label else ""))
+            for line in keyword_in_context(index.text(doc_id), highlights.get(doc_id, []), args.context):
+                print(f"  {line}")
+        if len(shown) < len(docs):
+            print(f"\n... {len(docs) - len(shown)} more (use --limit 0 to show all)")
+
+
+if __name__ == "__main__":
+    main()
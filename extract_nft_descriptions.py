@@ -3,18 +3,89 @@ Script to extract only project descriptions from NFT1000 dataset
 This requires access to the gated Hugging Face dataset: shuxunoo/NFT-Net
 """
 
+import argparse
 import json
 import os
+import time
 from pathlib import Path
 
-def extract_project_descriptions(dataset_path, output_file, max_projects=50):
+from metadata_parser import METADATA_FIELDS, load_metadata
+from trait_stats import DEFAULT_STORE_PATH as DEFAULT_TRAIT_STORE_PATH
+
+METADATA_FILENAME = "metadata_dashboard.json"
+DEFAULT_MAX_WORKERS = 32
+
+# Caption/prompt summarizer used by read_project (set by _init_summarizer)
+_summarizer = None
+
+
+def list_project_dirs(nft1000_path):
+    """List project directory names in rank (sorted) order using os.scandir."""
+    with os.scandir(nft1000_path) as entries:
+        return sorted(entry.name for entry in entries if entry.is_dir())
+
+
+def read_project_metadata(project_dir):
+    """
+    Read a single project's metadata_dashboard.json.
+
+    Opens the metadata file directly, so nothing else in the project
+    directory (images/, captions/, ...) is ever listed or touched, and
+    decodes only the fields used in the report.
+
+    Returns:
+        (metadata, error) - error is None on success, "missing" if the file
+        does not exist, otherwise the error message
+    """
+    try:
+        return load_metadata(os.path.join(project_dir, METADATA_FILENAME), METADATA_FIELDS, lazy=True), None
+    except FileNotFoundError:
+        return None, "missing"
+    except Exception as e:
+        return None, str(e)
+
+
+def _init_summarizer(dataset_path, token_phrases):
+    """Set up the summarizer once per process (threads share the parent's)."""
+    global _summarizer
+    from token_text import TokenTextSummarizer
+    _summarizer = TokenTextSummarizer(dataset_path, top_k=token_phrases)
+
+
+def read_project(project_dir):
+    """
+    read_project_metadata plus the captions/prompts summary, so both run in the pool.
+
+    Returns:
+        (metadata, error, token_text) - token_text is None without a summarizer
+    """
+    metadata, error = read_project_metadata(project_dir)
+    token_text = None
+    if error is None and _summarizer is not None:
+        token_text = _summarizer.summarize(os.path.basename(project_dir))
+    return metadata, error, token_text
+
+
+def extract_project_descriptions(dataset_path, output_file, max_projects=None,
+                                 max_workers=DEFAULT_MAX_WORKERS, use_processes=False, token_phrases=0,
+                                 trait_stats=None):
     """
     Extract project descriptions from NFT1000 metadata dashboard files.
     
+    Metadata files are read concurrently, which hides per-file latency on
+    network filesystems; results are still returned in rank order.
+    
     Args:
         dataset_path: Path to the NFT1000 directory
         output_file: Path to save the extracted descriptions
-        max_projects: Number of projects to extract (default 50)
+        max_projects: Number of projects to extract (default None = all)
+        max_workers: Number of concurrent readers (default 32)
+        use_processes: Use a process pool instead of threads (helps when
+            JSON parsing rather than I/O is the bottleneck)
+        token_phrases: Also add the top N phrases of each project's
+            captions/ and prompts/ as "token_text" (default 0 = off)
+        trait_stats: Trait statistics file; when given, each project's
+            metadata/ is summarized as "traits" (see trait_stats.py)
     """
     
     project_data = []
@@ -25,44 +96,80 @@ def extract_project_descriptions(dataset_path, output_file, max_projects=50):
         return
     
     # Get all project directories
-    project_dirs = sorted([d for d in nft1000_path.iterdir() if d.is_dir()])
-    
-    print(f"Found {len(project_dirs)} projects in NFT1000")
-    print(f"Extracting descriptions for first {max_projects} projects...\n")
-    
-    for i, project_dir in enumerate(project_dirs[:max_projects], 1):
-        project_name = project_dir.name
-        metadata_file = project_dir / "metadata_dashboard.json"
+    project_names = list_project_dirs(nft1000_path)
+    if max_projects is not None:
+        project_names = project_names[:max_projects]
+    
+    print(f"Found {len(project_names)} projects in NFT1000")
+    print(f"Extracting descriptions with {max_workers} {'processes' if use_processes else 'threads'}...\n")
+    
+    project_dirs = [str(nft1000_path / name) for name in project_names]
+    # Imported here so the fetch engine can use read_project_metadata without the pools
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    chunksize = max(1, len(project_dirs) // (max_workers * 4)) if use_processes else 1
+    pool_options = {}
+    if token_phrases and use_processes:
+        pool_options = {"initializer": _init_summarizer, "initargs": (dataset_path, token_phrases)}
+    elif token_phrases:
+        _init_summarizer(dataset_path, token_phrases)
+    token_files = 0
+    
+    start = time.perf_counter()
+    with executor_class(max_workers=max_workers, **pool_options) as executor:
+        results = executor.map(read_project, project_dirs, chunksize=chunksize)
         
-        if metadata_file.exists():
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                
-                # Extract relevant information
-                project_info = {
-                    "rank": i,
-                    "project_name": project_name,
-                    "description": metadata.get("description", "No description available"),
-                    "contract_address": metadata.get("contract_address", ""),
-                    "total_supply": metadata.get("total_supply", ""),
-                    "official_url": metadata.get("official_url", ""),
-                    "opensea_url": metadata.get("opensea_url", "")
-                }
-                
-                project_data.append(project_info)
-                print(f"{i}. {project_name}")
-                
-            except Exception as e:
-                print(f"Error reading metadata for {project_name}: {e}")
-        else:
-            print(f"Warning: No metadata_dashboard.json found for {project_name}")
+        for i, (project_name, (metadata, error, token_text)) in enumerate(zip(project_names, results), 1):
+            if error == "missing":
+                print(f"Warning: No {METADATA_FILENAME} found for {project_name}")
+                continue
+            if error is not None:
+                print(f"Error reading metadata for {project_name}: {error}")
+                continue
+            
+            # Extract relevant information
+            project_info = {
+                "rank": i,
+                "project_name": project_name,
+                "description": metadata.get("description", "No description available"),
+                "contract_address": metadata.get("contract_address", ""),
+                "total_supply": metadata.get("total_supply", ""),
+                "official_url": metadata.get("official_url", ""),
+                "opensea_url": metadata.get("opensea_url", "")
+            }
+            if token_phrases:
+                project_info["token_text"] = token_text
+                token_files += sum(summary["files"] for summary in token_text.values())
+            
+            project_data.append(project_info)
+            print(f"{i}. {project_name}")
+    elapsed = time.perf_counter() - start
+    global _summarizer
+    if _summarizer is not None:
+        _summarizer.close()
+        _summarizer = None
+    
+    traits = None
+    if trait_stats:
+        from trait_stats import TraitAggregator
+        traits = TraitAggregator(dataset_path, trait_stats)
+        summary = traits.summary([project["project_name"] for project in project_data])
+        for project in project_data:
+            project["traits"] = summary["projects"][project["project_name"]]
     
     # Save to JSON file
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(project_data, f, indent=2, ensure_ascii=False)
     
     print(f"\n✓ Extracted descriptions for {len(project_data)} projects")
+    print(f"✓ Scanned {len(project_dirs)} projects in {elapsed:.2f}s "
+          f"({len(project_dirs) / max(elapsed, 1e-9):,.0f} files/s)")
+    if token_phrases:
+        print(f"✓ Summarized {token_files:,} caption/prompt files "
+              f"({token_files / max(elapsed, 1e-9):,.0f} files/s overall)")
+    if traits is not None:
+        print(f"✓ Trait statistics: {summary['scanned']} projects scanned ({summary['files']:,} token files in "
+              f"{summary['seconds']:.2f}s), the rest read from {trait_stats}")
     print(f"✓ Saved to: {output_file}")
     
     return project_data
@@ -72,7 +179,7 @@ def create_readable_report(project_data, output_file):
     """Create a human-readable text report of the projects."""
     
     with open(output_file, 'w', encoding='utf-8') as f:
-        f.write("NFT1000 DATASET - FIRST 50 PROJECTS\n")
+        f.write(f"NFT1000 DATASET - {len(project_data)} PROJECTS\n")
         f.write("=" * 80 + "\n\n")
         
         for project in project_data:
@@ -87,28 +194,52 @@ def create_readable_report(project_data, output_file):
                 f.write(f"OpenSea: {project['opensea_url']}\n")
             if project.get('contract_address'):
                 f.write(f"Contract: {project['contract_address']}\n")
+            for name, summary in project.get('token_text', {}).items():
+                phrases = ", ".join(f"{phrase} ({count})" for phrase, count in summary['phrases'])
+                f.write(f"Top {name} phrases ({summary['files']} files): {phrases}\n")
+            traits = project.get('traits')
+            if traits and traits['tokens']:
+                f.write(f"Traits: {traits['tokens']:,} tokens, {traits['traits']} traits, "
+                        f"{traits['values']:,} values")
+                if 'rarest' in traits:
+                    trait, value, count = traits['rarest']
+                    f.write(f"; rarest {trait} = {value} ({count / traits['tokens']:.2%})")
+                f.write("\n")
             f.write("\n\n")
     
     print(f"✓ Created readable report: {output_file}")
 
 
 if __name__ == "__main__":
-    # Example usage - modify these paths as needed
-    
-    # Option 1: If you've downloaded/cloned the entire dataset
-    dataset_path = "/path/to/your/NFT-Net"
-    
-    # Or Option 2: If you've downloaded individual projects
-    # dataset_path = "/path/to/your/download/location"
-    
-    output_json = "nft1000_first50_descriptions.json"
-    output_txt = "nft1000_first50_descriptions.txt"
+    parser = argparse.ArgumentParser(description="Extract project descriptions from a local NFT-Net checkout.")
+    # Either the entire cloned dataset or a directory of individually downloaded projects
+    parser.add_argument("dataset_path", nargs="?", default="/path/to/your/NFT-Net",
+                        help="directory containing NFT1000/")
+    parser.add_argument("--max-projects", type=int, default=None,
+                        help="only extract the first N projects (default: all)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help=f"concurrent readers (default {DEFAULT_MAX_WORKERS})")
+    parser.add_argument("--processes", action="store_true",
+                        help="read with a process pool instead of threads")
+    parser.add_argument("--token-phrases", type=int, metavar="K", default=0,
+                        help="also summarize each project's captions/ and prompts/ as its K most frequent phrases")
+    parser.add_argument("--trait-stats", nargs="?", const=DEFAULT_TRAIT_STORE_PATH, default=None, metavar="PATH",
+                        help=f"also summarize each project's metadata/ traits, keeping the counts in PATH "
+                             f"(default {DEFAULT_TRAIT_STORE_PATH}) so later runs only rescan changed projects")
+    args = parser.parse_args()
+    
+    output_json = "nft1000_descriptions.json"
+    output_txt = "nft1000_descriptions.txt"
     
     # Extract descriptions
     project_data = extract_project_descriptions(
-        dataset_path=dataset_path,
+        dataset_path=args.dataset_path,
         output_file=output_json,
-        max_projects=50
+        max_projects=args.max_projects,
+        max_workers=args.workers,
+        use_processes=args.processes,
+        token_phrases=args.token_phrases,
+        trait_stats=args.trait_stats
     )
     
     # Create readable report
@@ -5,14 +5,71 @@ Creates:
 1. Student file: descriptions with alphanumeric codes only
 2. Instructor key: mapping of codes to projects and metadata
 3. Metadata log: documents what was fetched for reproducibility
+
+huggingface_hub is imported by the functions that talk to the Hub, so --help
+and runs served from the metadata cache or a local checkout start quickly.
 """
 
+import argparse
 import json
-import hashlib
 import os
-from huggingface_hub import hf_hub_download
-from pathlib import Path
-from datetime import datetime
+import time
+
+from code_registry import DEFAULT_REGISTRY_PATH, CodeRegistry
+from collection_state import DEFAULT_STATE_PATH, is_current, plan_refresh, read_state, write_state
+from cohorts import DEFAULT_COHORT_DIR, build_cohorts, cohort_count
+from columnar_export import (
+    FORMATS as COLUMNAR_FORMATS,
+    PARQUET,
+    ColumnarKeyWriter,
+    available as columnar_available,
+    output_path as columnar_path,
+)
+from fetch_engine import (
+    HF,
+    LOCAL,
+    NFTHUB,
+    CacheSource,
+    FetchEngine,
+    HubSource,
+    LocalSource,
+    NftHubSource,
+    parse_sources,
+)
+from metadata_cache import DEFAULT_CACHE_DIR, MetadataCache
+from metadata_parser import METADATA_FIELDS, load_metadata
+from near_duplicates import DEFAULT_THRESHOLD, FLAG, MODES as DEDUP_MODES, NearDuplicateDetector, jaccard_threshold
+from output_writers import (
+    STUDENT_INSTRUCTIONS,
+    CollectionWriter,
+    InstructorKeyWriter,
+    MetadataLogWriter,
+    StudentFileWriter,
+)
+from project_lists import DEFAULT_PROJECT_LIST_PATH, load_project_lists
+from run_journal import (
+    DEFAULT_JOURNAL_PATH,
+    ERROR,
+    NO_DESCRIPTION,
+    SUCCESS,
+    JournalMismatchError,
+    RunJournal,
+)
+from run_metrics import DEFAULT_PROFILE_PATH, DEFAULT_TRACE_PATH, RunMetrics, profile_call
+from sharding import DEFAULT_SHARD_DIR, ShardWriter, parse_shard, select_shard, shard_path
+from trait_stats import DEFAULT_STORE_PATH as DEFAULT_TRAIT_STORE_PATH
+
+
+REPO_ID = "shuxunoo/NFT-Net"
+
+# Fetch tuning (overridable from the command line)
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 1.0
+
+# Paths per paths-info request in the pre-flight listing
+PATHS_INFO_BATCH_SIZE = 500
 
 
 # Two distinct categories for expected clustering
@@ -62,79 +119,308 @@ CATEGORY_B_FANTASY_ART = [
 ]
 
 
-def generate_code(project_name, index):
-    """Generate alphanumeric code for anonymization."""
-    # Create a unique hash-based code
-    hash_input = f"{project_name}{index}".encode()
-    hash_digest = hashlib.md5(hash_input).hexdigest()
-    # Use first 8 characters, uppercase
-    return f"NFT{hash_digest[:8].upper()}"
+def get_hf_token():
+    """Get Hugging Face token from environment if available."""
+    return os.environ.get('HF_TOKEN') or os.environ.get('HUGGING_FACE_HUB_TOKEN') or os.environ.get('HUGGINGFACE_TOKEN')
 
 
-def fetch_descriptions(projects, category_name):
-    """Fetch descriptions from Hugging Face for given projects."""
-    descriptions = []
+def resolve_revision(revision, hf_token=None, cache=None):
+    """Resolve a branch/tag to the dataset commit hash it currently points at.
+
+    A recent resolution remembered by the cache is reused, so a warm run
+    does not need to contact the Hub at all.
+    """
+    if cache is not None:
+        commit_hash = cache.resolve_ref(revision)
+        if commit_hash:
+            return commit_hash
     
-    # Get token from environment if available
-    hf_token = os.environ.get('HF_TOKEN') or os.environ.get('HUGGING_FACE_HUB_TOKEN') or os.environ.get('HUGGINGFACE_TOKEN')
+    from huggingface_hub import HfApi
+    commit_hash = HfApi().dataset_info(REPO_ID, revision=revision, token=hf_token).sha
+    if cache is not None:
+        cache.store_ref(revision, commit_hash)
+    return commit_hash
+
+
+def metadata_path(project):
+    """Repository path of a project's metadata_dashboard.json."""
+    return f"NFT1000/{project}/metadata_dashboard.json"
+
+
+def list_paths_info(paths, revision, hf_token=None):
+    """Return {path: RepoFile} for the paths that exist in a revision.
+    
+    Uses batched paths-info requests (one per PATHS_INFO_BATCH_SIZE paths).
+    """
+    from huggingface_hub import HfApi
+    api = HfApi()
+    infos = {}
+    for start in range(0, len(paths), PATHS_INFO_BATCH_SIZE):
+        batch = api.get_paths_info(REPO_ID, paths[start:start + PATHS_INFO_BATCH_SIZE], repo_type="dataset",
+                                   revision=revision, token=hf_token)
+        infos.update((info.path, info) for info in batch)
+    return infos
+
+
+def list_blob_ids(paths, revision, hf_token=None):
+    """Return {path: blob id} for the paths that exist in a revision.
+    
+    A file's blob id changes exactly when its content does.
+    """
+    return {path: info.blob_id for path, info in list_paths_info(paths, revision, hf_token).items()}
+
+
+def list_project_blob_ids(projects, revision, hf_token=None):
+    """Return {project: blob id} for the projects whose metadata_dashboard.json exists in a revision.
+
+    Lists them with batched paths-info requests (list_blob_ids) instead of
+    discovering missing files one failed download at a time.
+    """
+    found = list_blob_ids([metadata_path(project) for project in projects], revision, hf_token)
+    return {project: found[metadata_path(project)] for project in projects if metadata_path(project) in found}
+
+
+def preflight(categories, revision, hf_token=None, cache=None, blob_ids=None):
+    """Check which requested projects exist before downloading anything.
+
+    Projects already in the cache (as a record or a known 404) are not
+    listed again; missing projects are reported right away and remembered
+    in the cache. The blob ids of the listed projects are added to
+    ``blob_ids`` when it is given. Returns the set of missing project names.
+    """
+    projects = [project for names in categories.values() for project in names]
+    unknown = [p for p in dict.fromkeys(projects) if cache is None or not cache.contains(p, revision)]
+    if not unknown:
+        return set()
+    
+    print(f"\n🔍 Checking {len(unknown)} projects against the dataset listing...")
+    try:
+        existing = list_project_blob_ids(unknown, revision, hf_token)
+    except Exception as e:
+        print(f"⚠️  Could not list dataset files: {e}")
+        print("Proceeding without pre-flight check...")
+        return set()
+    
+    missing = {project for project in unknown if project not in existing}
+    if blob_ids is not None:
+        blob_ids.update(existing)
+    for project in unknown:
+        if project in missing:
+            print(f"✗ Not in dataset: {project}")
+            if cache is not None:
+                cache.put_missing(project, revision)
+    print(f"✓ {len(unknown) - len(missing)} of {len(unknown)} projects found")
+    return missing
+
+
+def with_retries(func, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, on_retry=None):
+    """Return func(), retrying transient failures with exponential backoff.
+
+    Timeouts, connection errors and 5xx responses are retried up to
+    ``retries`` times, sleeping backoff, 2 * backoff, ... in between; a
+    missing file, repository or revision fails immediately. ``on_retry`` is
+    called before each retry.
+    """
+    from huggingface_hub.errors import RemoteEntryNotFoundError, RepositoryNotFoundError, RevisionNotFoundError
+    
+    # Errors that will not go away on retry (missing repo, revision or file)
+    permanent_errors = (RemoteEntryNotFoundError, RepositoryNotFoundError, RevisionNotFoundError)
+    for attempt in range(retries + 1):
+        try:
+            return func()
+        except permanent_errors:
+            raise
+        except Exception:
+            if attempt == retries:
+                raise
+            if on_retry is not None:
+                on_retry()
+            time.sleep(backoff * 2 ** attempt)
+
+
+def download_metadata(project, hf_token=None, timeout=DEFAULT_TIMEOUT,
+                      retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, revision=None, metrics=None):
+    """Download one project's metadata_dashboard.json and parse the fields we use.
+
+    ``timeout`` bounds each HTTP request: the HEAD that resolves the file
+    (``etag_timeout``) and the GET that downloads it (huggingface_hub reads
+    ``constants.HF_HUB_DOWNLOAD_TIMEOUT`` for that one, so it is set here).
+    Transient failures are retried (see with_retries).
+    Download/parse times, bytes and retries are reported to ``metrics``.
+    """
+    from huggingface_hub import constants, hf_hub_download
+    
+    constants.HF_HUB_DOWNLOAD_TIMEOUT = timeout
+    metrics = metrics if metrics is not None else RunMetrics()
+    
+    def download():
+        with metrics.stage("download"):
+            return hf_hub_download(
+                repo_id=REPO_ID,
+                filename=metadata_path(project),
+                repo_type="dataset",
+                revision=revision,
+                token=hf_token,
+                etag_timeout=timeout,
+            )
+    
+    file_path = with_retries(download, retries, backoff, lambda: metrics.count("retries"))
+    metrics.count("bytes", os.path.getsize(file_path))
+    with metrics.stage("parse"):
+        return load_metadata(file_path, METADATA_FIELDS, lazy=True)
+
+
+def iter_descriptions(projects, category_name, max_workers=DEFAULT_MAX_WORKERS,
+                      timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF,
+                      revision=None, cache=None, journal=None, missing=None, metrics=None, registry=None,
+                      sources=None):
+    """Fetch descriptions, yielding each record as it is ready.
+
+    Projects are fetched by a FetchEngine from ``sources`` (default: the Hub,
+    with ``max_workers`` downloads in flight); records are reported and
+    yielded in the same order as ``projects``. When a ``cache`` is given,
+    records for ``revision`` are served from it and new downloads are added.
+    When a ``journal`` is given, each outcome is checkpointed to it and
+    projects it already finished are replayed instead of fetched. Projects
+    in ``missing`` (see preflight) are not requested from the Hub. Per-stage
+    and per-project timings are reported to ``metrics``. Codes come from
+    ``registry`` (a CodeRegistry), so they do not depend on list position.
+    """
+    metrics = metrics if metrics is not None else RunMetrics()
+    registry = registry if registry is not None else CodeRegistry()
+    finished = journal.finished(category_name) if journal is not None else {}
+    missing = missing if missing is not None else set()
+    if sources is None:
+        sources = [HubSource(revision, get_hf_token(), timeout, retries, backoff, max(1, max_workers),
+                             cache, missing)]
+    show_source = len(sources) > 1
+    if cache is not None:
+        # Only Hub records belong under the dataset commit; local and NFT-NET-Hub ones are not cached
+        sources = [CacheSource(cache, revision, missing, accepts=(HF,))] + list(sources)
+    engine = FetchEngine(sources, metrics)
     
     print(f"\n{'='*60}")
     print(f"Fetching {category_name} projects...")
     print(f"{'='*60}")
     
+    results = engine.fetch_all([project for project in projects if project not in finished], category_name)
     for i, project in enumerate(projects, 1):
-        try:
-            file_path = hf_hub_download(
-                repo_id="shuxunoo/NFT-Net",
-                filename=f"NFT1000/{project}/metadata_dashboard.json",
-                repo_type="dataset",
-                token=hf_token
-            )
-            
-            with open(file_path, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
+        if project in finished:
+            record = finished[project].get("record")
+            if record:
+                print(f"✓ {i:2d}. {project:40s} [{len(record['description']):4d} chars] (resumed)")
+                yield record
+            else:
+                print(f"✗ {i:2d}. {project:40s} [NO DESCRIPTION] (resumed)")
+            continue
+        
+        metadata, source, error = next(results)
+        if error is not None:
+            print(f"✗ {i:2d}. {project:40s} [ERROR: {error}]")
+            if journal is not None:
+                journal.record(category_name, project, ERROR, error=str(error))
+            continue
+        
+        description = metadata.get("description", "")
+        
+        if description:
+            code = registry.code(project)
+            record = {
+                "code": code,
+                "description": description,
+                "project_name": project,
+                "category": category_name,
+                "total_supply": metadata.get("total_supply", "Unknown"),
+                "contract_address": metadata.get("contract_address", ""),
+                "official_url": metadata.get("official_url", ""),
+                "opensea_url": metadata.get("opensea_url", ""),
+            }
             
-            description = metadata.get("description", "")
+            print(f"✓ {i:2d}. {project:40s} [{len(description):4d} chars]" + (f" ({source})" if show_source else ""))
+            if journal is not None:
+                journal.record(category_name, project, SUCCESS, record=record)
             
-            if description:
-                code = generate_code(project, i)
-                
-                descriptions.append({
-                    "code": code,
-                    "description": description,
-                    "project_name": project,
-                    "category": category_name,
-                    "total_supply": metadata.get("total_supply", "Unknown"),
-                    "contract_address": metadata.get("contract_address", ""),
-                    "official_url": metadata.get("official_url", ""),
-                })
-                
-                print(f"✓ {i:2d}. {project:40s} [{len(description):4d} chars]")
-            else:
-                print(f"✗ {i:2d}. {project:40s} [NO DESCRIPTION]")
-                
-        except Exception as e:
-            print(f"✗ {i:2d}. {project:40s} [ERROR: {e}]")
+            yield record
+        else:
+            print(f"✗ {i:2d}. {project:40s} [NO DESCRIPTION]")
+            if journal is not None:
+                journal.record(category_name, project, NO_DESCRIPTION)
+
+
+def build_sources(names, revision, cache=None, missing=None, max_workers=DEFAULT_MAX_WORKERS,
+                  timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, local_dir=None):
+    """Create the fetch engine sources named on the command line (see fetch_engine)."""
+    sources = []
+    for name in names:
+        if name == HF:
+            sources.append(HubSource(revision, get_hf_token(), timeout, retries, DEFAULT_BACKOFF,
+                                     max(1, max_workers), cache, missing))
+        elif name == NFTHUB:
+            sources.append(NftHubSource())
+        elif name == LOCAL:
+            if not local_dir:
+                raise ValueError("the local source needs --local-dir")
+            sources.append(LocalSource(local_dir))
+    return sources
+
+
+def fetch_descriptions(projects, category_name, **options):
+    """Fetch descriptions from Hugging Face for given projects."""
+    return list(iter_descriptions(projects, category_name, **options))
+
+
+def iter_refreshed(projects, category_name, plan, previous, registry=None, **options):
+    """Yield a category's records for a refresh, in list order.
     
-    return descriptions
+    Projects in the RefreshPlan's fetch list go through iter_descriptions;
+    the others keep their record from the previous instructor key
+    (``previous``, by project name) and are journaled as if fetched.
+    """
+    registry = registry if registry is not None else CodeRegistry()
+    journal = options.get("journal")
+    fetched = {record["project_name"]: record
+               for record in iter_descriptions(plan.fetch[category_name], category_name, registry=registry,
+                                               **options)}
+    for project in projects:
+        if project in fetched:
+            yield fetched[project]
+        elif project in plan.reuse:
+            # Near-duplicates are detected again over the refreshed corpus
+            record = {key: value for key, value in previous[project].items() if key != "near_duplicate_of"}
+            record["code"] = registry.code(project)
+            if journal is not None:
+                journal.record(category_name, project, SUCCESS, record=record)
+            yield record
+        elif project in plan.empty and journal is not None:
+            journal.record(category_name, project, NO_DESCRIPTION)
+
+
+def read_key_records(path):
+    """{project: record} from an existing instructor key (empty if there is none)."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return {record["project_name"]: record for record in json.load(f)}
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_state(path, revision, categories, journal, blob_ids=None, hf_token=None):
+    """Record the collected revision and metadata blob ids for the next --refresh.
+
+    The blob ids are listed from the Hub when they are not given.
+    """
+    paths = {metadata_path(project): project for projects in categories.values() for project in projects}
+    if blob_ids is None:
+        blob_ids = {paths[path]: blob_id for path, blob_id in list_blob_ids(list(paths), revision, hf_token).items()}
+    outcomes = {key: entry["status"] for key, entry in journal.entries.items()}
+    write_state(path, revision, categories, outcomes, blob_ids)
 
 
 def create_student_file(all_descriptions, output_path):
     """Create anonymized file for students with codes only."""
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write("NFT PROJECT DESCRIPTIONS - AXIAL CODING CHALLENGE\n")
-        f.write("=" * 80 + "\n\n")
-        f.write("Instructions:\n")
-        f.write("Read through these descriptions and perform axial coding.\n")
-        f.write("Each description has a unique code (e.g., NFT12ABC345).\n")
-        f.write("Use these codes when referring to specific items.\n")
-        f.write("\n" + "=" * 80 + "\n\n")
-        
+    with StudentFileWriter(output_path) as writer:
         for item in all_descriptions:
-            f.write(f"CODE: {item['code']}\n")
-            f.write("-" * 80 + "\n")
-            f.write(f"{item['description']}\n")
-            f.write("\n" + "=" * 80 + "\n\n")
+            writer.write(item)
     
     print(f"\n✓ Created student file: {output_path}")
     return output_path
@@ -142,114 +428,407 @@ def create_student_file(all_descriptions, output_path):
 
 def create_instructor_key(all_descriptions, output_path):
     """Create instructor key mapping codes to projects."""
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(all_descriptions, f, indent=2, ensure_ascii=False)
+    with InstructorKeyWriter(output_path) as writer:
+        for item in all_descriptions:
+            writer.write(item)
     
     print(f"✓ Created instructor key: {output_path}")
     return output_path
 
 
-def create_metadata_log(all_descriptions, category_counts, output_path):
-    """Create metadata log documenting the data collection."""
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write("DATA COLLECTION LOG\n")
-        f.write("=" * 80 + "\n\n")
-        
-        f.write(f"Collection Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"Dataset Source: Hugging Face - shuxunoo/NFT-Net (NFT1000)\n")
-        f.write(f"Total Descriptions Collected: {len(all_descriptions)}\n\n")
-        
-        f.write("CATEGORY BREAKDOWN:\n")
-        f.write("-" * 80 + "\n")
-        for category, count in category_counts.items():
-            f.write(f"{category}: {count} descriptions\n")
-        
-        f.write("\n\nDESCRIPTION STATISTICS:\n")
-        f.write("-" * 80 + "\n")
-        lengths = [len(d['description']) for d in all_descriptions]
-        f.write(f"Total characters: {sum(lengths):,}\n")
-        f.write(f"Average length: {sum(lengths) // len(lengths):,} characters\n")
-        f.write(f"Shortest: {min(lengths):,} characters\n")
-        f.write(f"Longest: {max(lengths):,} characters\n")
-        
-        # Estimate pages (assuming ~3000 chars per page)
-        estimated_pages = sum(lengths) / 3000
-        f.write(f"\nEstimated pages (3000 chars/page): {estimated_pages:.1f} pages\n")
-        
-        f.write("\n\nPROJECTS COLLECTED:\n")
-        f.write("-" * 80 + "\n")
-        
-        for category in category_counts.keys():
-            f.write(f"\n{category}:\n")
-            category_items = [d for d in all_descriptions if d['category'] == category]
-            for item in category_items:
-                f.write(f"  - {item['code']}: {item['project_name']}\n")
+def log_source_lines(revision=None):
+    """Describe where the data came from, for the metadata log header."""
+    lines = ["Dataset Source: Hugging Face - shuxunoo/NFT-Net (NFT1000)"]
+    if revision:
+        lines.append(f"Dataset Revision: {revision}")
+    return lines
+
+
+def create_metadata_log(all_descriptions, category_counts, output_path, revision=None, traits=None):
+    """Create metadata log documenting the data collection (with trait statistics from a TraitAggregator)."""
+    with MetadataLogWriter(output_path, log_source_lines(revision), category_counts.keys(),
+                           traits=traits) as writer:
+        for item in all_descriptions:
+            writer.write(item)
     
     print(f"✓ Created metadata log: {output_path}")
     return output_path
 
 
-def main():
-    """Main execution function."""
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Fetch NFT descriptions for the axial coding challenge.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help=f"concurrent downloads (default {DEFAULT_MAX_WORKERS}, 1 = sequential)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"per-request timeout in seconds (default {DEFAULT_TIMEOUT})")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help=f"retries for transient failures (default {DEFAULT_RETRIES})")
+    parser.add_argument("--sources", type=parse_sources, default=[HF], metavar="LIST",
+                        help=f"comma-separated metadata sources ({', '.join((HF, NFTHUB, LOCAL))}); each project "
+                             f"is fetched from the fastest one that has it (default {HF})")
+    parser.add_argument("--local-dir", default=None,
+                        help="NFT-Net checkout (containing NFT1000/) for the local source")
+    parser.add_argument("--token-phrases", type=int, metavar="K", default=0,
+                        help="add the K most frequent phrases of each project's captions/ and prompts/ "
+                             "(from --local-dir) to the instructor key")
+    parser.add_argument("--trait-stats", nargs="?", const=DEFAULT_TRAIT_STORE_PATH, default=None, metavar="PATH",
+                        help=f"add trait frequency and rarity figures from each project's metadata/ (from "
+                             f"--local-dir) to the metadata log, keeping the counts in PATH so later runs "
+                             f"only rescan changed projects (default {DEFAULT_TRAIT_STORE_PATH})")
+    parser.add_argument("--revision", default="main",
+                        help="dataset branch, tag or commit hash to fetch (default main)")
+    parser.add_argument("--projects", default=DEFAULT_PROJECT_LIST_PATH,
+                        help=f"project list file from select_projects.py; the built-in lists are used "
+                             f"if it does not exist (default {DEFAULT_PROJECT_LIST_PATH})")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR),
+                        help=f"metadata cache directory (default {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always fetch from the Hub, bypassing the metadata cache")
+    parser.add_argument("--code-registry", default=DEFAULT_REGISTRY_PATH,
+                        help=f"file that keeps each project's code stable across runs "
+                             f"(default {DEFAULT_REGISTRY_PATH})")
+    parser.add_argument("--cohorts", type=cohort_count, metavar="K", default=0,
+                        help="also build K cohort packages, each with its own codes and description order")
+    parser.add_argument("--cohort-dir", default=DEFAULT_COHORT_DIR,
+                        help=f"directory for the cohort packages (default {DEFAULT_COHORT_DIR})")
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL_PATH,
+                        help=f"checkpoint journal path (default {DEFAULT_JOURNAL_PATH})")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted run, skipping projects finished in the journal")
+    parser.add_argument("--refresh", action="store_true",
+                        help="re-fetch only projects whose metadata changed since the last run "
+                             "(see --state); everything else is kept from the existing outputs")
+    parser.add_argument("--state", default=DEFAULT_STATE_PATH,
+                        help=f"dataset state of the last run, for --refresh (default {DEFAULT_STATE_PATH})")
+    parser.add_argument("--shard", type=parse_shard, default=None, metavar="I/N",
+                        help="fetch only shard I of N (hash-balanced) into a partial file; "
+                             "combine the N partials with: python sharding.py merge")
+    parser.add_argument("--shard-dir", default=DEFAULT_SHARD_DIR,
+                        help=f"directory for the shard partial files (default {DEFAULT_SHARD_DIR})")
+    parser.add_argument("--columnar", choices=COLUMNAR_FORMATS + ("none",), default=PARQUET,
+                        help="also write the instructor key as Parquet (default) or Arrow IPC; "
+                             "needs pyarrow, skipped if it is not installed")
+    parser.add_argument("--trace", default=DEFAULT_TRACE_PATH,
+                        help=f"write the per-stage timing trace here (default {DEFAULT_TRACE_PATH})")
+    parser.add_argument("--profile", nargs="?", const=DEFAULT_PROFILE_PATH, default=None, metavar="PATH",
+                        help=f"run under cProfile and save the stats (default path {DEFAULT_PROFILE_PATH})")
+    parser.add_argument("--dedup", choices=("off",) + DEDUP_MODES, default=FLAG,
+                        help="near-duplicate descriptions: mark them (flag, default), "
+                             "drop them from the student file and key (collapse) or ignore them (off)")
+    parser.add_argument("--dedup-threshold", type=jaccard_threshold, default=DEFAULT_THRESHOLD,
+                        help=f"estimated Jaccard similarity that counts as a near-duplicate "
+                             f"(default {DEFAULT_THRESHOLD})")
+    return parser.parse_args(argv)
+
+
+def run(args):
+    """Run a collection with parsed command line options.
+
+    Records are streamed to the student file, instructor key and metadata
+    log as each fetch completes, so nothing is held in memory and partial
+    output survives an interrupted run.
+    """
+    metrics = RunMetrics()
+    
     print("\n" + "=" * 80)
     print("NFT DESCRIPTION FETCHER FOR AXIAL CODING CHALLENGE")
     print("=" * 80)
     
-    # Fetch descriptions from both categories
-    category_a_descriptions = fetch_descriptions(CATEGORY_A_ANIMAL_APE, "CATEGORY_A_ANIMAL_APE")
-    category_b_descriptions = fetch_descriptions(CATEGORY_B_FANTASY_ART, "CATEGORY_B_FANTASY_ART")
+    try:
+        categories = load_project_lists(args.projects)
+    except (OSError, ValueError) as e:
+        print(f"\n✗ Cannot read project lists: {e}")
+        return
+    if categories is None:
+        categories = {
+            "CATEGORY_A_ANIMAL_APE": CATEGORY_A_ANIMAL_APE,
+            "CATEGORY_B_FANTASY_ART": CATEGORY_B_FANTASY_ART,
+        }
+    else:
+        print(f"\nProject lists: {args.projects}")
+    if args.shard and args.refresh:
+        print("\n✗ --refresh cannot be combined with --shard")
+        return
+    cache = None if args.no_cache else MetadataCache(args.cache_dir)
+    
+    coded = [project for projects in categories.values() for project in projects]
+    if args.shard:
+        # Codes are issued by the merge, from the registry on the merging machine
+        registry = CodeRegistry()
+        all_categories = categories
+        categories = select_shard(categories, *args.shard)
+        args.journal = shard_path(args.journal, *args.shard)
+        args.trace = shard_path(args.trace, *args.shard)
+        print(f"\nShard {args.shard[0]}/{args.shard[1]}: "
+              f"{sum(len(projects) for projects in categories.values())} of {len(coded)} projects")
+    else:
+        try:
+            registry = CodeRegistry(args.code_registry)
+        except (OSError, ValueError) as e:
+            print(f"\n✗ Cannot read code registry: {e}")
+            return
+        known = len(registry)
+        with metrics.stage("assign_codes"):
+            registry.assign(coded)
+            registry.save()
+        print(f"\nCodes: {len(registry) - known} new, {known} reused from {args.code_registry}")
     
-    # Combine all descriptions
-    all_descriptions = category_a_descriptions + category_b_descriptions
+    student_file = "student_descriptions.txt"
+    instructor_key = "instructor_key.json"
+    metadata_log = "collection_metadata.txt"
+    stats_summary = "collection_stats.json"
     
-    if not all_descriptions:
-        print("\n✗ No descriptions were fetched. Check dataset access.")
+    state = None
+    if args.refresh:
+        if args.resume:
+            print("\n✗ --refresh cannot be combined with --resume")
+            return
+        state = read_state(args.state)
+        if state is None:
+            print(f"\n⚠️  No collection state at {args.state} - collecting everything")
+    
+    if args.resume and os.path.exists(args.journal):
+        try:
+            # A resumed run stays on the revision the journal was started with
+            journal = RunJournal(args.journal, None, categories, resume=True)
+        except JournalMismatchError as e:
+            print(f"\n✗ Cannot resume from {args.journal}: {e}")
+            print("Run again without --resume to start over.")
+            return
+        revision = journal.revision
+        counts = journal.counts()
+        print(f"\n↻ Resuming from {args.journal}: {counts[SUCCESS]} succeeded, "
+              f"{counts[NO_DESCRIPTION]} without description, {counts[ERROR]} to retry")
+    else:
+        if args.resume:
+            print(f"\n⚠️  No journal at {args.journal} - starting a fresh run")
+        try:
+            with metrics.stage("resolve_revision"):
+                # A refresh must see where the branch points now, not a cached answer
+                revision = resolve_revision(args.revision, get_hf_token(), None if state else cache)
+        except Exception as e:
+            print(f"\n✗ Could not resolve dataset revision '{args.revision}': {e}")
+            return
+        if (state is not None and is_current(state, revision, categories)
+                and os.path.exists(student_file) and os.path.exists(instructor_key)):
+            print(f"\n✓ Up to date: {student_file} and {instructor_key} were built from revision {revision}")
+            return
+        journal = RunJournal(args.journal, revision, categories)
+    print(f"\nDataset revision: {revision}")
+    
+    plan = None
+    blob_ids = None
+    previous = {}
+    if state is not None:
+        paths = {metadata_path(project): project for projects in categories.values() for project in projects}
+        try:
+            with metrics.stage("list_blobs"):
+                listed = list_blob_ids(list(paths), revision, get_hf_token())
+        except Exception as e:
+            print(f"\n✗ Could not list dataset files: {e}")
+            journal.close()
+            return
+        blob_ids = {paths[path]: blob_id for path, blob_id in listed.items()}
+        previous = read_key_records(instructor_key)
+        plan = plan_refresh(state, categories, blob_ids, previous.keys())
+        fetch_count = sum(len(projects) for projects in plan.fetch.values())
+        print(f"\n↻ Refreshing from revision {state['revision']}: {fetch_count} new or changed, "
+              f"{len(plan.reuse)} unchanged, {len(plan.removed)} no longer in the dataset")
+        for project in plan.removed:
+            print(f"✗ Not in dataset: {project}")
+    
+    missing = set()
+    if plan is not None:
+        missing = {project for projects in categories.values() for project in projects if project not in blob_ids}
+    elif HF in args.sources:
+        finished = {name: journal.finished(name) for name in categories}
+        blob_ids = {}
+        with metrics.stage("preflight"):
+            missing = preflight(
+                {name: [p for p in projects if p not in finished[name]] for name, projects in categories.items()},
+                revision, get_hf_token(), cache, blob_ids,
+            )
+        # Cached and resumed projects are not listed, so the blob ids are only complete on a cold run
+        if not all(p in blob_ids or p in missing for projects in categories.values() for p in projects):
+            blob_ids = None
+    try:
+        sources = build_sources(args.sources, revision, cache, missing, args.workers, args.timeout,
+                                args.retries, args.local_dir)
+    except ValueError as e:
+        print(f"\n✗ {e}")
         return
     
-    # Category counts
-    category_counts = {
-        "CATEGORY_A_ANIMAL_APE": len(category_a_descriptions),
-        "CATEGORY_B_FANTASY_ART": len(category_b_descriptions),
-    }
+    fetch_options = dict(revision=revision, cache=cache, journal=journal, missing=missing, metrics=metrics,
+                         registry=registry, sources=sources)
     
-    print(f"\n{'='*60}")
-    print(f"SUMMARY")
-    print(f"{'='*60}")
-    print(f"Total descriptions: {len(all_descriptions)}")
-    print(f"  Category A (Animal/Ape): {category_counts['CATEGORY_A_ANIMAL_APE']}")
-    print(f"  Category B (Fantasy/Art): {category_counts['CATEGORY_B_FANTASY_ART']}")
+    detector = None if args.dedup == "off" else NearDuplicateDetector(args.dedup_threshold, args.dedup)
+    
+    token_text = None
+    if args.token_phrases:
+        if not args.local_dir:
+            print("\n✗ --token-phrases needs --local-dir")
+            return
+        from token_text import TokenTextSummarizer
+        try:
+            token_text = TokenTextSummarizer(args.local_dir, top_k=args.token_phrases)
+        except ValueError as e:
+            print(f"\n✗ {e}")
+            return
+    
+    traits = None
+    if args.trait_stats and not args.shard:
+        if not args.local_dir:
+            print("\n✗ --trait-stats needs --local-dir")
+            return
+        from trait_stats import TraitAggregator
+        try:
+            traits = TraitAggregator(args.local_dir, args.trait_stats)
+        except ValueError as e:
+            print(f"\n✗ {e}")
+            return
+    
+    source_lines = log_source_lines(revision)
+    if plan is not None:
+        source_lines.append(f"Refreshed from revision {state['revision']}: {fetch_count} projects re-fetched, "
+                            f"{len(plan.reuse)} kept")
+    columnar = None
+    if args.columnar != "none" and not args.shard:
+        if columnar_available():
+            columnar = ColumnarKeyWriter(columnar_path(instructor_key, args.columnar), args.columnar, revision)
+        else:
+            print(f"\n⚠️  pyarrow not installed - skipping the {args.columnar} export of {instructor_key}")
+    
+    # Fetch descriptions from both categories, writing each as it arrives
+    if args.shard:
+        writer = ShardWriter(args.shard_dir, *args.shard, revision, all_categories, coded, source_lines,
+                             STUDENT_INSTRUCTIONS, options={"dedup": args.dedup,
+                                                            "dedup_threshold": args.dedup_threshold,
+                                                            "columnar": args.columnar})
+    else:
+        writer = CollectionWriter(student_file, instructor_key, metadata_log,
+                                  source_lines=source_lines,
+                                  categories=categories.keys(),
+                                  summary_path=stats_summary,
+                                  detector=detector,
+                                  columnar=columnar,
+                                  traits=traits)
+    with writer:
+        for category_name, projects in categories.items():
+            if plan is None:
+                items = iter_descriptions(projects, category_name, **fetch_options)
+            else:
+                items = iter_refreshed(projects, category_name, plan, previous, **fetch_options)
+            if token_text is not None:
+                items = token_text.annotate(items, metrics)
+            for item in items:
+                with metrics.stage("write"):
+                    writer.write(item)
+    category_counts = writer.category_counts
+    journal.close()
+    # Outside --refresh the state is only written when the blob ids are already
+    # known, so a warm run never has to ask the Hub for them
+    state_saved = False
+    if not args.shard and (blob_ids is not None or args.refresh):
+        try:
+            with metrics.stage("save_state"):
+                save_state(args.state, revision, categories, journal, blob_ids, get_hf_token())
+            state_saved = True
+        except Exception as e:
+            print(f"\n⚠️  Could not save the collection state ({e}); the next --refresh will collect everything")
+    if token_text is not None:
+        token_text.close()
+        metrics.count("token_files", token_text.files_read)
+    if traits is not None:
+        metrics.count("trait_files", traits.files_read)
+    
+    if cache is not None:
+        print(f"\nMetadata cache: {cache.hits} hits, {cache.misses} misses")
+        metrics.count("cache_hits", cache.hits)
+        metrics.count("cache_misses", cache.misses)
+        cache.evict()
+        cache.close()
+    
+    if args.shard:
+        metrics.finish()
+        metrics.write_trace(args.trace)
+        print(f"\n✓ Shard {args.shard[0]}/{args.shard[1]}: {writer.total} descriptions in {writer.output_path}")
+        merge_options = ""
+        if args.trait_stats:
+            merge_options = f" --trait-stats {args.trait_stats} --local-dir {args.local_dir or '<checkout>'}"
+        print(f"Once every shard has finished, combine them with: python sharding.py merge {args.shard_dir}"
+              f"{merge_options}")
+        return
+    
+    if not writer.total:
+        print("\n✗ No descriptions were fetched. Check dataset access.")
+        metrics.finish()
+        metrics.write_trace(args.trace)
+        return
     
-    # Create output files
     print(f"\n{'='*60}")
-    print("Creating output files...")
+    print(f"SUMMARY")
     print(f"{'='*60}")
+    print(f"Total descriptions: {writer.total}")
+    for category_name, count in category_counts.items():
+        print(f"  {category_name}: {count}")
     
-    student_file = create_student_file(
-        all_descriptions, 
-        "student_descriptions.txt"
-    )
+    # Check the two categories actually separate before anyone codes them
+    from cluster_validation import format_report as format_cluster_report, validate as validate_clusters, verdict
+    with open(instructor_key, 'r', encoding='utf-8') as f:
+        key_records = json.load(f)
+    with metrics.stage("validate"):
+        report = validate_clusters(key_records)
+    print(f"\nCluster check (TF-IDF clustering vs. categories):")
+    for line in format_cluster_report(report):
+        print(f"  {line}" if line else "")
+    if not verdict(report):
+        print("⚠️  The categories do not separate cleanly - consider revising the project lists")
     
-    instructor_key = create_instructor_key(
-        all_descriptions,
-        "instructor_key.json"
-    )
+    if args.cohorts:
+        with metrics.stage("cohorts"):
+            cohort_names = build_cohorts(key_records, args.cohorts, args.cohort_dir, args.code_registry)
+        print(f"\n✓ Built {len(cohort_names)} cohort packages in {args.cohort_dir}/ "
+              f"({cohort_names[0]} ... {cohort_names[-1]}, each with its own codes and order)")
     
-    metadata_log = create_metadata_log(
-        all_descriptions,
-        category_counts,
-        "collection_metadata.txt"
-    )
+    metrics.finish()
+    metrics.append_to_log(metadata_log)
+    metrics.write_trace(args.trace)
+    print(f"\nRun timing (also in {metadata_log}, full trace in {args.trace}):")
+    for line in metrics.format_summary():
+        print(f"  {line}" if line else "")
     
     print(f"\n{'='*60}")
     print("✓ COMPLETE!")
     print(f"{'='*60}")
     print("\nFiles created:")
-    print(f"1. {student_file} - Give this to students")
-    print(f"2. {instructor_key} - Keep for reference")
-    print(f"3. {metadata_log} - Documents what was collected")
-    print("\nExpected outcome: Students should identify 2 distinct clusters")
+    files = [
+        (student_file, "Give this to students"),
+        (instructor_key, "Keep for reference"),
+        (metadata_log, "Documents what was collected"),
+        (stats_summary, "Corpus statistics (JSON)"),
+    ]
+    if columnar is not None:
+        files.append((columnar.output_path, "Instructor key in columnar form"))
+    files.append((args.trace, "Per-stage timing trace (JSON)"))
+    if state_saved:
+        files.append((args.state, "Dataset revision and file hashes for --refresh"))
+    files.append((args.code_registry, "Code keys and codes - keep private"))
+    if args.cohorts:
+        files.append((f"{args.cohort_dir}/", f"{args.cohorts} cohort packages (student file + instructor key each)"))
+    for number, (path, note) in enumerate(files, 1):
+        print(f"{number}. {path} - {note}")
+    print(f"\nExpected outcome: Students should identify {len(category_counts)} distinct clusters")
     print("through axial coding based on content themes.\n")
 
 
+def main(argv=None):
+    """Main execution function."""
+    args = parse_args(argv)
+    if args.profile:
+        return profile_call(run, args, stats_path=args.profile)
+    return run(args)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,351 @@
+"""
+Asyncio fetch engine with pluggable metadata sources.
+
+The two fetch scripts differ only in where metadata comes from: the Hugging
+Face Hub (hf_hub_download), NFT-NET-Hub (NFT1000.query) or, for
+extract_nft_descriptions.py, a local checkout. Each of these is a Source
+here, and FetchEngine fetches a project list through any mix of them:
+
+- every source declares how many requests it may have in flight; the engine
+  enforces that with one asyncio.Semaphore per source and runs the blocking
+  calls on a thread pool sized to the sum of the limits
+- for each project the sources are tried fastest first, ranked by an
+  exponential moving average of their observed latency (a declared hint
+  until the first answer). A project that one source lacks (ProjectNotFound)
+  or fails on falls back to the next one
+- a source that fails max_failures times in a row is dropped for the rest
+  of the run, so a dead backend stops costing a timeout per project
+- a record fetched from one source is offered to the others (remember()),
+  which is how the metadata cache fills up
+
+Results come back in project order, as soon as each is ready, so the
+scripts can keep streaming records to their output files. asyncio and the
+thread pool are only imported when fetch_all() runs, so importing this module
+(for the fetch scripts' options) stays cheap.
+
+The cache counts as a source (CacheSource), which is how the engine
+serves cached records.
+"""
+
+import argparse
+import sys
+import threading
+import time
+from collections import Counter, namedtuple
+from pathlib import Path
+
+from extract_nft_descriptions import read_project_metadata
+from metadata_cache import MISSING
+from run_metrics import RunMetrics
+
+
+HF = "hf"
+NFTHUB = "nfthub"
+LOCAL = "local"
+SOURCE_NAMES = (HF, NFTHUB, LOCAL)
+
+DEFAULT_MAX_FAILURES = 5
+LATENCY_SMOOTHING = 0.2
+
+NFT_HUB_PATH = Path(__file__).parent / "NFT-NET-Hub" / "nft_net_hub"
+
+FetchResult = namedtuple("FetchResult", "metadata source error")
+
+
+class ProjectNotFound(LookupError):
+    """A source does not have the project (try the next one; not a failure)."""
+
+
+def parse_sources(text):
+    """'local,hf' -> ['local', 'hf'] (the argparse type of --sources)."""
+    names = [name.strip() for name in text.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SOURCE_NAMES]
+    if unknown or not names:
+        raise argparse.ArgumentTypeError(f"unknown source(s) {', '.join(unknown) or repr(text)}; "
+                                         f"choose from {', '.join(SOURCE_NAMES)}")
+    return list(dict.fromkeys(names))
+
+
+class Source:
+    """A place metadata can come from. Subclasses implement fetch()."""
+
+    name = "source"
+    concurrency = 1
+    latency_hint = 0.1
+
+    def __init__(self, concurrency=None):
+        if concurrency:
+            self.concurrency = concurrency
+        self.latency = None
+        self.failures = 0
+        self.disabled = False
+        self.metrics = RunMetrics()
+
+    def expected_latency(self):
+        return self.latency if self.latency is not None else self.latency_hint
+
+    def observe(self, seconds):
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += LATENCY_SMOOTHING * (seconds - self.latency)
+
+    def fetch(self, project):
+        """Return the project's metadata dict; raise ProjectNotFound if it is not here."""
+        raise NotImplementedError
+
+    def remember(self, project, metadata, source):
+        """Called with records other sources fetched (``source`` is the fetching source's name)."""
+
+
+class CacheSource(Source):
+    """Records from the metadata cache for one revision.
+
+    Cached 404s are added to ``missing`` so HubSource does not ask again.
+    With ``accepts``, only records fetched by those sources are stored, so a
+    cache keyed by one revision never holds another source's data; give
+    each such CacheSource its own ``name``.
+    """
+
+    name = "cache"
+    concurrency = 8
+    latency_hint = 0.0
+
+    def __init__(self, cache, revision, missing=None, concurrency=None, accepts=None, name=None):
+        super().__init__(concurrency)
+        self.cache = cache
+        self.revision = revision
+        self.missing = missing if missing is not None else set()
+        self.accepts = accepts
+        if name:
+            self.name = name
+
+    def fetch(self, project):
+        with self.metrics.stage("cache_lookup"):
+            record = self.cache.get(project, self.revision)
+        if record is MISSING:
+            self.missing.add(project)
+            raise ProjectNotFound(f"{project} is not in revision {str(self.revision)[:8]} (cached)")
+        if record is None:
+            raise ProjectNotFound(f"{project} is not cached")
+        return record
+
+    def remember(self, project, metadata, source):
+        if self.accepts is not None and source not in self.accepts:
+            return
+        with self.metrics.stage("cache_store"):
+            self.cache.put(project, self.revision, metadata)
+
+
+class HubSource(Source):
+    """metadata_dashboard.json from the Hugging Face Hub (hf_hub_download)."""
+
+    name = HF
+    concurrency = 8
+    latency_hint = 0.2
+
+    def __init__(self, revision=None, hf_token=None, timeout=None, retries=None, backoff=None,
+                 concurrency=None, cache=None, missing=None):
+        super().__init__(concurrency)
+        self.revision = revision
+        self.hf_token = hf_token
+        self.options = {key: value for key, value in
+                        (("timeout", timeout), ("retries", retries), ("backoff", backoff)) if value is not None}
+        self.cache = cache
+        self.missing = missing if missing is not None else set()
+
+    def fetch(self, project):
+        from huggingface_hub.errors import RemoteEntryNotFoundError
+        from fetch_descriptions_for_coding import download_metadata
+
+        if project in self.missing:
+            raise ProjectNotFound(f"{project} is not in the dataset listing")
+        try:
+            return download_metadata(project, self.hf_token, revision=self.revision,
+                                     metrics=self.metrics, **self.options)
+        except RemoteEntryNotFoundError as e:
+            if self.cache is not None and self.revision:
+                self.cache.put_missing(project, self.revision)
+            raise ProjectNotFound(str(e)) from e
+
+
+def import_nft1000():
+    """Import NFT-NET-Hub's NFT1000 class from its checkout next to this file.
+
+    Deferred until a query is needed: NFT-NET-Hub pulls in pandas and thefuzz.
+    """
+    if str(NFT_HUB_PATH) not in sys.path:
+        sys.path.insert(0, str(NFT_HUB_PATH))
+    from utils.downloader import NFT1000
+    return NFT1000
+
+
+def load_nft1000(local_repo_path=None):
+    """Create an NFT1000 for query-only use."""
+    return import_nft1000()("NFT1000", str(local_repo_path or Path.cwd().absolute()))
+
+
+class NftHubSource(Source):
+    """Metadata from NFT-NET-Hub's NFT1000.query().
+
+    The NFT1000 object is created on first use (with ``factory``, default
+    load_nft1000) unless one is given. query() is not known to be
+    thread-safe, so one request is in flight by default.
+    """
+
+    name = NFTHUB
+    concurrency = 1
+    latency_hint = 0.1
+
+    def __init__(self, nft1000=None, factory=load_nft1000, concurrency=None):
+        super().__init__(concurrency)
+        self.nft1000 = nft1000
+        self.factory = factory
+        self._lock = threading.Lock()
+
+    def _client(self):
+        with self._lock:
+            if self.nft1000 is None:
+                self.nft1000 = self.factory()
+                if self.nft1000 is None:
+                    raise RuntimeError("NFT-NET-Hub could not be initialized")
+            return self.nft1000
+
+    def fetch(self, project):
+        client = self._client()
+        try:
+            with self.metrics.stage("query"):
+                metadata = client.query(project)
+        except Exception as e:
+            if "do you mean" in str(e).lower():
+                raise ProjectNotFound(str(e)) from e
+            raise
+        if not metadata or not isinstance(metadata, dict):
+            raise ValueError("no metadata returned")
+        return metadata
+
+
+class LocalSource(Source):
+    """metadata_dashboard.json files from a local NFT-Net checkout."""
+
+    name = LOCAL
+    concurrency = 16
+    latency_hint = 0.001
+
+    def __init__(self, dataset_path, concurrency=None):
+        super().__init__(concurrency)
+        path = Path(dataset_path)
+        self.nft1000_path = path / "NFT1000" if (path / "NFT1000").is_dir() else path
+        if not self.nft1000_path.is_dir():
+            raise ValueError(f"{dataset_path} is not a directory containing NFT1000/")
+
+    def fetch(self, project):
+        with self.metrics.stage("read"):
+            metadata, error = read_project_metadata(str(self.nft1000_path / project))
+        if error == "missing":
+            raise ProjectNotFound(f"{project} is not in {self.nft1000_path}")
+        if error is not None:
+            raise OSError(error)
+        return metadata
+
+
+class FetchEngine:
+    """Fetch projects through several sources with per-source limits and fallback."""
+
+    def __init__(self, sources, metrics=None, max_failures=DEFAULT_MAX_FAILURES):
+        if not sources:
+            raise ValueError("FetchEngine needs at least one source")
+        self.sources = list(sources)
+        self.metrics = metrics if metrics is not None else RunMetrics()
+        self.max_failures = max_failures
+        self.served = Counter()
+        for source in self.sources:
+            source.metrics = self.metrics
+
+    def ranked(self):
+        """Usable sources, fastest first."""
+        return sorted((source for source in self.sources if not source.disabled),
+                      key=lambda source: source.expected_latency())
+
+    def _attempt(self, source, project, record):
+        # Runs on a worker thread; stages are attributed to the project's record
+        with self.metrics.bind(record):
+            start = time.perf_counter()
+            try:
+                metadata = source.fetch(project)
+            except ProjectNotFound:
+                # A miss still tells us how quickly the source answers
+                source.observe(time.perf_counter() - start)
+                raise
+            source.observe(time.perf_counter() - start)
+            for other in self.sources:
+                if other is not source:
+                    other.remember(project, metadata, source.name)
+        return metadata
+
+    def _failed(self, source, error):
+        source.failures += 1
+        if source.failures >= self.max_failures and not source.disabled:
+            source.disabled = True
+            print(f"⚠️  Not using source '{source.name}' for the rest of the run after "
+                  f"{source.failures} consecutive errors (last: {error})")
+
+    async def _fetch(self, project, category, loop, limits, executor):
+        with self.metrics.project(project, category) as record:
+            errors = []
+            for source in self.ranked():
+                async with limits[source.name]:
+                    try:
+                        metadata = await loop.run_in_executor(executor, self._attempt, source, project, record)
+                    except ProjectNotFound as e:
+                        errors.append((source, e))
+                        continue
+                    except Exception as e:
+                        errors.append((source, e))
+                        self._failed(source, e)
+                        continue
+                source.failures = 0
+                self.served[source.name] += 1
+                record["source"] = source.name
+                record["status"] = "ok"
+                return FetchResult(metadata, source.name, None)
+
+            error = _combine(project, errors)
+            record["source"] = errors[-1][0].name if errors else None
+            record["status"] = type(error).__name__
+            return FetchResult(None, None, error)
+
+    def fetch_all(self, projects, category=None):
+        """Yield a FetchResult per project, in order, as each becomes ready."""
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        projects = list(projects)
+        if not projects:
+            return
+        loop = asyncio.new_event_loop()
+        executor = ThreadPoolExecutor(max_workers=sum(source.concurrency for source in self.sources))
+        limits = {source.name: asyncio.Semaphore(source.concurrency) for source in self.sources}
+        tasks = [loop.create_task(self._fetch(project, category, loop, limits, executor)) for project in projects]
+        try:
+            for task in tasks:
+                # Running the loop for one task also advances all the others
+                yield loop.run_until_complete(task)
+        finally:
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.close()
+            executor.shutdown(wait=True)
+
+
+def _combine(project, errors):
+    """One error for a project every source failed on."""
+    if not errors:
+        return RuntimeError(f"no source available for {project}")
+    if len(errors) == 1:
+        return errors[0][1]
+    details = "; ".join(f"{source.name}: {error}" for source, error in errors)
+    if all(isinstance(error, ProjectNotFound) for _, error in errors):
+        return ProjectNotFound(details)
+    return RuntimeError(details)
@@ -3,29 +3,66 @@ Script to fetch NFT descriptions for axial coding challenge using NFT-NET-Hub.
 
 This follows the NFT-NET-Hub conventions and uses their query() method
 to fetch metadata only (no full ZIP downloads).
+
+NFT-NET-Hub (with its pandas stack) is only imported once a run actually
+needs to query it, so --help and fully cached runs start quickly.
 """
 
+import argparse
 import json
 import hashlib
-import sys
+import subprocess
 import os
-from datetime import datetime
 from pathlib import Path
 
-# Add NFT-NET-Hub to Python path
-nft_hub_path = Path(__file__).parent / "NFT-NET-Hub" / "nft_net_hub"
-sys.path.insert(0, str(nft_hub_path))
+from code_registry import DEFAULT_REGISTRY_PATH, CodeRegistry
+from cohorts import DEFAULT_COHORT_DIR, build_cohorts, cohort_count
+from columnar_export import (
+    FORMATS as COLUMNAR_FORMATS,
+    PARQUET,
+    ColumnarKeyWriter,
+    available as columnar_available,
+    output_path as columnar_path,
+)
+from fetch_engine import (
+    HF,
+    LOCAL,
+    NFTHUB,
+    CacheSource,
+    FetchEngine,
+    HubSource,
+    NFT_HUB_PATH,
+    LocalSource,
+    NftHubSource,
+    import_nft1000,
+    parse_sources,
+)
+from metadata_cache import DEFAULT_CACHE_DIR, MetadataCache
+from near_duplicates import DEFAULT_THRESHOLD, FLAG, MODES as DEDUP_MODES, NearDuplicateDetector, jaccard_threshold
+from output_writers import (
+    STUDENT_INSTRUCTIONS as BASE_INSTRUCTIONS,
+    CollectionWriter,
+    InstructorKeyWriter,
+    MetadataLogWriter,
+    StudentFileWriter,
+)
+from project_lists import DEFAULT_PROJECT_LIST_PATH, load_project_lists
+from run_journal import (
+    DEFAULT_JOURNAL_PATH,
+    ERROR,
+    NO_DESCRIPTION,
+    SUCCESS,
+    JournalMismatchError,
+    RunJournal,
+)
+from run_metrics import DEFAULT_PROFILE_PATH, DEFAULT_TRACE_PATH, RunMetrics, profile_call
+from sharding import DEFAULT_SHARD_DIR, ShardWriter, parse_shard, select_shard, shard_path
+from trait_stats import DEFAULT_STORE_PATH as DEFAULT_TRAIT_STORE_PATH
+
 
-try:
-    from utils.downloader import NFT1000
-except ImportError:
-    print("❌ Error: NFT-NET-Hub not found!")
-    print("\nPlease run:")
-    print("  git clone https://github.com/ShuxunoO/NFT-NET-Hub.git")
-    print("  cd NFT-NET-Hub")
-    print("  pip install -r requirements.txt")
-    print("\nThen run this script again.")
-    sys.exit(1)
+STUDENT_INSTRUCTIONS = BASE_INSTRUCTIONS + [
+    "Look for patterns, themes, and relationships between descriptions.",
+]
 
 
 # Two distinct categories for expected clustering
@@ -65,77 +102,184 @@ CATEGORY_B_FANTASY_ART = [
 ]
 
 
-def generate_code(project_name, index):
-    """Generate alphanumeric code for anonymization."""
-    hash_input = f"{project_name}{index}".encode()
-    hash_digest = hashlib.md5(hash_input).hexdigest()
-    return f"NFT{hash_digest[:8].upper()}"
+def get_hub_revision():
+    """Return the NFT-NET-Hub commit whose bundled metadata query() reads."""
+    try:
+        if not (NFT_HUB_PATH.parent / ".git").exists():
+            raise OSError("NFT-NET-Hub is not a git checkout")
+        result = subprocess.run(
+            ["git", "-C", str(NFT_HUB_PATH.parent), "rev-parse", "HEAD"],
+            capture_output=True, text=True, check=True,
+        )
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    
+    # Not a git checkout: fall back to hashing the bundled metadata file
+    info_file = NFT_HUB_PATH / "info" / "NFT1000.json"
+    if info_file.exists():
+        return hashlib.sha1(info_file.read_bytes()).hexdigest()
+    return "unknown"
 
 
-def fetch_descriptions(nft1000, projects, category_name):
-    """Fetch descriptions using NFT-NET-Hub query method."""
-    descriptions = []
+def init_nft1000():
+    """Initialize NFT1000 following their pattern (None if that fails)."""
+    print("\n🔧 Initializing NFT1000...")
+    try:
+        NFT1000 = import_nft1000()
+    except ImportError as e:
+        print(f"❌ Error: NFT-NET-Hub could not be imported ({e})")
+        print("\nPlease run:")
+        print("  git clone https://github.com/ShuxunoO/NFT-NET-Hub.git")
+        print("  cd NFT-NET-Hub")
+        print("  pip install -r requirements.txt")
+        print("\nThen run this script again.")
+        return None
+    # For query-only operations, the local_repo_path can be current directory
+    local_repo_path = str(Path.cwd().absolute())
+    
+    try:
+        nft1000 = NFT1000("NFT1000", local_repo_path)
+        print("✓ NFT1000 initialized successfully")
+        return nft1000
+    except Exception as e:
+        print(f"❌ Failed to initialize NFT1000: {e}")
+        print("Make sure you have access to the NFT-Net dataset on Hugging Face")
+        return None
+
+
+def resolve_categories(name_index, categories):
+    """Resolve all category project names in one batch.
+
+    Returns the categories with names replaced by their dataset spelling, and
+    {name: Resolution} for names that could not be resolved (these keep their
+    list position so codes of the other projects do not shift).
+    """
+    requested = [project for projects in categories.values() for project in projects]
+    resolutions = name_index.resolve_all(requested)
+    
+    print("\n🔍 Resolving project names...")
+    unresolved = {}
+    for name, resolution in resolutions.items():
+        if resolution.match is None:
+            unresolved[name] = resolution
+            suggestions = ", ".join(resolution.suggestions) or "none"
+            print(f"  ? {name} [NOT FOUND - SUGGESTIONS: {suggestions}]")
+        elif resolution.match != name:
+            print(f"  → {name} = {resolution.match} ({resolution.method}, score {resolution.score:.0f})")
+    print(f"✓ {len(resolutions) - len(unresolved)} of {len(resolutions)} names resolved")
+    
+    resolved = {
+        category_name: [resolutions[project].match or project for project in projects]
+        for category_name, projects in categories.items()
+    }
+    return resolved, unresolved
+
+
+def iter_descriptions(nft1000, projects, category_name, revision=None, cache=None, journal=None,
+                      unresolved=None, metrics=None, registry=None, sources=None):
+    """Fetch descriptions using NFT-NET-Hub query method, yielding each record.
+
+    Projects are fetched by a FetchEngine from ``sources`` (default:
+    NFT-NET-Hub through ``nft1000``, created on first use if None).
+    When a ``cache`` is given, records for ``revision`` are served from it and
+    NFT-NET-Hub is only queried for projects not yet cached.
+    When a ``journal`` is given, each outcome is checkpointed to it and
+    projects it already finished are replayed instead of queried.
+    Names in ``unresolved`` (see resolve_categories) are reported and skipped
+    without being queried. Query and cache timings are reported to ``metrics``.
+    Codes come from ``registry`` (a CodeRegistry), so they do not depend on
+    list position.
+    """
+    finished = journal.finished(category_name) if journal is not None else {}
+    metrics = metrics if metrics is not None else RunMetrics()
+    registry = registry if registry is not None else CodeRegistry()
+    unresolved = unresolved or {}
+    if sources is None:
+        sources = [NftHubSource(nft1000, factory=init_nft1000)]
+    show_source = len(sources) > 1
+    if cache is not None:
+        # Records from the Hub are cached under its dataset revision (see run())
+        sources = [CacheSource(cache, revision, accepts=(NFTHUB, LOCAL))] + list(sources)
+    engine = FetchEngine(sources, metrics)
     
     print(f"\n{'='*60}")
     print(f"Fetching {category_name} projects...")
     print(f"{'='*60}")
     
+    results = engine.fetch_all(
+        [project for project in projects if project not in finished and project not in unresolved],
+        category_name,
+    )
     for i, project in enumerate(projects, 1):
-        try:
-            # Use query method - this is the key method from NFT-NET-Hub
-            metadata = nft1000.query(project)
+        if project in finished:
+            item = finished[project].get("record")
+            if item:
+                print(f"✓ {i:2d}. {project:40s} [{len(item['description']):4d} chars] (resumed)")
+                yield item
+            else:
+                print(f"✗ {i:2d}. {project:40s} [NO DESCRIPTION] (resumed)")
+            continue
+        
+        if project in unresolved:
+            suggestions = ", ".join(unresolved[project].suggestions) or "none"
+            print(f"? {i:2d}. {project:40s} [SUGGESTIONS: {suggestions}]")
+            if journal is not None:
+                journal.record(category_name, project, ERROR, error="name not found in NFT1000")
+            continue
+        
+        item = None
+        status, error = ERROR, None
+        metadata, source, fetch_error = next(results)
+        if fetch_error is None:
+            description = metadata.get("description", "")
             
-            if metadata and isinstance(metadata, dict):
-                description = metadata.get("description", "")
+            if description and description.strip():
+                code = registry.code(project)
                 
-                if description and description.strip():
-                    code = generate_code(project, i)
-                    
-                    descriptions.append({
-                        "code": code,
-                        "description": description,
-                        "project_name": project,
-                        "category": category_name,
-                        "total_supply": metadata.get("total_supply", "Unknown"),
-                        "contract_address": metadata.get("contract_address", ""),
-                        "official_url": metadata.get("official_url", ""),
-                        "opensea_url": metadata.get("opensea_url", ""),
-                    })
-                    
-                    print(f"✓ {i:2d}. {project:40s} [{len(description):4d} chars]")
-                else:
-                    print(f"✗ {i:2d}. {project:40s} [NO DESCRIPTION]")
-            else:
-                print(f"✗ {i:2d}. {project:40s} [NO METADATA RETURNED]")
+                item = {
+                    "code": code,
+                    "description": description,
+                    "project_name": project,
+                    "category": category_name,
+                    "total_supply": metadata.get("total_supply", "Unknown"),
+                    "contract_address": metadata.get("contract_address", ""),
+                    "official_url": metadata.get("official_url", ""),
+                    "opensea_url": metadata.get("opensea_url", ""),
+                }
                 
-        except Exception as e:
-            error_msg = str(e)
+                print(f"✓ {i:2d}. {project:40s} [{len(description):4d} chars]" + (f" ({source})" if show_source else ""))
+                status = SUCCESS
+            else:
+                print(f"✗ {i:2d}. {project:40s} [NO DESCRIPTION]")
+                status = NO_DESCRIPTION
+        else:
+            error_msg = error = str(fetch_error)
             if "do you mean" in error_msg.lower():
                 # Extract suggestions from NFT-NET-Hub error message
-                print(f"? {i:2d}. {project:40s} [SUGGESTIONS: {error_msg.split('do you mean')[1].strip()}]")
+                suggestions = error_msg.split('do you mean')[1].split(";")[0].strip()
+                print(f"? {i:2d}. {project:40s} [SUGGESTIONS: {suggestions}]")
+            elif error_msg == "no metadata returned":
+                print(f"✗ {i:2d}. {project:40s} [NO METADATA RETURNED]")
             else:
                 print(f"✗ {i:2d}. {project:40s} [ERROR: {error_msg}]")
-    
-    return descriptions
+        
+        if journal is not None:
+            journal.record(category_name, project, status, record=item, error=error)
+        if item is not None:
+            yield item
+
+
+def fetch_descriptions(nft1000, projects, category_name, revision=None, cache=None):
+    """Fetch descriptions using NFT-NET-Hub query method."""
+    return list(iter_descriptions(nft1000, projects, category_name, revision, cache))
 
 
 def create_student_file(all_descriptions, output_path):
     """Create anonymized file for students with codes only."""
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write("NFT PROJECT DESCRIPTIONS - AXIAL CODING CHALLENGE\n")
-        f.write("=" * 80 + "\n\n")
-        f.write("Instructions:\n")
-        f.write("Read through these descriptions and perform axial coding.\n")
-        f.write("Each description has a unique code (e.g., NFT12ABC345).\n")
-        f.write("Use these codes when referring to specific items.\n")
-        f.write("Look for patterns, themes, and relationships between descriptions.\n")
-        f.write("\n" + "=" * 80 + "\n\n")
-        
+    with StudentFileWriter(output_path, STUDENT_INSTRUCTIONS) as writer:
         for item in all_descriptions:
-            f.write(f"CODE: {item['code']}\n")
-            f.write("-" * 80 + "\n")
-            f.write(f"{item['description']}\n")
-            f.write("\n" + "=" * 80 + "\n\n")
+            writer.write(item)
     
     print(f"\n✓ Created student file: {output_path}")
     return output_path
@@ -143,67 +287,108 @@ def create_student_file(all_descriptions, output_path):
 
 def create_instructor_key(all_descriptions, output_path):
     """Create instructor key mapping codes to projects."""
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(all_descriptions, f, indent=2, ensure_ascii=False)
+    with InstructorKeyWriter(output_path) as writer:
+        for item in all_descriptions:
+            writer.write(item)
     
     print(f"✓ Created instructor key: {output_path}")
     return output_path
 
 
-def create_metadata_log(all_descriptions, category_counts, output_path):
-    """Create metadata log documenting the data collection."""
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write("DATA COLLECTION LOG\n")
-        f.write("=" * 80 + "\n\n")
-        
-        f.write(f"Collection Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"Dataset Source: Hugging Face - shuxunoo/NFT-Net (NFT1000)\n")
-        f.write(f"Method: NFT-NET-Hub query() method - metadata only\n")
-        f.write(f"Tool: https://github.com/ShuxunoO/NFT-NET-Hub\n")
-        f.write(f"Total Descriptions Collected: {len(all_descriptions)}\n\n")
-        
-        f.write("CATEGORY BREAKDOWN:\n")
-        f.write("-" * 80 + "\n")
-        for category, count in category_counts.items():
-            f.write(f"{category}: {count} descriptions\n")
-        
-        f.write("\n\nDESCRIPTION STATISTICS:\n")
-        f.write("-" * 80 + "\n")
-        lengths = [len(d['description']) for d in all_descriptions]
-        if lengths:
-            f.write(f"Total characters: {sum(lengths):,}\n")
-            f.write(f"Average length: {sum(lengths) // len(lengths):,} characters\n")
-            f.write(f"Shortest: {min(lengths):,} characters\n")
-            f.write(f"Longest: {max(lengths):,} characters\n")
-            
-            estimated_pages = sum(lengths) / 3000
-            f.write(f"\nEstimated pages (3000 chars/page): {estimated_pages:.1f} pages\n")
-        else:
-            f.write("No descriptions collected.\n")
-        
-        f.write("\n\nPROJECTS COLLECTED:\n")
-        f.write("-" * 80 + "\n")
-        
-        for category in category_counts.keys():
-            f.write(f"\n{category}:\n")
-            category_items = [d for d in all_descriptions if d['category'] == category]
-            for item in category_items:
-                f.write(f"  - {item['code']}: {item['project_name']}\n")
+def log_source_lines(revision=None, hf_revision=None):
+    """Describe where the data came from, for the metadata log header."""
+    lines = [
+        "Dataset Source: Hugging Face - shuxunoo/NFT-Net (NFT1000)",
+        "Method: NFT-NET-Hub query() method - metadata only",
+        "Tool: https://github.com/ShuxunoO/NFT-NET-Hub",
+    ]
+    if revision:
+        lines.append(f"NFT-NET-Hub Revision: {revision}")
+    if hf_revision:
+        lines.append(f"Dataset Revision (hf source): {hf_revision}")
+    return lines
+
+
+def create_metadata_log(all_descriptions, category_counts, output_path, revision=None, traits=None):
+    """Create metadata log documenting the data collection (with trait statistics from a TraitAggregator)."""
+    with MetadataLogWriter(output_path, log_source_lines(revision), category_counts.keys(),
+                           traits=traits) as writer:
+        for item in all_descriptions:
+            writer.write(item)
     
     print(f"✓ Created metadata log: {output_path}")
     return output_path
 
 
-def main():
-    """Main execution function following NFT-NET-Hub conventions."""
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Fetch NFT descriptions using NFT-NET-Hub query().")
+    parser.add_argument("--projects", default=DEFAULT_PROJECT_LIST_PATH,
+                        help=f"project list file from select_projects.py; the built-in lists are used "
+                             f"if it does not exist (default {DEFAULT_PROJECT_LIST_PATH})")
+    parser.add_argument("--sources", type=parse_sources, default=[NFTHUB], metavar="LIST",
+                        help=f"comma-separated metadata sources ({', '.join((NFTHUB, HF, LOCAL))}); each project "
+                             f"is fetched from the fastest one that has it (default {NFTHUB})")
+    parser.add_argument("--local-dir", default=None,
+                        help="NFT-Net checkout (containing NFT1000/) for the local source")
+    parser.add_argument("--token-phrases", type=int, metavar="K", default=0,
+                        help="add the K most frequent phrases of each project's captions/ and prompts/ "
+                             "(from --local-dir) to the instructor key")
+    parser.add_argument("--trait-stats", nargs="?", const=DEFAULT_TRAIT_STORE_PATH, default=None, metavar="PATH",
+                        help=f"add trait frequency and rarity figures from each project's metadata/ (from "
+                             f"--local-dir) to the metadata log, keeping the counts in PATH so later runs "
+                             f"only rescan changed projects (default {DEFAULT_TRAIT_STORE_PATH})")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR),
+                        help=f"metadata cache directory (default {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always query NFT-NET-Hub, bypassing the metadata cache")
+    parser.add_argument("--code-registry", default=DEFAULT_REGISTRY_PATH,
+                        help=f"file that keeps each project's code stable across runs "
+                             f"(default {DEFAULT_REGISTRY_PATH})")
+    parser.add_argument("--cohorts", type=cohort_count, metavar="K", default=0,
+                        help="also build K cohort packages, each with its own codes and description order")
+    parser.add_argument("--cohort-dir", default=DEFAULT_COHORT_DIR,
+                        help=f"directory for the cohort packages (default {DEFAULT_COHORT_DIR})")
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL_PATH,
+                        help=f"checkpoint journal path (default {DEFAULT_JOURNAL_PATH})")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted run, skipping projects finished in the journal")
+    parser.add_argument("--shard", type=parse_shard, default=None, metavar="I/N",
+                        help="fetch only shard I of N (hash-balanced) into a partial file; "
+                             "combine the N partials with: python sharding.py merge")
+    parser.add_argument("--shard-dir", default=DEFAULT_SHARD_DIR,
+                        help=f"directory for the shard partial files (default {DEFAULT_SHARD_DIR})")
+    parser.add_argument("--columnar", choices=COLUMNAR_FORMATS + ("none",), default=PARQUET,
+                        help="also write the instructor key as Parquet (default) or Arrow IPC; "
+                             "needs pyarrow, skipped if it is not installed")
+    parser.add_argument("--trace", default=DEFAULT_TRACE_PATH,
+                        help=f"write the per-stage timing trace here (default {DEFAULT_TRACE_PATH})")
+    parser.add_argument("--profile", nargs="?", const=DEFAULT_PROFILE_PATH, default=None, metavar="PATH",
+                        help=f"run under cProfile and save the stats (default path {DEFAULT_PROFILE_PATH})")
+    parser.add_argument("--dedup", choices=("off",) + DEDUP_MODES, default=FLAG,
+                        help="near-duplicate descriptions: mark them (flag, default), "
+                             "drop them from the student file and key (collapse) or ignore them (off)")
+    parser.add_argument("--dedup-threshold", type=jaccard_threshold, default=DEFAULT_THRESHOLD,
+                        help=f"estimated Jaccard similarity that counts as a near-duplicate "
+                             f"(default {DEFAULT_THRESHOLD})")
+    return parser.parse_args(argv)
+
+
+def run(args):
+    """Run a collection following NFT-NET-Hub conventions.
+
+    Records are streamed to the three output files as each query completes.
+    """
+    metrics = RunMetrics()
+    
     print("\n" + "=" * 80)
     print("NFT DESCRIPTION FETCHER FOR AXIAL CODING CHALLENGE")
     print("Using NFT-NET-Hub query method (metadata only, no downloads)")
     print("=" * 80)
     
-    # Check if NFT-NET-Hub directory exists
-    if not nft_hub_path.exists():
-        print(f"\n❌ ERROR: NFT-NET-Hub not found at {nft_hub_path}")
+    # The NFT-NET-Hub checkout is only needed when it is one of the sources
+    if NFTHUB in args.sources and not NFT_HUB_PATH.exists():
+        print(f"\n❌ ERROR: NFT-NET-Hub not found at {NFT_HUB_PATH}")
         print("\nPlease run:")
         print("  git clone https://github.com/ShuxunoO/NFT-NET-Hub.git")
         print("  cd NFT-NET-Hub")
@@ -211,90 +396,299 @@ def main():
         print("\nThen run this script again.")
         return
     
-    # Initialize NFT1000 following their pattern
-    print("\n🔧 Initializing NFT1000...")
-    # For query-only operations, the local_repo_path can be current directory
-    local_repo_path = str(Path.cwd().absolute())
-    
+    revision = get_hub_revision()
+    if NFTHUB in args.sources:
+        print(f"\nNFT-NET-Hub revision: {revision}")
+    cache = None if args.no_cache else MetadataCache(args.cache_dir)
+    hf_revision = None
+    if HF in args.sources:
+        # Hub records belong to a dataset commit, not to the NFT-NET-Hub checkout
+        from fetch_descriptions_for_coding import get_hf_token, resolve_revision
+        try:
+            with metrics.stage("resolve_revision"):
+                hf_revision = resolve_revision("main", get_hf_token(), cache)
+        except Exception as e:
+            print(f"\n❌ Could not resolve dataset revision 'main': {e}")
+            return
+        print(f"\nDataset revision (hf source): {hf_revision}")
     try:
-        nft1000 = NFT1000("NFT1000", local_repo_path)
-        print("✓ NFT1000 initialized successfully")
-    except Exception as e:
-        print(f"❌ Failed to initialize NFT1000: {e}")
-        print("Make sure you have access to the NFT-Net dataset on Hugging Face")
+        categories = load_project_lists(args.projects)
+    except (OSError, ValueError) as e:
+        print(f"\n❌ Cannot read project lists: {e}")
         return
+    if categories is None:
+        categories = {
+            "CATEGORY_A_ANIMAL_APE": CATEGORY_A_ANIMAL_APE,
+            "CATEGORY_B_FANTASY_ART": CATEGORY_B_FANTASY_ART,
+        }
+    else:
+        print(f"\nProject lists: {args.projects}")
+    
+    # Resolve every requested name before any query is made (the name list comes from NFT-NET-Hub)
+    from name_index import NameIndex
+    index_path = Path(args.cache_dir) / "nft1000_names.json"
+    name_index = None
+    if NFTHUB in args.sources and not args.no_cache:
+        with metrics.stage("name_index"):
+            name_index = NameIndex.load(index_path, revision)
+    nft1000 = None
+    if name_index is None and NFTHUB in args.sources:
+        with metrics.stage("nft1000_init"):
+            nft1000 = init_nft1000()
+        if nft1000 is None:
+            return
+        
+        # Build the name index from the available NFT names
+        try:
+            print("\n🔍 Checking available NFT projects...")
+            with metrics.stage("name_index"):
+                available_nfts = nft1000.get_NFT_name_list()
+                name_index = NameIndex(available_nfts)
+            print(f"✓ Found {len(available_nfts)} available NFT projects")
+            if cache is not None:
+                name_index.save(index_path, revision)
+        except Exception as e:
+            print(f"⚠️  Could not get NFT list: {e}")
+            print("Proceeding without name resolution...")
+    
+    unresolved = {}
+    if name_index is not None:
+        with metrics.stage("resolve_names"):
+            categories, unresolved = resolve_categories(name_index, categories)
+    
+    coded = [project for projects in categories.values() for project in projects if project not in unresolved]
+    if args.shard:
+        # Codes are issued by the merge, from the registry on the merging machine
+        registry = CodeRegistry()
+        all_categories = categories
+        categories = select_shard(categories, *args.shard)
+        args.journal = shard_path(args.journal, *args.shard)
+        args.trace = shard_path(args.trace, *args.shard)
+        print(f"\nShard {args.shard[0]}/{args.shard[1]}: "
+              f"{sum(len(projects) for projects in categories.values())} of "
+              f"{sum(len(projects) for projects in all_categories.values())} projects")
+    else:
+        try:
+            registry = CodeRegistry(args.code_registry)
+        except (OSError, ValueError) as e:
+            print(f"\n❌ Cannot read code registry: {e}")
+            return
+        known = len(registry)
+        with metrics.stage("assign_codes"):
+            registry.assign(coded)
+            registry.save()
+        print(f"\nCodes: {len(registry) - known} new, {known} reused from {args.code_registry}")
     
-    # Show available NFT names for debugging
+    if args.resume and not os.path.exists(args.journal):
+        print(f"\n⚠️  No journal at {args.journal} - starting a fresh run")
     try:
-        print("\n🔍 Checking available NFT projects...")
-        available_nfts = nft1000.get_NFT_name_list()
-        print(f"✓ Found {len(available_nfts)} available NFT projects")
-    except Exception as e:
-        print(f"⚠️  Could not get NFT list: {e}")
-        print("Proceeding anyway...")
+        journal = RunJournal(args.journal, revision, categories, resume=args.resume)
+    except JournalMismatchError as e:
+        print(f"\n❌ Cannot resume from {args.journal}: {e}")
+        print("Run again without --resume to start over.")
+        return
+    if journal.resumed:
+        counts = journal.counts()
+        print(f"\n↻ Resuming from {args.journal}: {counts[SUCCESS]} succeeded, "
+              f"{counts[NO_DESCRIPTION]} without description, {counts[ERROR]} to retry")
+    
+    # contains() is not counted as a cache access; CacheSource does the real lookup
+    finished = {category_name: journal.finished(category_name) for category_name in categories}
+    uncached = [
+        project
+        for category_name, projects in categories.items()
+        for project in projects
+        if project not in finished[category_name]
+        and project not in unresolved
+        and (cache is None or not (cache.contains(project, revision)
+                                   or (hf_revision and cache.contains(project, hf_revision))))
+    ]
+    
+    if not uncached:
+        print("\n✓ All projects cached - skipping NFT1000 initialization")
+    elif nft1000 is None and NFTHUB in args.sources:
+        with metrics.stage("nft1000_init"):
+            nft1000 = init_nft1000()
+        if nft1000 is None:
+            return
+    
+    sources = []
+    for name in args.sources:
+        if name == NFTHUB:
+            sources.append(NftHubSource(nft1000, factory=init_nft1000))
+        elif name == HF:
+            hf_missing = set()
+            if cache is not None:
+                sources.append(CacheSource(cache, hf_revision, hf_missing, accepts=(HF,), name="hf-cache"))
+            sources.append(HubSource(hf_revision, get_hf_token(), cache=cache, missing=hf_missing))
+        elif args.local_dir:
+            sources.append(LocalSource(args.local_dir))
+        else:
+            print("\n❌ The local source needs --local-dir")
+            return
+    
+    detector = None if args.dedup == "off" else NearDuplicateDetector(args.dedup_threshold, args.dedup)
+    
+    token_text = None
+    if args.token_phrases:
+        if not args.local_dir:
+            print("\n❌ --token-phrases needs --local-dir")
+            return
+        from token_text import TokenTextSummarizer
+        try:
+            token_text = TokenTextSummarizer(args.local_dir, top_k=args.token_phrases)
+        except ValueError as e:
+            print(f"\n❌ {e}")
+            return
+    
+    traits = None
+    if args.trait_stats and not args.shard:
+        if not args.local_dir:
+            print("\n❌ --trait-stats needs --local-dir")
+            return
+        from trait_stats import TraitAggregator
+        try:
+            traits = TraitAggregator(args.local_dir, args.trait_stats)
+        except ValueError as e:
+            print(f"\n❌ {e}")
+            return
+    
+    student_file = "student_descriptions.txt"
+    instructor_key = "instructor_key.json"
+    metadata_log = "collection_metadata.txt"
+    stats_summary = "collection_stats.json"
+    columnar = None
+    if args.columnar != "none" and not args.shard:
+        if columnar_available():
+            columnar = ColumnarKeyWriter(columnar_path(instructor_key, args.columnar), args.columnar, revision)
+        else:
+            print(f"\n⚠️  pyarrow not installed - skipping the {args.columnar} export of {instructor_key}")
     
-    # Fetch descriptions from both categories
-    category_a_descriptions = fetch_descriptions(nft1000, CATEGORY_A_ANIMAL_APE, "CATEGORY_A_ANIMAL_APE")
-    category_b_descriptions = fetch_descriptions(nft1000, CATEGORY_B_FANTASY_ART, "CATEGORY_B_FANTASY_ART")
+    # Fetch descriptions from both categories, writing each as it arrives
+    if args.shard:
+        writer = ShardWriter(args.shard_dir, *args.shard, revision, all_categories, coded,
+                             log_source_lines(revision, hf_revision), STUDENT_INSTRUCTIONS,
+                             options={"dedup": args.dedup, "dedup_threshold": args.dedup_threshold,
+                                      "columnar": args.columnar})
+    else:
+        writer = CollectionWriter(student_file, instructor_key, metadata_log,
+                                  instructions=STUDENT_INSTRUCTIONS,
+                                  source_lines=log_source_lines(revision, hf_revision),
+                                  categories=categories.keys(),
+                                  summary_path=stats_summary,
+                                  detector=detector,
+                                  columnar=columnar,
+                                  traits=traits)
+    with writer:
+        for category_name, projects in categories.items():
+            items = iter_descriptions(nft1000, projects, category_name, revision, cache,
+                                      journal, unresolved, metrics, registry, sources)
+            if token_text is not None:
+                items = token_text.annotate(items, metrics)
+            for item in items:
+                with metrics.stage("write"):
+                    writer.write(item)
+    category_counts = writer.category_counts
+    journal.close()
+    if token_text is not None:
+        token_text.close()
+        metrics.count("token_files", token_text.files_read)
+    if traits is not None:
+        metrics.count("trait_files", traits.files_read)
     
-    # Combine all descriptions
-    all_descriptions = category_a_descriptions + category_b_descriptions
+    if cache is not None:
+        metrics.count("cache_hits", cache.hits)
+        metrics.count("cache_misses", cache.misses)
+        cache.evict()
+        cache.close()
     
-    if not all_descriptions:
+    if args.shard:
+        metrics.finish()
+        metrics.write_trace(args.trace)
+        print(f"\n✅ Shard {args.shard[0]}/{args.shard[1]}: {writer.total} descriptions in {writer.output_path}")
+        merge_options = ""
+        if args.trait_stats:
+            merge_options = f" --trait-stats {args.trait_stats} --local-dir {args.local_dir or '<checkout>'}"
+        print(f"Once every shard has finished, combine them with: python sharding.py merge {args.shard_dir}"
+              f"{merge_options}")
+        return
+    
+    if not writer.total:
         print("\n❌ No descriptions were fetched!")
         print("\nPossible issues:")
         print("- Check your Hugging Face authentication")
         print("- Verify dataset access permissions")
         print("- Some project names might have changed")
+        metrics.finish()
+        metrics.write_trace(args.trace)
         return
     
-    # Category counts
-    category_counts = {
-        "CATEGORY_A_ANIMAL_APE": len(category_a_descriptions),
-        "CATEGORY_B_FANTASY_ART": len(category_b_descriptions),
-    }
-    
     print(f"\n{'='*60}")
     print(f"COLLECTION SUMMARY")
     print(f"{'='*60}")
-    print(f"Total descriptions: {len(all_descriptions)}")
-    print(f"  Category A (Animal/Ape): {category_counts['CATEGORY_A_ANIMAL_APE']}")
-    print(f"  Category B (Fantasy/Art): {category_counts['CATEGORY_B_FANTASY_ART']}")
+    print(f"Total descriptions: {writer.total}")
+    for category_name, count in category_counts.items():
+        print(f"  {category_name}: {count}")
     
-    # Create output files
-    print(f"\n{'='*60}")
-    print("Creating output files...")
-    print(f"{'='*60}")
+    # Check the two categories actually separate before anyone codes them
+    from cluster_validation import format_report as format_cluster_report, validate as validate_clusters, verdict
+    with open(instructor_key, 'r', encoding='utf-8') as f:
+        key_records = json.load(f)
+    with metrics.stage("validate"):
+        report = validate_clusters(key_records)
+    print(f"\nCluster check (TF-IDF clustering vs. categories):")
+    for line in format_cluster_report(report):
+        print(f"  {line}" if line else "")
+    if not verdict(report):
+        print("⚠️  The categories do not separate cleanly - consider revising the project lists")
     
-    student_file = create_student_file(
-        all_descriptions, 
-        "student_descriptions.txt"
-    )
+    if args.cohorts:
+        with metrics.stage("cohorts"):
+            cohort_names = build_cohorts(key_records, args.cohorts, args.cohort_dir, args.code_registry,
+                                  instructions=STUDENT_INSTRUCTIONS)
+        print(f"\n✓ Built {len(cohort_names)} cohort packages in {args.cohort_dir}/ "
+              f"({cohort_names[0]} ... {cohort_names[-1]}, each with its own codes and order)")
     
-    instructor_key = create_instructor_key(
-        all_descriptions,
-        "instructor_key.json"
-    )
-    
-    metadata_log = create_metadata_log(
-        all_descriptions,
-        category_counts,
-        "collection_metadata.txt"
-    )
+    metrics.finish()
+    metrics.append_to_log(metadata_log)
+    metrics.write_trace(args.trace)
+    print(f"\nRun timing (also in {metadata_log}, full trace in {args.trace}):")
+    for line in metrics.format_summary():
+        print(f"  {line}" if line else "")
     
     print(f"\n{'='*60}")
     print("✅ COMPLETE!")
     print(f"{'='*60}")
     print("\nFiles created:")
-    print(f"1. {student_file} - Give this to students")
-    print(f"2. {instructor_key} - Keep for reference (maps codes to projects)")
-    print(f"3. {metadata_log} - Documents what was collected")
-    print("\nExpected outcome: Students should identify 2 distinct clusters")
+    files = [
+        (student_file, "Give this to students"),
+        (instructor_key, "Keep for reference (maps codes to projects)"),
+        (metadata_log, "Documents what was collected"),
+        (stats_summary, "Corpus statistics (JSON)"),
+    ]
+    if columnar is not None:
+        files.append((columnar.output_path, "Instructor key in columnar form"))
+    files.append((args.trace, "Per-stage timing trace (JSON)"))
+    files.append((args.code_registry, "Code keys and codes - keep private"))
+    if args.cohorts:
+        files.append((f"{args.cohort_dir}/", f"{args.cohorts} cohort packages (student file + instructor key each)"))
+    for number, (path, note) in enumerate(files, 1):
+        print(f"{number}. {path} - {note}")
+    print(f"\nExpected outcome: Students should identify {len(category_counts)} distinct clusters")
     print("through axial coding based on content themes.")
-    print("\nCluster A: Animal/Community theme (membership, clubs, avatars)")
-    print("Cluster B: Art/Fantasy theme (collectibles, artistic vision)")
+    if list(category_counts) == ["CATEGORY_A_ANIMAL_APE", "CATEGORY_B_FANTASY_ART"]:
+        print("\nCluster A: Animal/Community theme (membership, clubs, avatars)")
+        print("Cluster B: Art/Fantasy theme (collectibles, artistic vision)")
     print()
 
 
+def main(argv=None):
+    """Main execution function following NFT-NET-Hub conventions."""
+    args = parse_args(argv)
+    if args.profile:
+        return profile_call(run, args, stats_path=args.profile)
+    return run(args)
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,245 @@
+"""
+Persistent on-disk cache of parsed NFT1000 metadata records.
+
+Records are stored content-addressed (objects/<sha256>.json) and indexed by
+(project name, dataset revision) in a small SQLite database, so a repeat run
+against the same revision is served entirely from disk. The index also
+remembers which revision a branch name such as "main" resolved to, which lets
+a warm run skip the network round-trip to look it up.
+
+Eviction is LRU: entries not used for ``max_age`` seconds are dropped first,
+then the least recently used entries until the objects fit in ``max_bytes``.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+
+DEFAULT_CACHE_DIR = Path(os.environ.get(
+    "NFT_METADATA_CACHE", Path.home() / ".cache" / "axialcodingchallenge" / "metadata"
+))
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_AGE = 30 * 24 * 3600
+DEFAULT_REF_TTL = 3600
+
+COMMIT_HASH_PATTERN = re.compile(r"^[0-9a-f]{40}$")
+
+# Returned by get() for projects known to be absent from a revision
+MISSING = object()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    project TEXT NOT NULL,
+    revision TEXT NOT NULL,
+    digest TEXT,
+    size INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (project, revision)
+);
+CREATE TABLE IF NOT EXISTS refs (
+    ref TEXT PRIMARY KEY,
+    commit_hash TEXT NOT NULL,
+    resolved REAL NOT NULL
+);
+"""
+
+
+def is_commit_hash(revision):
+    """Return True if revision is a full 40-character commit hash."""
+    return bool(revision and COMMIT_HASH_PATTERN.match(revision))
+
+
+class MetadataCache:
+    """Content-addressed metadata cache keyed by (project, revision)."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 max_age=DEFAULT_MAX_AGE, ref_ttl=DEFAULT_REF_TTL):
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.ref_ttl = ref_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.cache_dir / "index.sqlite", check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _object_path(self, digest):
+        return self.objects_dir / digest[:2] / f"{digest}.json"
+
+    def get(self, project, revision):
+        """Return the cached record, MISSING for a cached 404, or None on a miss."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest FROM entries WHERE project = ? AND revision = ?",
+                (project, revision),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            digest = row[0]
+            if digest is None:
+                record = MISSING
+            else:
+                try:
+                    with open(self._object_path(digest), 'r', encoding='utf-8') as f:
+                        record = json.load(f)
+                except (OSError, ValueError):
+                    # Object was removed or corrupted behind our back
+                    self._db.execute(
+                        "DELETE FROM entries WHERE project = ? AND revision = ?",
+                        (project, revision),
+                    )
+                    self.misses += 1
+                    return None
+
+            self._db.execute(
+                "UPDATE entries SET accessed = ? WHERE project = ? AND revision = ?",
+                (time.time(), project, revision),
+            )
+            self.hits += 1
+            return record
+
+    def contains(self, project, revision):
+        """True if a record or a cached 404 exists (does not count as an access)."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT 1 FROM entries WHERE project = ? AND revision = ?", (project, revision)
+            ).fetchone() is not None
+
+    def records(self, revision):
+        """Yield (project, record) for every cached record of a revision, by project name."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT project, digest FROM entries WHERE revision = ? AND digest IS NOT NULL "
+                "ORDER BY project",
+                (revision,),
+            ).fetchall()
+        for project, digest in rows:
+            try:
+                with open(self._object_path(digest), 'r', encoding='utf-8') as f:
+                    yield project, json.load(f)
+            except (OSError, ValueError):
+                continue
+
+    def put(self, project, revision, record):
+        """Store a parsed record and return its content digest."""
+        data = json.dumps(record, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        object_path = self._object_path(digest)
+
+        if not object_path.exists():
+            object_path.parent.mkdir(exist_ok=True)
+            tmp_path = object_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, object_path)
+
+        self._store_entry(project, revision, digest, len(data))
+        return digest
+
+    def put_missing(self, project, revision):
+        """Remember that a project does not exist in a revision."""
+        self._store_entry(project, revision, None, 0)
+
+    def _store_entry(self, project, revision, digest, size):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (project, revision, digest, size, now, now),
+            )
+            self._db.commit()
+
+    def resolve_ref(self, ref):
+        """Return the commit hash a branch/tag resolved to recently, or None."""
+        if is_commit_hash(ref):
+            return ref
+        with self._lock:
+            row = self._db.execute(
+                "SELECT commit_hash, resolved FROM refs WHERE ref = ?", (ref,)
+            ).fetchone()
+        if row and time.time() - row[1] < self.ref_ttl:
+            return row[0]
+        return None
+
+    def store_ref(self, ref, commit_hash):
+        """Remember the commit hash a branch/tag resolved to."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO refs VALUES (?, ?, ?)", (ref, commit_hash, time.time())
+            )
+            self._db.commit()
+
+    def total_bytes(self):
+        """Size of all referenced objects on disk."""
+        with self._lock:
+            return self._total_bytes()
+
+    def _total_bytes(self):
+        row = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM "
+            "(SELECT DISTINCT digest, size FROM entries WHERE digest IS NOT NULL)"
+        ).fetchone()
+        return row[0]
+
+    def evict(self):
+        """Drop entries unused for max_age, then least recently used ones until under max_bytes."""
+        removed = 0
+        with self._lock:
+            cutoff = time.time() - self.max_age
+            removed += self._db.execute("DELETE FROM entries WHERE accessed < ?", (cutoff,)).rowcount
+
+            total = self._total_bytes()
+            if total > self.max_bytes:
+                rows = self._db.execute(
+                    "SELECT project, revision, digest, size FROM entries ORDER BY accessed ASC"
+                ).fetchall()
+                # An object is shared by every entry with its digest and only
+                # frees space once the last of them is gone
+                references = Counter(digest for _, _, digest, _ in rows if digest is not None)
+                evicted = []
+                for project, revision, digest, size in rows:
+                    evicted.append((project, revision))
+                    if digest is not None:
+                        references[digest] -= 1
+                        if not references[digest]:
+                            total -= size
+                    if total <= self.max_bytes:
+                        break
+                self._db.executemany(
+                    "DELETE FROM entries WHERE project = ? AND revision = ?", evicted
+                )
+                removed += len(evicted)
+
+            self._db.commit()
+            referenced = {row[0] for row in self._db.execute(
+                "SELECT DISTINCT digest FROM entries WHERE digest IS NOT NULL"
+            )}
+
+        for object_path in self.objects_dir.glob("*/*.json"):
+            if object_path.stem not in referenced:
+                object_path.unlink(missing_ok=True)
+        return removed
+
+    def close(self):
+        """Flush access times and close the index."""
+        with self._lock:
+            self._db.commit()
+            self._db.close()
@@ -0,0 +1,186 @@
+"""
+Pluggable JSON parsing for metadata_dashboard.json files.
+
+The fetch and extract scripts only use a handful of fields from each
+dashboard, so parsing is routed through this module, which:
+
+- uses the fastest installed backend: simdjson (pysimdjson), then orjson,
+  then the standard library json module
+- offers a lazy mode that pulls out just the requested top-level keys
+  without building the full object graph, stopping as soon as they are found
+  (with simdjson nothing else is materialized at all; without it, documents
+  over LAZY_SCAN_THRESHOLD bytes go through a scanner that decodes one
+  skipped value at a time and discards it, while smaller ones are cheaper to
+  parse whole)
+
+Set NFT_JSON_BACKEND=simdjson|orjson|json to force a particular backend.
+"""
+
+import json
+import os
+import re
+import threading
+from json.decoder import JSONDecodeError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+
+# The fields the scripts actually use
+METADATA_FIELDS = ("description", "total_supply", "contract_address", "official_url", "opensea_url")
+
+BACKEND_PREFERENCE = ("simdjson", "orjson", "json")
+
+# Below this size a full orjson/json parse beats the pure-Python key scanner
+LAZY_SCAN_THRESHOLD = 1024 * 1024
+
+_decoder = json.JSONDecoder()
+_simdjson_local = threading.local()
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SCALAR = re.compile(r'[^,}\]\s]+')
+
+
+def available_backends():
+    """Names of the installed backends, fastest first."""
+    installed = {"simdjson": simdjson is not None, "orjson": orjson is not None, "json": True}
+    return [name for name in BACKEND_PREFERENCE if installed[name]]
+
+
+def get_backend(name=None):
+    """Resolve a backend name (None = NFT_JSON_BACKEND or the fastest installed)."""
+    name = name or os.environ.get("NFT_JSON_BACKEND")
+    backends = available_backends()
+    if name is None:
+        return backends[0]
+    if name not in backends:
+        raise ValueError(f"JSON backend '{name}' is not installed (available: {', '.join(backends)})")
+    return name
+
+
+def _simdjson_parser():
+    # A simdjson Parser holds one document at a time and is not thread-safe
+    parser = getattr(_simdjson_local, "parser", None)
+    if parser is None:
+        parser = _simdjson_local.parser = simdjson.Parser()
+    return parser
+
+
+def _simdjson_value(value):
+    if isinstance(value, simdjson.Object):
+        return value.as_dict()
+    if isinstance(value, simdjson.Array):
+        return value.as_list()
+    return value
+
+
+def _skip_value(text, idx):
+    """Return the index just past the JSON value starting at idx.
+
+    Strings and scalars are skipped with a regex; containers are run through
+    the C decoder and the result discarded straight away, so only one
+    skipped value is ever alive at a time.
+    """
+    ch = text[idx]
+    if ch == '"':
+        return _STRING.match(text, idx).end()
+    if ch not in '{[':
+        return _SCALAR.match(text, idx).end()
+    return _decoder.raw_decode(text, idx)[1]
+
+
+def extract_fields(text, fields):
+    """
+    Decode only the requested top-level keys of a JSON object.
+
+    Unwanted values are skipped and dropped immediately rather than being
+    collected into a result, and scanning stops once every requested key has
+    been seen, so fields near the top of a large file are found cheaply.
+    """
+    wanted = set(fields)
+    result = {}
+    idx = _WHITESPACE.match(text, 0).end()
+    if text[idx:idx + 1] != '{':
+        raise JSONDecodeError("Expecting top-level object", text, idx)
+    idx = _WHITESPACE.match(text, idx + 1).end()
+
+    while wanted and text[idx:idx + 1] not in ('}', ''):
+        key_match = _STRING.match(text, idx)
+        if key_match is None:
+            raise JSONDecodeError("Expecting property name", text, idx)
+        key = json.loads(key_match.group())
+        idx = _WHITESPACE.match(text, key_match.end()).end()
+        if text[idx:idx + 1] != ':':
+            raise JSONDecodeError("Expecting ':' delimiter", text, idx)
+        idx = _WHITESPACE.match(text, idx + 1).end()
+
+        if key in wanted:
+            result[key], idx = _decoder.raw_decode(text, idx)
+            wanted.discard(key)
+        else:
+            idx = _skip_value(text, idx)
+
+        idx = _WHITESPACE.match(text, idx).end()
+        if text[idx:idx + 1] == ',':
+            idx = _WHITESPACE.match(text, idx + 1).end()
+    return result
+
+
+def parse_metadata(data, fields=None, backend=None, lazy=False):
+    """
+    Parse a metadata_dashboard.json document.
+
+    Args:
+        data: Raw file contents (bytes or str)
+        fields: Keep only these top-level keys (default: everything)
+        backend: "simdjson", "orjson" or "json" (default: fastest installed)
+        lazy: Extract just ``fields`` without materializing the rest
+
+    Returns:
+        dict of the (selected) top-level fields; without ``fields`` a document
+        that is not an object (array, string, number...) is returned as its
+        native Python value by every backend
+
+    Raises:
+        ValueError: invalid JSON, or ``fields`` were asked of a non-object
+    """
+    backend = get_backend(backend)
+
+    if lazy and fields is not None:
+        if backend == "simdjson":
+            document = _simdjson_parser().parse(data)
+            if not isinstance(document, simdjson.Object):
+                raise ValueError("Expecting top-level object")
+            return {field: _simdjson_value(document[field]) for field in fields if field in document}
+        if len(data) > LAZY_SCAN_THRESHOLD:
+            if isinstance(data, bytes):
+                data = data.decode('utf-8')
+            return extract_fields(data, fields)
+
+    if backend == "simdjson":
+        metadata = _simdjson_value(_simdjson_parser().parse(data))
+    elif backend == "orjson":
+        metadata = orjson.loads(data)
+    else:
+        metadata = json.loads(data)
+
+    if fields is not None:
+        if not isinstance(metadata, dict):
+            raise ValueError("Expecting top-level object")
+        metadata = {field: metadata[field] for field in fields if field in metadata}
+    return metadata
+
+
+def load_metadata(path, fields=None, backend=None, lazy=False):
+    """Read and parse a metadata_dashboard.json file (see parse_metadata)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return parse_metadata(data, fields, backend, lazy)
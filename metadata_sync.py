@@ -0,0 +1,254 @@
+"""
+Metadata-only mirror of the NFT-Net dataset.
+
+fetch_descriptions_for_coding.py downloads one metadata_dashboard.json per
+project, every run. sync_metadata() instead keeps a local mirror with the
+dataset's layout (NFT1000/<project>/metadata_dashboard.json) and nothing
+else, so extract_nft_descriptions.py and the local fetch source
+(--sources local --local-dir <mirror>) can run offline against it.
+
+huggingface_hub's snapshot_download(allow_patterns=...) would list every
+file in the repository first: the dataset is 1.75 TB and, being over its
+50,000-file limit, it would walk the whole tree recursively, images and
+all. A sync makes these requests instead:
+
+1. one dataset info call, to resolve the revision to a commit. If the mirror
+   already holds that commit (see MANIFEST_FILENAME), the sync stops here; a
+   full sync only does so when the last sync was a full one too
+2. one non-recursive listing of NFT1000/ for the project names (skipped
+   when a project list is given)
+3. batched paths-info calls for the blob id of each metadata file
+4. one GET per file that is new or whose blob id changed since the last
+   sync (hf_hub_download would add a HEAD request per file for what step 3
+   already told us); no image bytes are ever requested. Each download is
+   checked against step 3: the git blob sha1 for regular files, the LFS
+   sha256 for files stored in LFS/Xet (whose blob id is the pointer's)
+
+If some downloads fail, the files that did arrive are still recorded in the
+manifest (under the previous revision, so the next sync does not stop at
+step 1) and only the failed ones are fetched again.
+
+Usage:
+    python metadata_sync.py                         # all projects into nft_net_mirror/
+    python metadata_sync.py /data/nft_mirror --projects project_lists.json --workers 32
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from fetch_descriptions_for_coding import (DEFAULT_BACKOFF, DEFAULT_RETRIES, DEFAULT_TIMEOUT, REPO_ID, get_hf_token,
+                                           list_paths_info, metadata_path, resolve_revision, with_retries)
+from project_lists import load_project_lists
+
+
+DEFAULT_MIRROR_DIR = "nft_net_mirror"
+DEFAULT_REVISION = "main"
+DEFAULT_MAX_WORKERS = 16
+MANIFEST_FILENAME = "sync_manifest.json"
+
+SyncResult = namedtuple("SyncResult", "revision projects downloaded unchanged removed missing")
+
+
+def read_manifest(mirror_dir):
+    """{"revision": commit, "complete": bool, "files": {path: blob id}} of the last sync (empty if none).
+
+    "complete" is true when the files cover every project of the revision,
+    not just a --projects subset.
+    """
+    try:
+        with open(Path(mirror_dir) / MANIFEST_FILENAME, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {"revision": None, "complete": False, "files": {}}
+    manifest.setdefault("complete", False)
+    manifest.setdefault("files", {})
+    return manifest
+
+
+def write_manifest(mirror_dir, revision, files, complete=False):
+    path = Path(mirror_dir) / MANIFEST_FILENAME
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"revision": revision, "complete": complete, "synced": time.strftime('%Y-%m-%d %H:%M:%S'),
+                   "files": dict(sorted(files.items()))}, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def list_project_names(revision, hf_token=None):
+    """Project directory names under NFT1000/ (one listing, not recursive)."""
+    from huggingface_hub import HfApi
+    from huggingface_hub.hf_api import RepoFolder
+
+    entries = HfApi().list_repo_tree(REPO_ID, path_in_repo="NFT1000", repo_type="dataset",
+                                     revision=revision, token=hf_token)
+    return sorted(entry.path.split("/", 1)[1] for entry in entries if isinstance(entry, RepoFolder))
+
+
+def download_file(path, revision, mirror_dir, hf_token=None, blob_id=None, sha256=None,
+                  timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """
+    Download one repository file into the mirror, checking its LFS sha256 or else its blob id if given.
+
+    The GET is bounded by ``timeout`` and retried like the fetch scripts'
+    downloads (see with_retries), including when the content does not match.
+    """
+    from huggingface_hub import hf_hub_url
+    from huggingface_hub.utils import build_hf_headers, get_session, hf_raise_for_status
+
+    def fetch():
+        response = get_session().get(hf_hub_url(REPO_ID, path, repo_type="dataset", revision=revision),
+                                     headers=build_hf_headers(token=hf_token), follow_redirects=True,
+                                     timeout=timeout)
+        hf_raise_for_status(response)
+        data = response.content
+        if sha256 is not None:
+            # An LFS/Xet file's blob id is the hash of its pointer, not of the content
+            if hashlib.sha256(data).hexdigest() != sha256:
+                raise ValueError(f"{path}: downloaded content does not match LFS sha256 {sha256[:8]}")
+        elif blob_id is not None and hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest() != blob_id:
+            raise ValueError(f"{path}: downloaded content does not match blob {blob_id[:8]}")
+        return data
+
+    data = with_retries(fetch, retries, backoff)
+    target = Path(mirror_dir) / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{target}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, target)
+
+
+def sync_metadata(mirror_dir=DEFAULT_MIRROR_DIR, revision=DEFAULT_REVISION, projects=None,
+                  max_workers=DEFAULT_MAX_WORKERS, hf_token=None, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES):
+    """
+    Bring a metadata-only mirror up to date with a dataset revision.
+
+    Args:
+        mirror_dir: Mirror directory (receives NFT1000/ and the manifest)
+        revision: Branch, tag or commit to mirror
+        projects: Project names to mirror (default: every project in NFT1000/)
+        max_workers: Concurrent downloads
+        hf_token: Hugging Face token (default: from the environment)
+        timeout: Seconds allowed for each file download
+        retries: Retries for a download that fails transiently
+
+    Returns:
+        SyncResult(revision, projects, downloaded, unchanged, removed, missing)
+
+    Raises:
+        RuntimeError: some downloads failed (after the others were recorded)
+    """
+    mirror_dir = Path(mirror_dir)
+    hf_token = hf_token or get_hf_token()
+    commit_hash = resolve_revision(revision, hf_token)
+    manifest = read_manifest(mirror_dir)
+    files = manifest["files"]
+
+    full = projects is None
+    current = manifest["revision"] == commit_hash
+    wanted = None if full else [metadata_path(project) for project in dict.fromkeys(projects)]
+    # A subset sync may stop at step 1 after any sync; a full one only after a full one
+    if current and (manifest["complete"] if full else all(path in files for path in wanted)):
+        count = len(files) if full else len(wanted)
+        return SyncResult(commit_hash, count, 0, count, 0, 0)
+
+    if full:
+        wanted = [metadata_path(project) for project in list_project_names(commit_hash, hf_token)]
+    infos = list_paths_info(wanted, commit_hash, hf_token)
+    blob_ids = {path: info.blob_id for path, info in infos.items()}
+    stale = [path for path, blob_id in blob_ids.items()
+             if files.get(path) != blob_id or not (mirror_dir / path).is_file()]
+
+    mirror_dir.mkdir(parents=True, exist_ok=True)
+    failed = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        downloads = {path: executor.submit(download_file, path, commit_hash, mirror_dir, hf_token, blob_ids[path],
+                                           infos[path].lfs.sha256 if infos[path].lfs else None,
+                                           timeout, retries)
+                     for path in stale}
+        for path, future in downloads.items():
+            try:
+                future.result()
+            except Exception as e:
+                failed[path] = e
+
+    # Files gone upstream leave the mirror too (any not in the listing, after a full sync)
+    requested = set(wanted)
+    gone = [path for path in files if path not in blob_ids and (full or path in requested)]
+    for path in gone:
+        del files[path]
+        try:
+            os.remove(mirror_dir / path)
+            os.rmdir((mirror_dir / path).parent)
+        except OSError:
+            # Already gone, or the project directory holds other files
+            pass
+    files.update((path, blob_id) for path, blob_id in blob_ids.items() if path not in failed)
+    if failed:
+        write_manifest(mirror_dir, manifest["revision"], files)
+    else:
+        write_manifest(mirror_dir, commit_hash, files, full or (current and manifest["complete"]))
+    if failed:
+        path, error = next(iter(failed.items()))
+        raise RuntimeError(f"{len(failed)} of {len(stale)} downloads failed (first: {path}: {error}); "
+                           f"the others are in the mirror and the next sync fetches only these") from error
+    return SyncResult(commit_hash, len(wanted), len(stale), len(blob_ids) - len(stale), len(gone),
+                      len(wanted) - len(blob_ids))
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Mirror only the metadata_dashboard.json files of NFT-Net.")
+    parser.add_argument("mirror_dir", nargs="?", default=DEFAULT_MIRROR_DIR,
+                        help=f"mirror directory (default {DEFAULT_MIRROR_DIR})")
+    parser.add_argument("--revision", default=DEFAULT_REVISION,
+                        help=f"dataset branch, tag or commit (default {DEFAULT_REVISION})")
+    parser.add_argument("--projects", default=None,
+                        help="project list file (from select_projects.py) to mirror instead of every project")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help=f"concurrent downloads (default {DEFAULT_MAX_WORKERS})")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"per-download timeout in seconds (default {DEFAULT_TIMEOUT})")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help=f"retries for transient failures (default {DEFAULT_RETRIES})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    projects = None
+    if args.projects:
+        try:
+            categories = load_project_lists(args.projects)
+        except (OSError, ValueError) as e:
+            print(f"✗ Cannot read project lists: {e}")
+            return
+        if categories is None:
+            print(f"✗ No project list at {args.projects}")
+            return
+        projects = [project for names in categories.values() for project in names]
+
+    start = time.perf_counter()
+    try:
+        result = sync_metadata(args.mirror_dir, args.revision, projects, args.workers,
+                               timeout=args.timeout, retries=args.retries)
+    except RuntimeError as e:
+        print(f"✗ {e}")
+        return
+    elapsed = time.perf_counter() - start
+    print(f"✓ Mirror at revision {result.revision[:8]}: {result.projects} projects, "
+          f"{result.downloaded} downloaded, {result.unchanged} unchanged, {result.removed} removed "
+          f"({elapsed:.2f}s)")
+    if result.missing:
+        print(f"⚠️  {result.missing} projects have no metadata_dashboard.json in this revision")
+    print(f"✓ Run offline with: python extract_nft_descriptions.py {args.mirror_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Project name resolution against the NFT1000 name list.
+
+NFT-NET-Hub's query() only accepts exact dataset names and reports a typo by
+raising an error containing "do you mean ...". Instead of paying for a
+failed query per misspelled name, NameIndex resolves every requested name up
+front, in three tiers:
+
+1. exact match ("CryptoPunks")
+2. normalized match - case, spaces and punctuation ignored
+   ("CRYPTOPUNKS", "Mutant Ape Yacht Club" -> "MutantApeYachtClub")
+3. fuzzy match - RapidFuzz's plain edit-distance ratio when installed,
+   otherwise a character trigram index - accepted only above a strict score
+   threshold and with a clear lead over the runner-up; anything else is only
+   suggested. Partial/substring scorers (WRatio) are deliberately not used:
+   they score "Punks" as 90 against "CryptoPunks", which would silently put
+   the wrong collection into the key
+
+The name list is saved to disk per dataset revision, so later runs can
+resolve names without initializing NFT1000 at all.
+"""
+
+import json
+import os
+import re
+from collections import Counter, defaultdict, namedtuple
+
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    fuzz = process = None
+
+
+DEFAULT_MIN_SCORE = 90.0
+MIN_SCORE_MARGIN = 5.0
+SUGGESTION_MIN_SCORE = 60.0
+NGRAM_SIZE = 3
+
+Resolution = namedtuple("Resolution", ["query", "match", "method", "score", "suggestions"])
+
+
+def normalize_name(name):
+    """Lowercase and drop everything but letters and digits."""
+    return re.sub(r"[^0-9a-z]", "", name.lower())
+
+
+def _ngrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+class NameIndex:
+    """Exact, normalized and fuzzy lookup over the dataset's project names."""
+
+    def __init__(self, names, min_score=DEFAULT_MIN_SCORE):
+        self.names = sorted(set(names))
+        self.min_score = min_score
+        self.exact = set(self.names)
+        self.by_key = defaultdict(list)
+        for name in self.names:
+            self.by_key[normalize_name(name)].append(name)
+        self.keys = list(self.by_key)
+
+        # Trigram postings for the fallback fuzzy matcher
+        self.postings = defaultdict(list)
+        self.key_ngram_counts = []
+        for key_id, key in enumerate(self.keys):
+            grams = _ngrams(key)
+            self.key_ngram_counts.append(len(grams))
+            for gram in grams:
+                self.postings[gram].append(key_id)
+
+    def _fuzzy(self, key, limit):
+        """Return [(key, score 0-100)] best first."""
+        if not key:
+            return []
+        if process is not None:
+            return [(match, score) for match, score, _ in
+                    process.extract(key, self.keys, scorer=fuzz.ratio, limit=limit)]
+
+        grams = _ngrams(key)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+        scored = [
+            (self.keys[key_id], 200.0 * count / (len(grams) + self.key_ngram_counts[key_id]))
+            for key_id, count in shared.items()
+        ]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+    def resolve(self, name, suggestions=3):
+        """Resolve one requested name to a dataset name (match is None if unresolved)."""
+        if name in self.exact:
+            return Resolution(name, name, "exact", 100.0, [])
+
+        key = normalize_name(name)
+        candidates = self.by_key.get(key, [])
+        if len(candidates) == 1:
+            return Resolution(name, candidates[0], "normalized", 100.0, [])
+        if len(candidates) > 1:
+            return Resolution(name, None, "ambiguous", 100.0, list(candidates))
+
+        scored = self._fuzzy(key, max(suggestions, 2))
+        # Auto-pick only a unique, clear winner; near ties are left to the user
+        clear = len(scored) < 2 or scored[0][1] - scored[1][1] >= MIN_SCORE_MARGIN
+        if scored and scored[0][1] >= self.min_score and clear and len(self.by_key[scored[0][0]]) == 1:
+            return Resolution(name, self.by_key[scored[0][0]][0], "fuzzy", scored[0][1], [])
+
+        names = [
+            candidate
+            for match, score in scored if score >= SUGGESTION_MIN_SCORE
+            for candidate in self.by_key[match]
+        ]
+        return Resolution(name, None, None, scored[0][1] if scored else 0.0, names[:suggestions])
+
+    def resolve_all(self, names):
+        """Resolve a batch of names; returns {requested name: Resolution}."""
+        return {name: self.resolve(name) for name in names}
+
+    def save(self, path, revision):
+        """Persist the name list for a dataset revision."""
+        # Per-process temporary file: shard processes on one machine may save at once
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"revision": revision, "names": self.names}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, revision, min_score=DEFAULT_MIN_SCORE):
+        """Load a saved index, or return None if missing or for another revision."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("revision") != revision:
+            return None
+        return cls(data["names"], min_score)
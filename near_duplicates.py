@@ -0,0 +1,199 @@
+"""
+Near-duplicate description detection with MinHash and LSH.
+
+Derivative collections often copy their parent's description almost word for
+word. NearDuplicateDetector finds these as records stream past, without
+comparing every pair:
+
+1. each description is reduced to a set of word shingles (SHINGLE_SIZE
+   consecutive tokens)
+2. a MinHash signature of NUM_PERM values estimates the Jaccard similarity
+   between two shingle sets
+3. signatures are split into bands and hashed into LSH buckets; only
+   descriptions sharing a bucket are compared, so the cost per record stays
+   roughly constant however many have been seen
+
+A record whose estimated similarity to an earlier one reaches the threshold
+joins that record's cluster. The first record of a cluster is its
+representative, and add() returns the representative's code for every later
+member.
+
+NumPy is imported by the functions that need it, so the module (and its
+constants, which the fetch scripts' options use) loads quickly.
+"""
+
+import argparse
+import zlib
+
+from corpus_stats import tokenize
+
+
+DEFAULT_THRESHOLD = 0.8
+NUM_PERM = 128
+SHINGLE_SIZE = 3
+
+# What to do with a near-duplicate: keep and mark it, or drop it from the outputs
+FLAG = "flag"
+COLLAPSE = "collapse"
+MODES = (FLAG, COLLAPSE)
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+# Fixed seed so signatures (and therefore clusters) are the same on every run
+PERMUTATION_SEED = 1
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Set of word shingles; short texts become a single shingle."""
+    tokens = tokenize(text)
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def optimal_bands(threshold, num_perm=NUM_PERM, steps=200):
+    """Pick (bands, rows) minimizing false positives plus false negatives.
+
+    Two documents with Jaccard s collide in at least one band with
+    probability 1 - (1 - s**r)**b; the areas below and above the threshold
+    under that curve are the expected false positive and negative rates.
+    """
+    import numpy as np
+
+    below = np.linspace(0.0, threshold, steps)
+    above = np.linspace(threshold, 1.0, steps)
+    best, best_error = (1, num_perm), None
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            false_positive = np.trapezoid(1 - (1 - below ** rows) ** bands, below)
+            false_negative = np.trapezoid((1 - above ** rows) ** bands, above)
+            error = false_positive + false_negative
+            if best_error is None or error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+def jaccard_threshold(value):
+    """argparse type for --dedup-threshold (a Jaccard similarity in (0, 1])."""
+    threshold = float(value)
+    if not 0.0 < threshold <= 1.0:
+        raise argparse.ArgumentTypeError(f"Jaccard threshold must be in (0, 1], got {value}")
+    return threshold
+
+
+class MinHasher:
+    """MinHash signatures from NUM_PERM universal hash permutations."""
+
+    def __init__(self, num_perm=NUM_PERM, seed=PERMUTATION_SEED):
+        import numpy as np
+
+        generator = np.random.RandomState(seed)
+        self.a = generator.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = generator.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.prime = np.uint64(MERSENNE_PRIME)
+        self.max_hash = np.uint64(MAX_HASH)
+
+    def signature(self, shingle_set):
+        import numpy as np
+
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingle in shingle_set),
+            dtype=np.uint64, count=len(shingle_set),
+        )
+        # uint64 arithmetic wraps on overflow, as in the usual numpy MinHash
+        with np.errstate(over='ignore'):
+            permuted = (np.outer(self.a, hashes) + self.b[:, None]) % self.prime & self.max_hash
+        return permuted.min(axis=1)
+
+
+class NearDuplicateDetector:
+    """Streaming MinHash/LSH clustering of descriptions."""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, mode=FLAG, num_perm=NUM_PERM):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"Jaccard threshold must be in (0, 1], got {threshold}")
+        if mode not in MODES:
+            raise ValueError(f"Unknown dedup mode '{mode}' (expected one of {', '.join(MODES)})")
+        self.threshold = threshold
+        self.mode = mode
+        self.hasher = MinHasher(num_perm)
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        self.buckets = [{} for _ in range(self.bands)]
+        self.signatures = []
+        self.records = []
+        self.representative = []
+        self.similarity = []
+
+    @property
+    def collapse(self):
+        return self.mode == COLLAPSE
+
+    def add(self, item):
+        """Index a record; return the code it duplicates, or None."""
+        shingle_set = shingles(item['description'])
+        if not shingle_set:
+            return None
+        signature = self.hasher.signature(shingle_set)
+        doc_id = len(self.signatures)
+        keys = [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+        candidates = set()
+        for bucket, key in zip(self.buckets, keys):
+            candidates.update(bucket.get(key, ()))
+
+        best, best_similarity = None, self.threshold
+        for candidate in sorted(candidates):
+            similarity = float((self.signatures[candidate] == signature).mean())
+            if similarity >= best_similarity and (best is None or similarity > best_similarity):
+                best, best_similarity = candidate, similarity
+
+        for bucket, key in zip(self.buckets, keys):
+            bucket.setdefault(key, []).append(doc_id)
+        self.signatures.append(signature)
+        self.records.append((item['code'], item['project_name'], item['category']))
+
+        if best is None:
+            self.representative.append(doc_id)
+            self.similarity.append(1.0)
+            return None
+        root = self.representative[best]
+        self.representative.append(root)
+        self.similarity.append(best_similarity)
+        return self.records[root][0]
+
+    def clusters(self):
+        """Clusters of two or more records, largest first.
+
+        Each cluster is a list of (code, project_name, category, similarity)
+        with the representative first.
+        """
+        members = {}
+        for doc_id, root in enumerate(self.representative):
+            members.setdefault(root, []).append(self.records[doc_id] + (self.similarity[doc_id],))
+        clusters = [group for group in members.values() if len(group) > 1]
+        clusters.sort(key=len, reverse=True)
+        return clusters
+
+    def duplicate_count(self):
+        """Number of records that joined an earlier record's cluster."""
+        return sum(1 for doc_id, root in enumerate(self.representative) if doc_id != root)
+
+
+def format_clusters(detector):
+    """Render the clusters as lines for the metadata log."""
+    clusters = detector.clusters()
+    lines = [
+        f"Method: MinHash ({len(detector.hasher.a)} permutations, {detector.bands} bands x "
+        f"{detector.rows} rows), Jaccard threshold {detector.threshold:.2f}",
+        f"Mode: {detector.mode}",
+        f"Near-duplicates: {detector.duplicate_count()} in {len(clusters)} clusters",
+    ]
+    for number, cluster in enumerate(clusters, 1):
+        lines.append("")
+        lines.append(f"Cluster {number} ({len(cluster)} descriptions):")
+        code, name, category, _ = cluster[0]
+        lines.append(f"  - {code}: {name} [{category}] (representative)")
+        for code, name, category, similarity in cluster[1:]:
+            lines.append(f"  - {code}: {name} [{category}] ~{similarity:.2f}")
+    return lines
@@ -0,0 +1,253 @@
+"""
+Streaming writers for the three collection outputs.
+
+Each writer appends one record at a time and flushes immediately, so output
+is visible as soon as the first project is fetched, memory stays flat however
+many projects are collected, and a crash keeps everything written so far.
+
+- StudentFileWriter: anonymized descriptions (student_descriptions.txt)
+- InstructorKeyWriter: JSON array of full records (instructor_key.json),
+  byte-for-byte what json.dump(records, f, indent=2) would produce
+- MetadataLogWriter: collection log (collection_metadata.txt); records are
+  profiled as they arrive (see corpus_stats) and the statistics are written
+  when the log is closed, optionally also as a JSON summary
+- CollectionWriter: fans each record out to all three (plus an optional
+  columnar_export.ColumnarKeyWriter), optionally passing it through a
+  near_duplicates.NearDuplicateDetector first
+"""
+
+import json
+from datetime import datetime
+
+from corpus_stats import CorpusProfiler, format_profile, write_summary
+from near_duplicates import format_clusters
+from trait_stats import format_trait_summary
+
+
+STUDENT_INSTRUCTIONS = [
+    "Read through these descriptions and perform axial coding.",
+    "Each description has a unique code (e.g., NFT12ABC345).",
+    "Use these codes when referring to specific items.",
+]
+
+
+class StudentFileWriter:
+    """Write the anonymized student file one description at a time."""
+
+    def __init__(self, output_path, instructions=STUDENT_INSTRUCTIONS):
+        self.output_path = output_path
+        self.f = open(output_path, 'w', encoding='utf-8')
+        self.f.write("NFT PROJECT DESCRIPTIONS - AXIAL CODING CHALLENGE\n")
+        self.f.write("=" * 80 + "\n\n")
+        self.f.write("Instructions:\n")
+        for line in instructions:
+            self.f.write(f"{line}\n")
+        self.f.write("\n" + "=" * 80 + "\n\n")
+        self.f.flush()
+
+    def write(self, item):
+        # Near-duplicate flags stay in the key and log: they would tell students how descriptions cluster
+        self.f.write(f"CODE: {item['code']}\n")
+        self.f.write("-" * 80 + "\n")
+        self.f.write(f"{item['description']}\n")
+        self.f.write("\n" + "=" * 80 + "\n\n")
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class InstructorKeyWriter:
+    """Write the instructor key as a JSON array, one element at a time."""
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.count = 0
+        self.f = open(output_path, 'w', encoding='utf-8')
+        self.f.write("[")
+        self.f.flush()
+
+    def write(self, item):
+        element = json.dumps(item, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+        self.f.write(("," if self.count else "") + "\n  " + element)
+        self.f.flush()
+        self.count += 1
+
+    def close(self):
+        self.f.write("\n]" if self.count else "]")
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MetadataLogWriter:
+    """Write the collection log, listing projects as they arrive.
+
+    Descriptions are fed to a CorpusProfiler; the category breakdown and
+    description statistics are written when the log is closed, and also
+    saved to ``summary_path`` as JSON when one is given. With a
+    ``detector`` the near-duplicate clusters are listed as well, and with a
+    TraitAggregator (``traits``) the trait statistics of the logged projects.
+    """
+
+    def __init__(self, output_path, source_lines=(), categories=(), summary_path=None,
+                 detector=None, traits=None):
+        self.output_path = output_path
+        self.summary_path = summary_path
+        self.detector = detector
+        self.traits = traits
+        self.projects = []
+        self.category_counts = {category: 0 for category in categories}
+        self.profiler = CorpusProfiler(categories)
+        self.current_category = None
+        self.f = open(output_path, 'w', encoding='utf-8')
+        self.f.write("DATA COLLECTION LOG\n")
+        self.f.write("=" * 80 + "\n\n")
+        self.f.write(f"Collection Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        for line in source_lines:
+            self.f.write(f"{line}\n")
+        self.f.write("\n\nPROJECTS COLLECTED:\n")
+        self.f.write("-" * 80 + "\n")
+        self.f.flush()
+
+    @property
+    def total(self):
+        return sum(self.category_counts.values())
+
+    def write(self, item):
+        category = item['category']
+        if category != self.current_category:
+            self.f.write(f"\n{category}:\n")
+            self.current_category = category
+        self.f.write(f"  - {item['code']}: {item['project_name']}\n")
+        self.f.flush()
+
+        self.category_counts[category] = self.category_counts.get(category, 0) + 1
+        self.profiler.add(item)
+        self.projects.append(item['project_name'])
+
+    def write_collapsed(self, item):
+        """List a near-duplicate that was left out of the other outputs."""
+        category = item['category']
+        if category != self.current_category:
+            self.f.write(f"\n{category}:\n")
+            self.current_category = category
+        self.f.write(f"  - {item['code']}: {item['project_name']} "
+                     f"(collapsed into {item['near_duplicate_of']})\n")
+        self.f.flush()
+
+    def close(self):
+        f = self.f
+        summary = self.profiler.summary()
+        f.write(f"\n\nTotal Descriptions Collected: {self.total}\n\n")
+
+        f.write("CATEGORY BREAKDOWN:\n")
+        f.write("-" * 80 + "\n")
+        for category, count in self.category_counts.items():
+            f.write(f"{category}: {count} descriptions\n")
+
+        f.write("\n\nDESCRIPTION STATISTICS:\n")
+        f.write("-" * 80 + "\n")
+        if self.total:
+            f.write(f"Total characters: {summary['total_characters']:,}\n")
+            f.write(f"Average length: {summary['total_characters'] // self.total:,} characters\n")
+            f.write(f"Shortest: {summary['min_length']:,} characters\n")
+            f.write(f"Longest: {summary['max_length']:,} characters\n")
+
+            # Estimate pages (assuming ~3000 chars per page)
+            f.write(f"\nEstimated pages (3000 chars/page): {summary['estimated_pages']:.1f} pages\n")
+
+            f.write("\n\nCORPUS PROFILE:\n")
+            f.write("-" * 80 + "\n")
+            for line in format_profile(summary):
+                f.write(f"{line}\n")
+        else:
+            f.write("No descriptions collected.\n")
+
+        if self.detector is not None:
+            f.write("\n\nNEAR-DUPLICATE CLUSTERS:\n")
+            f.write("-" * 80 + "\n")
+            for line in format_clusters(self.detector):
+                f.write(f"{line}\n")
+
+        if self.traits is not None:
+            f.write("\n\nTRAIT STATISTICS:\n")
+            f.write("-" * 80 + "\n")
+            for line in format_trait_summary(self.traits.summary(self.projects)):
+                f.write(f"{line}\n")
+        f.close()
+
+        if self.summary_path:
+            write_summary(summary, self.summary_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CollectionWriter:
+    """Send every record to the student file, instructor key and log together.
+
+    With a NearDuplicateDetector, each record is checked before it is
+    written. A near-duplicate gets a ``near_duplicate_of`` code; in flag
+    mode it is written as usual (the code appears in the instructor key and
+    log, never in the student file), in collapse mode it only appears in the
+    log.
+    A ``columnar`` writer receives the same records as the instructor key.
+    """
+
+    def __init__(self, student_path, key_path, log_path, instructions=STUDENT_INSTRUCTIONS,
+                 source_lines=(), categories=(), summary_path=None, detector=None, columnar=None,
+                 traits=None):
+        self.detector = detector
+        self.columnar = columnar
+        self.student = StudentFileWriter(student_path, instructions)
+        self.key = InstructorKeyWriter(key_path)
+        self.log = MetadataLogWriter(log_path, source_lines, categories, summary_path, detector, traits)
+
+    @property
+    def category_counts(self):
+        return self.log.category_counts
+
+    @property
+    def total(self):
+        return self.log.total
+
+    def write(self, item):
+        if self.detector is not None:
+            duplicate_of = self.detector.add(item)
+            if duplicate_of is not None:
+                item = dict(item, near_duplicate_of=duplicate_of)
+                if self.detector.collapse:
+                    self.log.write_collapsed(item)
+                    return
+        self.student.write(item)
+        self.key.write(item)
+        if self.columnar is not None:
+            self.columnar.write(item)
+        self.log.write(item)
+
+    def close(self):
+        self.student.close()
+        self.key.close()
+        if self.columnar is not None:
+            self.columnar.close()
+        self.log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,47 @@
+"""
+Project list files: which projects go into each category.
+
+Both fetch scripts read their categories from a project list file when one
+exists (default project_lists.json, written by select_projects.py) and fall
+back to their built-in lists otherwise. The file is JSON:
+
+    {
+      "categories": {
+        "CATEGORY_A_ANIMAL_APE": ["BoredApeYachtClub", ...],
+        "CATEGORY_B_FANTASY_ART": ["Azuki", ...]
+      },
+      ...selection details (ignored by the fetchers)...
+    }
+"""
+
+import json
+import os
+
+
+DEFAULT_PROJECT_LIST_PATH = "project_lists.json"
+
+
+def load_project_lists(path=DEFAULT_PROJECT_LIST_PATH):
+    """Return {category: [project, ...]} from a project list file, or None if it does not exist."""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    categories = data.get("categories") if isinstance(data, dict) else None
+    if not isinstance(categories, dict) or not categories or not all(
+        isinstance(projects, list) and all(isinstance(p, str) for p in projects)
+        for projects in categories.values()
+    ):
+        raise ValueError(f"{path} is not a project list file (expected a 'categories' mapping of name lists)")
+    return {category: list(projects) for category, projects in categories.items()}
+
+
+def save_project_lists(categories, path=DEFAULT_PROJECT_LIST_PATH, **details):
+    """Write a project list file; extra keyword arguments are stored alongside."""
+    data = {"categories": categories, **details}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return path
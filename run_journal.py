@@ -0,0 +1,124 @@
+"""
+Append-only checkpoint journal for resumable collection runs.
+
+Every project's outcome is appended to a JSON Lines file the moment it is
+known, so an interrupted run can be picked up with ``--resume``: projects
+that already finished (success or no description) are replayed from the
+journal instead of being fetched again, and only errors and unfinished
+projects are retried. The final outputs are then rebuilt in list order.
+
+The first line is a header recording the dataset revision and a digest of
+the project lists; a journal is only resumed against the same lists, so the
+replayed codes always match what a fresh run would produce.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+
+DEFAULT_JOURNAL_PATH = "collection_journal.jsonl"
+
+SUCCESS = "success"
+NO_DESCRIPTION = "no_description"
+ERROR = "error"
+FINISHED = (SUCCESS, NO_DESCRIPTION)
+
+
+class JournalMismatchError(ValueError):
+    """Raised when resuming a journal written for different inputs."""
+
+
+def projects_digest(categories):
+    """Digest of the category -> project list mapping being collected."""
+    data = json.dumps(categories, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+class RunJournal:
+    """JSON Lines journal of per-project results (use as a context manager)."""
+
+    def __init__(self, path, revision, categories, resume=False):
+        self.path = path
+        self.revision = revision
+        self.digest = projects_digest(categories)
+        self.entries = {}
+        self.resumed = False
+
+        if resume and os.path.exists(path):
+            self._load()
+            self.resumed = True
+            self.f = open(path, 'a', encoding='utf-8')
+        else:
+            self.f = open(path, 'w', encoding='utf-8')
+            self._append({
+                "type": "header",
+                "revision": revision,
+                "projects_digest": self.digest,
+                "started": datetime.now().isoformat(timespec="seconds"),
+            })
+
+    def _load(self):
+        with open(self.path, 'r+b') as f:
+            data = f.read()
+            # Drop a torn final line from a crash mid-write so the next
+            # append starts on a line of its own
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                f.truncate(end)
+        lines = data[:end].decode('utf-8').splitlines()
+
+        header = json.loads(lines[0]) if lines else {}
+        if header.get("type") != "header":
+            raise JournalMismatchError(f"{self.path} is not a collection journal")
+        if header.get("projects_digest") != self.digest:
+            raise JournalMismatchError("project lists changed since the journal was written")
+        if self.revision is not None and header.get("revision") != self.revision:
+            raise JournalMismatchError(
+                f"journal was written for revision {header.get('revision')}, not {self.revision}"
+            )
+        self.revision = header.get("revision")
+
+        for line in lines[1:]:
+            entry = json.loads(line)
+            # Later entries win, so a retried error is superseded by its result
+            self.entries[(entry["category"], entry["project"])] = entry
+
+    def _append(self, entry):
+        self.f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.f.flush()
+
+    def finished(self, category):
+        """Return {project: entry} for projects of a category that need no refetch."""
+        return {
+            project: entry
+            for (entry_category, project), entry in self.entries.items()
+            if entry_category == category and entry["status"] in FINISHED
+        }
+
+    def record(self, category, project, status, record=None, error=None):
+        """Append one project's outcome."""
+        entry = {"category": category, "project": project, "status": status}
+        if record is not None:
+            entry["record"] = record
+        if error is not None:
+            entry["error"] = error
+        self.entries[(category, project)] = entry
+        self._append(entry)
+
+    def counts(self):
+        """Number of journaled projects per status."""
+        counts = {SUCCESS: 0, NO_DESCRIPTION: 0, ERROR: 0}
+        for entry in self.entries.values():
+            counts[entry["status"]] += 1
+        return counts
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,209 @@
+"""
+Run instrumentation for the fetch scripts.
+
+RunMetrics records how long each stage of a run takes (resolving the
+revision, listing, cache lookups, downloads or NFT1000 queries, JSON
+parsing, writing), per-project latency, bytes transferred, retries and cache
+hits, and summarizes them as p50/p95/p99 percentiles. It is thread-safe, so
+the download workers can report into it directly; work done while a
+project() block is open on a thread is attributed to that project.
+
+The results are written as a JSON trace (summary, per-project records and a
+time-ordered list of stage events) and as a RUN TIMING section appended to
+collection_metadata.txt. profile_call() runs a function under cProfile for
+the scripts' --profile option.
+"""
+
+import json
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+
+DEFAULT_TRACE_PATH = "collection_trace.json"
+DEFAULT_PROFILE_PATH = "collection_profile.prof"
+PERCENTILES = (50, 95, 99)
+PROFILE_TOP = 20
+
+
+def percentiles(samples):
+    """p50/p95/p99 of a sequence of seconds (zeros when empty)."""
+    import numpy as np
+
+    if not len(samples):
+        return {f"p{p}": 0.0 for p in PERCENTILES}
+    values = np.percentile(np.asarray(samples, dtype=np.float64), PERCENTILES)
+    return {f"p{p}": round(float(v), 6) for p, v in zip(PERCENTILES, values)}
+
+
+class RunMetrics:
+    """Thread-safe stage timers, counters and per-project records."""
+
+    def __init__(self):
+        self.started = datetime.now()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stage_samples = defaultdict(lambda: array('d'))
+        self.counters = Counter()
+        self.projects = []
+        self.events = []
+        self.finished = None
+
+    def _now(self):
+        return time.perf_counter() - self._t0
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block as one sample of ``name``."""
+        start = self._now()
+        try:
+            yield
+        finally:
+            duration = self._now() - start
+            project = getattr(self._local, "project", None)
+            with self._lock:
+                self.stage_samples[name].append(duration)
+                self.events.append((start, name, duration, project["project"] if project else None))
+                if project is not None:
+                    project["stages"][name] = project["stages"].get(name, 0.0) + duration
+
+    def count(self, name, n=1):
+        """Add to a run counter (and to the current project's, if any)."""
+        project = getattr(self._local, "project", None)
+        with self._lock:
+            self.counters[name] += n
+            if project is not None:
+                project[name] = project.get(name, 0) + n
+
+    @contextmanager
+    def project(self, name, category=None):
+        """Attribute the stages and counts in this block to one project.
+
+        Yields the project's record; set its "source" and "status" keys.
+        """
+        record = {"project": name, "category": category, "source": None, "status": None,
+                  "start": round(self._now(), 6), "stages": {}}
+        self._local.project = record
+        try:
+            yield record
+        finally:
+            self._local.project = None
+            record["latency"] = round(self._now() - record["start"], 6)
+            record["stages"] = {stage: round(seconds, 6) for stage, seconds in record["stages"].items()}
+            with self._lock:
+                self.projects.append(record)
+
+    @contextmanager
+    def bind(self, record):
+        """Attribute this thread's stages and counts to a record from project().
+
+        For work a project hands to another thread (see fetch_engine).
+        """
+        previous = getattr(self._local, "project", None)
+        self._local.project = record
+        try:
+            yield record
+        finally:
+            self._local.project = previous
+
+    def finish(self):
+        self.finished = self._now()
+
+    def summary(self):
+        """Aggregate figures as a JSON-serializable dict."""
+        with self._lock:
+            stages = {}
+            for name, samples in self.stage_samples.items():
+                stages[name] = {
+                    "count": len(samples),
+                    "total": round(sum(samples), 6),
+                    "mean": round(sum(samples) / len(samples), 6) if samples else 0.0,
+                    "max": round(max(samples), 6) if samples else 0.0,
+                    **percentiles(samples),
+                }
+            latencies = [p["latency"] for p in self.projects]
+            sources = Counter(p["source"] or "unknown" for p in self.projects)
+            statuses = Counter(p["status"] or "unknown" for p in self.projects)
+            return {
+                "started": self.started.isoformat(timespec="seconds"),
+                "wall_time": round(self.finished if self.finished is not None else self._now(), 6),
+                "projects": {
+                    "count": len(self.projects),
+                    "latency": percentiles(latencies),
+                    "sources": dict(sources),
+                    "statuses": dict(statuses),
+                },
+                "counters": dict(self.counters),
+                "stages": stages,
+            }
+
+    def write_trace(self, path=DEFAULT_TRACE_PATH):
+        """Write the summary, per-project records and stage events as JSON."""
+        trace = self.summary()
+        with self._lock:
+            trace["project_records"] = sorted(self.projects, key=lambda p: p["start"])
+            trace["events"] = [
+                {"t": round(start, 6), "stage": name, "duration": round(duration, 6), "project": project}
+                for start, name, duration, project in sorted(self.events)
+            ]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f, indent=2, ensure_ascii=False)
+        return path
+
+    def format_summary(self):
+        """Render the summary as lines for the metadata log."""
+        summary = self.summary()
+        projects = summary["projects"]
+        counters = summary["counters"]
+        latency = projects["latency"]
+        lines = [
+            f"Wall time: {summary['wall_time']:.2f}s",
+            f"Projects: {projects['count']} (latency p50 {latency['p50']:.3f}s, "
+            f"p95 {latency['p95']:.3f}s, p99 {latency['p99']:.3f}s)",
+        ]
+        if projects["sources"]:
+            lines.append("Sources: " + ", ".join(f"{source} {n}" for source, n in sorted(projects["sources"].items())))
+        if "bytes" in counters:
+            lines.append(f"Bytes transferred: {counters['bytes']:,}")
+        if "cache_hits" in counters or "cache_misses" in counters:
+            lines.append(f"Cache: {counters.get('cache_hits', 0)} hits, {counters.get('cache_misses', 0)} misses")
+        lines.append(f"Retries: {counters.get('retries', 0)}")
+
+        lines.append("")
+        lines.append(f"{'Stage':<16}{'Count':>7}{'Total':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+        for name, stage in sorted(summary["stages"].items(), key=lambda item: -item[1]["total"]):
+            lines.append(f"{name:<16}{stage['count']:>7}{stage['total']:>9.3f}s"
+                         f"{stage['p50']:>9.4f}s{stage['p95']:>9.4f}s{stage['p99']:>9.4f}s")
+        return lines
+
+    def append_to_log(self, log_path):
+        """Append a RUN TIMING section to a finished metadata log."""
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.write("\n\nRUN TIMING:\n")
+            f.write("-" * 80 + "\n")
+            for line in self.format_summary():
+                f.write(f"{line}\n")
+
+
+def profile_call(func, *args, stats_path=DEFAULT_PROFILE_PATH):
+    """Run func(*args) under cProfile, dump the stats and print the top entries."""
+    import cProfile
+    import io
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args)
+    finally:
+        profiler.dump_stats(stats_path)
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        print(f"\n{'='*60}")
+        print(f"PROFILE (top {PROFILE_TOP} by cumulative time)")
+        print(f"{'='*60}")
+        print(report.getvalue().strip())
+        print(f"\n✓ Profile saved to: {stats_path} (view with: python -m pstats {stats_path})")
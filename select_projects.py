@@ -0,0 +1,277 @@
+"""
+Pick the project lists automatically from the whole NFT1000 corpus.
+
+Instead of hand-curating CATEGORY_A/CATEGORY_B, this script searches every
+description for N projects per category that separate as cleanly as
+possible while adding up to the target length (the README's ~120,000
+characters, about 40 pages):
+
+1. all descriptions are vectorized once as TF-IDF (cluster_validation.tfidf)
+2. each category starts from an anchor: the centroid of its seed projects
+   (by default the fetch script's current lists), or a k-means centroid with
+   --auto
+3. the categories then take turns greedily adding the project with the best
+   score: its margin (similarity to its own category's centroid minus the
+   best other one) less a penalty for straying from the length still needed
+   per slot; centroids are updated after every pick, and projects too close
+   to one already chosen are skipped
+
+Each step is one sparse-dense product over the corpus, so a selection over
+all 1,001 descriptions takes about a second. The result is checked with
+cluster_validation and written as a project list file (project_lists.json)
+that both fetch scripts read instead of their built-in lists.
+
+Usage:
+    python extract_nft_descriptions.py /path/to/NFT-Net   # -> nft1000_descriptions.json
+    python select_projects.py nft1000_descriptions.json --per-category 20
+    python select_projects.py --from-cache main           # corpus from the metadata cache
+"""
+
+import argparse
+import json
+from datetime import datetime
+
+import numpy as np
+
+from cluster_validation import format_report, kmeans, tfidf, validate, verdict
+from fetch_descriptions_for_coding import CATEGORY_A_ANIMAL_APE, CATEGORY_B_FANTASY_ART
+from metadata_cache import DEFAULT_CACHE_DIR, MetadataCache
+from name_index import NameIndex
+from project_lists import DEFAULT_PROJECT_LIST_PATH, load_project_lists, save_project_lists
+
+
+DEFAULT_CORPUS_PATH = "nft1000_descriptions.json"
+DEFAULT_PER_CATEGORY = 20
+DEFAULT_TARGET_CHARS = 120000
+DEFAULT_MIN_CHARS = 100
+DEFAULT_MAX_SIMILARITY = 0.8
+DEFAULT_LENGTH_WEIGHT = 0.05
+
+DEFAULT_SEEDS = {
+    "CATEGORY_A_ANIMAL_APE": CATEGORY_A_ANIMAL_APE,
+    "CATEGORY_B_FANTASY_ART": CATEGORY_B_FANTASY_ART,
+}
+
+PLACEHOLDER_DESCRIPTIONS = {"", "no description available"}
+
+
+def load_corpus(path):
+    """Load [{project_name, description}] from an extract or instructor key JSON file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+    return [{"project_name": r["project_name"], "description": r.get("description") or ""} for r in records]
+
+
+def load_cached_corpus(cache_dir, revision):
+    """Load every record the metadata cache holds for a revision (branch names must be cached)."""
+    with MetadataCache(cache_dir) as cache:
+        commit = cache.resolve_ref(revision) or revision
+        return [{"project_name": project, "description": record.get("description") or ""}
+                for project, record in cache.records(commit)]
+
+
+def usable(records, min_chars=DEFAULT_MIN_CHARS):
+    """Drop placeholder, very short and duplicate descriptions (keeping the first)."""
+    seen = set()
+    kept = []
+    for record in records:
+        text = record["description"].strip()
+        if len(text) < min_chars or text.lower() in PLACEHOLDER_DESCRIPTIONS or text in seen:
+            continue
+        seen.add(text)
+        kept.append(record)
+    return kept
+
+
+def _row(matrix, i):
+    dense = np.zeros(matrix.shape[1])
+    start, end = matrix.indptr[i], matrix.indptr[i + 1]
+    dense[matrix.indices[start:end]] = matrix.data[start:end]
+    return dense
+
+
+def _normalize(vector):
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def seed_anchors(matrix, records, seeds):
+    """Centroids of each category's seed projects (names resolved with NameIndex)."""
+    index = NameIndex([record["project_name"] for record in records])
+    positions = {record["project_name"]: i for i, record in enumerate(records)}
+    anchors, seeded = [], {}
+    for category, names in seeds.items():
+        members = []
+        for name in names:
+            match = index.resolve(name).match
+            if match is not None and match in positions:
+                members.append(positions[match])
+        if not members:
+            raise ValueError(f"None of the seed projects for {category} are in the corpus")
+        anchors.append(_normalize(sum(_row(matrix, i) for i in members)))
+        seeded[category] = members
+    return np.array(anchors), seeded
+
+
+def select(matrix, lengths, anchors, per_category, target_chars=DEFAULT_TARGET_CHARS,
+           length_weight=DEFAULT_LENGTH_WEIGHT, max_similarity=DEFAULT_MAX_SIMILARITY):
+    """
+    Greedily pick ``per_category`` rows per anchor.
+
+    Args:
+        matrix: TfidfMatrix of candidate descriptions
+        lengths: Character length of each description
+        anchors: k x V starting centroids, one per category
+        per_category: Projects to pick for each category
+        target_chars: Total characters wanted across all categories
+        length_weight: Weight of the length penalty against the margin
+        max_similarity: Skip candidates at least this similar to a chosen one
+
+    Returns:
+        list of k lists of row indices, in pick order
+    """
+    k = len(anchors)
+    n = matrix.shape[0]
+    lengths = np.asarray(lengths, dtype=np.float64)
+    centroids = anchors.copy()
+    # The anchor counts as one member, so early picks cannot drag a category away from it
+    sums = anchors.copy()
+    available = np.ones(n, dtype=bool)
+    closest_chosen = np.zeros(n)
+    budgets = np.full(k, target_chars / k)
+    chosen = [[] for _ in range(k)]
+
+    for slot in range(per_category):
+        for c in range(k):
+            candidates = available & (closest_chosen < max_similarity)
+            if not candidates.any():
+                return chosen
+            similarities = matrix.dot(centroids.T)
+            others = np.delete(similarities, c, axis=1)
+            margin = similarities[:, c] - (others.max(axis=1) if k > 1 else 0)
+
+            # Length still needed per remaining slot in this category
+            ideal = max(budgets[c] / (per_category - slot), 1.0)
+            penalty = np.abs(lengths - ideal) / ideal
+            score = np.where(candidates, margin - length_weight * penalty, -np.inf)
+
+            pick = int(score.argmax())
+            chosen[c].append(pick)
+            available[pick] = False
+            budgets[c] -= lengths[pick]
+
+            row = _row(matrix, pick)
+            closest_chosen = np.maximum(closest_chosen, matrix.dot(row[:, None])[:, 0])
+            sums[c] += row
+            centroids[c] = _normalize(sums[c])
+    return chosen
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Select maximally separable project lists from NFT1000.")
+    parser.add_argument("corpus", nargs="?", default=DEFAULT_CORPUS_PATH,
+                        help=f"descriptions JSON from extract_nft_descriptions.py (default {DEFAULT_CORPUS_PATH})")
+    parser.add_argument("--from-cache", metavar="REVISION", default=None,
+                        help="read the corpus from the metadata cache for this revision instead")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR),
+                        help=f"metadata cache directory (default {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--per-category", type=int, default=DEFAULT_PER_CATEGORY,
+                        help=f"projects per category (default {DEFAULT_PER_CATEGORY})")
+    parser.add_argument("--target-chars", type=int, default=DEFAULT_TARGET_CHARS,
+                        help=f"total characters to aim for (default {DEFAULT_TARGET_CHARS:,})")
+    parser.add_argument("--length-weight", type=float, default=DEFAULT_LENGTH_WEIGHT,
+                        help=f"weight of the length target against separation (default {DEFAULT_LENGTH_WEIGHT})")
+    parser.add_argument("--max-similarity", type=float, default=DEFAULT_MAX_SIMILARITY,
+                        help=f"skip projects this similar to one already chosen (default {DEFAULT_MAX_SIMILARITY})")
+    parser.add_argument("--min-chars", type=int, default=DEFAULT_MIN_CHARS,
+                        help=f"ignore descriptions shorter than this (default {DEFAULT_MIN_CHARS})")
+    parser.add_argument("--seeds", default=None,
+                        help="project list file whose categories seed the search (default: built-in lists)")
+    parser.add_argument("--auto", type=int, metavar="K", default=None,
+                        help="ignore seeds and discover K categories with k-means")
+    parser.add_argument("--output", default=DEFAULT_PROJECT_LIST_PATH,
+                        help=f"project list file to write (default {DEFAULT_PROJECT_LIST_PATH})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print(f"\n{'='*60}")
+    print("PROJECT LIST SELECTION")
+    print(f"{'='*60}")
+
+    if args.from_cache:
+        source = f"metadata cache ({args.cache_dir}, revision {args.from_cache})"
+        records = load_cached_corpus(args.cache_dir, args.from_cache)
+    else:
+        source = args.corpus
+        records = load_corpus(args.corpus)
+    candidates = usable(records, args.min_chars)
+    print(f"Corpus: {source}")
+    print(f"✓ {len(candidates)} usable descriptions ({len(records) - len(candidates)} empty, short or duplicate)")
+
+    matrix = tfidf([record["description"] for record in candidates])
+    lengths = [len(record["description"]) for record in candidates]
+
+    if args.auto:
+        _, anchors = kmeans(matrix, args.auto)
+        names = [f"CATEGORY_{i + 1}" for i in range(args.auto)]
+        print(f"✓ Discovered {args.auto} categories with k-means")
+    else:
+        if args.seeds:
+            seeds = load_project_lists(args.seeds)
+            if seeds is None:
+                print(f"✗ Seed file not found: {args.seeds}")
+                return
+        else:
+            seeds = DEFAULT_SEEDS
+        try:
+            anchors, seeded = seed_anchors(matrix, candidates, seeds)
+        except ValueError as e:
+            print(f"✗ {e}")
+            return
+        names = list(seeds)
+        for name in names:
+            print(f"✓ {name}: {len(seeded[name])} of {len(seeds[name])} seed projects found")
+
+    if len(candidates) < args.per_category * len(names):
+        print(f"✗ Only {len(candidates)} usable descriptions for {args.per_category} x {len(names)} projects")
+        return
+
+    chosen = select(matrix, lengths, anchors, args.per_category, args.target_chars,
+                    args.length_weight, args.max_similarity)
+    categories = {name: [candidates[i]["project_name"] for i in rows] for name, rows in zip(names, chosen)}
+    total_chars = sum(lengths[i] for rows in chosen for i in rows)
+
+    selected = [dict(candidates[i], category=name) for name, rows in zip(names, chosen) for i in rows]
+    report = validate(selected)
+
+    for name, projects in categories.items():
+        print(f"\n{name} ({len(projects)} projects):")
+        for project in projects:
+            print(f"  - {project}")
+    print(f"\nTotal characters: {total_chars:,} (target {args.target_chars:,}, "
+          f"~{total_chars / 3000:.1f} pages)")
+    print("\nCluster check:")
+    for line in format_report(report):
+        print(f"  {line}" if line else "")
+
+    save_project_lists(
+        categories, args.output,
+        created=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        source=source,
+        target_chars=args.target_chars,
+        total_chars=total_chars,
+        validation={algorithm: {key: result[key] for key in ("purity", "silhouette", "adjusted_rand_index")}
+                    for algorithm, result in report["algorithms"].items()},
+    )
+    if not verdict(report):
+        print("\n⚠️  The selected categories do not separate cleanly - try other seeds or --auto")
+    print(f"\n✓ Saved project lists to: {args.output}")
+    print("Both fetch scripts will use these lists (pass --projects to choose another file).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""
+Split a collection across machines and merge the pieces.
+
+With --shard i/N, fetch_descriptions_for_coding.py and fetch_using_nfthub.py
+fetch only their slice of the project lists and write it to a partial file
+(shards/shard-i-of-N.jsonl) instead of the outputs. `python sharding.py
+merge` then builds the student file, instructor key and metadata log from
+the N partials, identical to what one machine would have written:
+
+1. projects are ordered by a BLAKE2 hash of their name and dealt out in
+   turn, so every shard gets the same number of projects (give or take
+   one) and the split does not depend on list order or on the machine
+2. a partial holds the shard's records, in list order, plus a header
+   with everything the merge needs: the dataset revision, the full
+   project lists, the projects to issue codes to, the log header lines,
+   the student instructions and the output options
+3. shards do not issue codes (the code registry and its key stay on the
+   merging machine) and do not look for near-duplicates; the merge issues
+   codes from the registry in list order, exactly as a single run does,
+   and writes every record through the usual CollectionWriter
+
+Usage:
+    python fetch_descriptions_for_coding.py --shard 1/4     # on each machine, 1/4 to 4/4
+    python sharding.py merge shards/                        # after copying the partials together
+    python sharding.py plan --shards 4                      # show the split
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from pathlib import Path
+
+from code_registry import DEFAULT_REGISTRY_PATH, CodeRegistry
+from cohorts import cohort_count
+from project_lists import DEFAULT_PROJECT_LIST_PATH, load_project_lists
+from run_journal import projects_digest
+from trait_stats import DEFAULT_STORE_PATH as DEFAULT_TRAIT_STORE_PATH
+
+
+DEFAULT_SHARD_DIR = "shards"
+SHARD_HASH_BYTES = 8
+VERSION = 1
+
+
+class ShardMismatchError(ValueError):
+    """Raised when partials do not belong to one sharded collection."""
+
+
+def parse_shard(text):
+    """'2/4' -> (2, 4) (the argparse type of --shard; shards count from 1)."""
+    try:
+        index, shards = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, e.g. 1/4, got {text!r}")
+    if not 1 <= index <= shards:
+        raise argparse.ArgumentTypeError(f"shard {index} is not between 1 and {shards}")
+    return index, shards
+
+
+def _shard_order(project):
+    return hashlib.blake2b(project.encode('utf-8'), digest_size=SHARD_HASH_BYTES).digest(), project
+
+
+def select_shard(categories, index, shards):
+    """The categories restricted to shard ``index`` of ``shards`` (lists keep their order)."""
+    projects = sorted(dict.fromkeys(p for names in categories.values() for p in names), key=_shard_order)
+    mine = set(projects[index - 1::shards])
+    return {category: [project for project in names if project in mine] for category, names in categories.items()}
+
+
+def shard_path(path, index, shards):
+    """Per-shard variant of a file name: journal.jsonl -> journal.shard-1-of-4.jsonl."""
+    path = Path(path)
+    return str(path.with_name(f"{path.stem}.shard-{index}-of-{shards}{path.suffix}"))
+
+
+def partial_path(shard_dir, index, shards):
+    return Path(shard_dir) / f"shard-{index}-of-{shards}.jsonl"
+
+
+class ShardWriter:
+    """Write one shard's records to its partial file (in place of CollectionWriter).
+
+    The file is JSON Lines: a header, one line per record and an end line,
+    so the merge can tell a finished shard from an interrupted one.
+    """
+
+    def __init__(self, shard_dir, index, shards, revision, categories, coded, source_lines, instructions,
+                 options=None):
+        """
+        Args:
+            shard_dir: Directory for the partial file
+            index, shards: This shard and the shard count
+            revision: Dataset revision the shard collected
+            categories: The full {category: [project, ...]}, not just this shard's
+            coded: Projects a single run would issue codes to, in order
+            source_lines: Metadata log header lines of the fetch script
+            instructions: Student file instructions of the fetch script
+            options: Output options for the merge (dedup, dedup_threshold, columnar)
+        """
+        Path(shard_dir).mkdir(parents=True, exist_ok=True)
+        self.output_path = partial_path(shard_dir, index, shards)
+        self.category_counts = {category: 0 for category in categories}
+        self.started = time.perf_counter()
+        self.f = open(self.output_path, 'w', encoding='utf-8')
+        self._append({
+            "type": "header",
+            "version": VERSION,
+            "shard": index,
+            "shards": shards,
+            "revision": revision,
+            "projects_digest": projects_digest(categories),
+            "categories": categories,
+            "coded": coded,
+            "source_lines": list(source_lines),
+            "instructions": list(instructions),
+            "options": options or {},
+        })
+
+    @property
+    def total(self):
+        return sum(self.category_counts.values())
+
+    def _append(self, entry):
+        self.f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.f.flush()
+
+    def write(self, item):
+        self._append({"type": "record", "record": item})
+        self.category_counts[item["category"]] = self.category_counts.get(item["category"], 0) + 1
+
+    def close(self):
+        """Mark the partial finished."""
+        self._append({"type": "end", "records": self.total,
+                      "seconds": round(time.perf_counter() - self.started, 3)})
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        # An interrupted shard gets no end line, so the merge refuses it
+        if exc_type is None:
+            self.close()
+        else:
+            self.f.close()
+
+
+def read_partial(path):
+    """(header, records, end) of a partial file; end is None if the shard did not finish."""
+    header, records, end = None, [], None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry["type"] == "header":
+                header = entry
+            elif entry["type"] == "record":
+                records.append(entry["record"])
+            elif entry["type"] == "end":
+                end = entry
+    if header is None or header.get("version") != VERSION:
+        raise ShardMismatchError(f"{path} is not a shard partial")
+    return header, records, end
+
+
+def read_partials(shard_dir):
+    """
+    Read and check the partials of one sharded collection.
+
+    Returns:
+        (header of shard 1, {(category, project): record}, [(shard, records, seconds), ...])
+
+    Raises:
+        ShardMismatchError: if shards are missing, unfinished or disagree on
+            the revision, project lists or output options
+    """
+    paths = sorted(Path(shard_dir).glob("shard-*-of-*.jsonl"))
+    if not paths:
+        raise ShardMismatchError(f"no shard partials in {shard_dir}")
+    partials = {}
+    for path in paths:
+        header, records, end = read_partial(path)
+        if end is None:
+            raise ShardMismatchError(f"shard {header['shard']}/{header['shards']} did not finish ({path})")
+        partials[header["shard"]] = (header, records, end)
+
+    first = partials[min(partials)][0]
+    shards = first["shards"]
+    for header, _, _ in partials.values():
+        for field in ("shards", "revision", "projects_digest", "source_lines", "instructions", "options"):
+            if header[field] != first[field]:
+                raise ShardMismatchError(f"shard {header['shard']} has a different {field} than shard {first['shard']}")
+    missing = [str(index) for index in range(1, shards + 1) if index not in partials]
+    if missing:
+        raise ShardMismatchError(f"missing shard(s) {', '.join(missing)} of {shards} in {shard_dir}")
+
+    records = {}
+    for index in range(1, shards + 1):
+        header, shard_records, _ = partials[index]
+        mine = select_shard(first["categories"], index, shards)
+        expected = {project for names in mine.values() for project in names}
+        for record in shard_records:
+            if record["project_name"] not in expected:
+                raise ShardMismatchError(f"shard {index} holds {record['project_name']}, which is not in its slice")
+            records[(record["category"], record["project_name"])] = record
+    summaries = [(index, len(partials[index][1]), partials[index][2]["seconds"]) for index in sorted(partials)]
+    return partials[1][0], records, summaries
+
+
+def merge(shard_dir=DEFAULT_SHARD_DIR, code_registry=DEFAULT_REGISTRY_PATH, student_file="student_descriptions.txt",
+          instructor_key="instructor_key.json", metadata_log="collection_metadata.txt",
+          stats_summary="collection_stats.json", metrics=None, traits=None):
+    """
+    Build the collection outputs from the partials in shard_dir.
+
+    With a trait_stats.TraitAggregator (``traits``) the metadata log gets the
+    trait statistics of the merged projects, as in a single run.
+
+    Returns:
+        (CollectionWriter that wrote them, header of the partials, shard summaries)
+    """
+    from columnar_export import ColumnarKeyWriter, available as columnar_available, output_path as columnar_path
+    from near_duplicates import NearDuplicateDetector
+    from output_writers import CollectionWriter
+    from run_metrics import RunMetrics
+
+    metrics = metrics if metrics is not None else RunMetrics()
+    with metrics.stage("read_partials"):
+        header, records, summaries = read_partials(shard_dir)
+    registry = CodeRegistry(code_registry)
+    with metrics.stage("assign_codes"):
+        registry.assign(header["coded"])
+        registry.save()
+
+    options = header["options"]
+    dedup = options.get("dedup", "off")
+    detector = None if dedup == "off" else NearDuplicateDetector(options["dedup_threshold"], dedup)
+    columnar = None
+    if options.get("columnar", "none") != "none":
+        if columnar_available():
+            columnar = ColumnarKeyWriter(columnar_path(instructor_key, options["columnar"]), options["columnar"],
+                                         header["revision"])
+        else:
+            print(f"⚠️  pyarrow not installed - skipping the {options['columnar']} export of {instructor_key}")
+
+    with CollectionWriter(student_file, instructor_key, metadata_log,
+                          instructions=header["instructions"],
+                          source_lines=header["source_lines"],
+                          categories=header["categories"].keys(),
+                          summary_path=stats_summary,
+                          detector=detector,
+                          columnar=columnar,
+                          traits=traits) as writer:
+        for category, projects in header["categories"].items():
+            for project in projects:
+                record = records.get((category, project))
+                if record is None:
+                    continue
+                record["code"] = registry.code(project)
+                with metrics.stage("write"):
+                    writer.write(record)
+    return writer, header, summaries
+
+
+def append_shard_summary(log_path, summaries):
+    """Append a SHARDS section (records and fetch time per shard) to the metadata log."""
+    with open(log_path, 'a', encoding='utf-8') as f:
+        f.write("\n\nSHARDS:\n")
+        f.write("-" * 80 + "\n")
+        for index, count, seconds in summaries:
+            f.write(f"Shard {index}/{len(summaries)}: {count} records in {seconds:.2f}s\n")
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Merge sharded collections or show how projects are split.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    merge_parser = commands.add_parser("merge", help="build the outputs from the shard partials")
+    merge_parser.add_argument("shard_dir", nargs="?", default=DEFAULT_SHARD_DIR,
+                              help=f"directory holding every shard-i-of-N.jsonl (default {DEFAULT_SHARD_DIR})")
+    merge_parser.add_argument("--code-registry", default=DEFAULT_REGISTRY_PATH,
+                              help=f"code registry to issue codes from (default {DEFAULT_REGISTRY_PATH})")
+    merge_parser.add_argument("--cohorts", type=cohort_count, metavar="K", default=0,
+                              help="also build K cohort packages, as the fetch scripts do")
+    merge_parser.add_argument("--cohort-dir", default=None,
+                              help="directory for the cohort packages (default: the fetch scripts' default)")
+    merge_parser.add_argument("--trait-stats", nargs="?", const=DEFAULT_TRAIT_STORE_PATH, default=None,
+                              metavar="PATH", help=f"add trait statistics from --local-dir to the metadata log "
+                                                   f"(counts kept in PATH, default {DEFAULT_TRAIT_STORE_PATH})")
+    merge_parser.add_argument("--local-dir", default=None,
+                              help="NFT-Net checkout (containing NFT1000/) for --trait-stats")
+    plan_parser = commands.add_parser("plan", help="show which projects each shard fetches")
+    plan_parser.add_argument("--shards", type=int, required=True)
+    plan_parser.add_argument("--projects", default=DEFAULT_PROJECT_LIST_PATH,
+                             help=f"project list file (default {DEFAULT_PROJECT_LIST_PATH}, "
+                                  f"else the built-in lists)")
+    plan_parser.add_argument("--verbose", action="store_true", help="list every shard's projects")
+    return parser.parse_args(argv)
+
+
+def plan(args):
+    categories = load_project_lists(args.projects)
+    if categories is None:
+        from fetch_descriptions_for_coding import CATEGORY_A_ANIMAL_APE, CATEGORY_B_FANTASY_ART
+        categories = {"CATEGORY_A_ANIMAL_APE": CATEGORY_A_ANIMAL_APE, "CATEGORY_B_FANTASY_ART": CATEGORY_B_FANTASY_ART}
+    for index in range(1, args.shards + 1):
+        mine = select_shard(categories, index, args.shards)
+        counts = ", ".join(f"{category} {len(names)}" for category, names in mine.items())
+        print(f"Shard {index}/{args.shards}: {sum(len(names) for names in mine.values())} projects ({counts})")
+        if args.verbose:
+            for names in mine.values():
+                for project in names:
+                    print(f"  {project}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "plan":
+        return plan(args)
+
+    traits = None
+    if args.trait_stats:
+        if not args.local_dir:
+            print("✗ --trait-stats needs --local-dir")
+            return
+        from trait_stats import TraitAggregator
+        try:
+            traits = TraitAggregator(args.local_dir, args.trait_stats)
+        except ValueError as e:
+            print(f"✗ {e}")
+            return
+    try:
+        writer, header, summaries = merge(args.shard_dir, args.code_registry, traits=traits)
+    except (OSError, ValueError) as e:
+        print(f"✗ Cannot merge {args.shard_dir}: {e}")
+        return
+    print(f"✓ Merged {len(summaries)} shards: {writer.total} descriptions")
+    for category, count in writer.category_counts.items():
+        print(f"  {category}: {count}")
+    outputs = [writer.student.output_path, writer.key.output_path, writer.log.output_path]
+    if writer.columnar is not None:
+        outputs.append(writer.columnar.output_path)
+
+    with open(writer.key.output_path, 'r', encoding='utf-8') as f:
+        key_records = json.load(f)
+    if key_records:
+        from cluster_validation import format_report, validate, verdict
+        report = validate(key_records)
+        print("\nCluster check (TF-IDF clustering vs. categories):")
+        for line in format_report(report):
+            print(f"  {line}" if line else "")
+        if not verdict(report):
+            print("⚠️  The categories do not separate cleanly - consider revising the project lists")
+
+    if args.cohorts:
+        from cohorts import DEFAULT_COHORT_DIR, build_cohorts
+        cohort_dir = args.cohort_dir or DEFAULT_COHORT_DIR
+        build_cohorts(key_records, args.cohorts, cohort_dir, args.code_registry,
+                      instructions=header["instructions"])
+        outputs.append(f"{cohort_dir}/")
+
+    append_shard_summary(writer.log.output_path, summaries)
+    print(f"\n✓ Wrote {', '.join(str(path) for path in outputs)}")
+
+
+if __name__ == "__main__":
+    main()
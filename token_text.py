@@ -0,0 +1,239 @@
+"""
+Streaming summaries of the per-token text in a local NFT-Net checkout.
+
+Besides metadata_dashboard.json, every NFT1000 project has a captions/ and a
+prompts/ directory with one small text file per token - tens of thousands per
+project. TokenTextSummarizer turns each directory into its most frequent
+phrases without ever holding the directory in memory:
+
+1. files are taken from os.scandir as it lists them, in batches of
+   batch_size, and each batch is read by a thread pool with every file cut at
+   MAX_FILE_BYTES, so at most batch_size * MAX_FILE_BYTES of text (and
+   batch_size names) per directory being summarized is in memory at once
+2. every text contributes its distinct word bigrams and trigrams (phrases
+   starting or ending with a stopword are skipped), so a phrase's count is
+   the number of captions or prompts that contain it
+3. counts go into a PhraseCounter holding at most 2 * capacity phrases; when
+   it is full the rarest are pruned, so memory stays fixed and the counts
+   may be slightly low on very long tails (marked "approximate")
+
+.txt files are read as plain text; in .json files every string value is.
+The fetch scripts and extract_nft_descriptions.py add the summary of each
+project to their records as "token_text" (--token-phrases K), summarizing
+several projects at once next to the metadata fetch rather than after it.
+"""
+
+import heapq
+import json
+import os
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from corpus_stats import tokenize
+
+
+TEXT_DIRS = ("captions", "prompts")
+DEFAULT_TOP_K = 10
+DEFAULT_BATCH_FILES = 512
+DEFAULT_CAPACITY = 5000
+DEFAULT_READ_WORKERS = 16
+DEFAULT_PROJECT_WORKERS = 4
+MAX_FILE_BYTES = 64 * 1024
+
+STOPWORDS = frozenset(
+    "a an the and or of in on at to for with by from as is are was be it its this that "
+    "there their his her has have while".split()
+)
+
+
+def _order(item):
+    return -item[1], item[0]
+
+
+def phrases(text):
+    """Distinct word bigrams and trigrams of a text, without stopword edges."""
+    tokens = tokenize(text)
+    found = {f"{a} {b}" for a, b in zip(tokens, tokens[1:])
+             if a not in STOPWORDS and b not in STOPWORDS}
+    found.update(f"{a} {b} {c}" for a, b, c in zip(tokens, tokens[1:], tokens[2:])
+                 if a not in STOPWORDS and c not in STOPWORDS)
+    return found
+
+
+def read_text(path, max_bytes=MAX_FILE_BYTES):
+    """Text of one caption/prompt file (None if it cannot be read)."""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read(max_bytes)
+    except OSError:
+        return None
+    text = data.decode('utf-8', errors='replace')
+    if not path.endswith(".json"):
+        return text
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return None
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, list):
+        return "\n".join(item for item in value if isinstance(item, str))
+    return value if isinstance(value, str) else None
+
+
+def read_texts(paths, max_bytes=MAX_FILE_BYTES):
+    """Texts of several files, skipping unreadable ones (one task per reader thread)."""
+    return [text for text in (read_text(path, max_bytes) for path in paths) if text is not None]
+
+
+def iter_batches(directory, batch_size=DEFAULT_BATCH_FILES):
+    """Yield the directory's file paths in batches as they are listed (nothing if it does not exist).
+
+    The listing is never sorted or held whole; counts do not depend on the
+    order, except which phrases survive pruning on very long tails.
+    """
+    try:
+        entries = os.scandir(directory)
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    with entries:
+        batch = []
+        for entry in entries:
+            if entry.is_file():
+                batch.append(entry.path)
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+    if batch:
+        yield batch
+
+
+class PhraseCounter:
+    """Phrase counts in bounded memory (the rarest are pruned beyond 2 * capacity)."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.counts = Counter()
+        self.pruned = False
+
+    def update(self, counts):
+        self.counts.update(counts)
+        if len(self.counts) > 2 * self.capacity:
+            self.counts = Counter(dict(heapq.nsmallest(self.capacity, self.counts.items(), key=_order)))
+            self.pruned = True
+
+    def top(self, k):
+        """[(phrase, count)] of the k most frequent phrases, ties by phrase."""
+        return heapq.nsmallest(k, self.counts.items(), key=_order)
+
+
+class TokenTextSummarizer:
+    """Top phrases of the captions/ and prompts/ of projects in a local checkout."""
+
+    def __init__(self, dataset_path, top_k=DEFAULT_TOP_K, batch_size=DEFAULT_BATCH_FILES,
+                 capacity=DEFAULT_CAPACITY, max_workers=DEFAULT_READ_WORKERS,
+                 project_workers=DEFAULT_PROJECT_WORKERS):
+        """
+        Args:
+            dataset_path: NFT-Net checkout (or its NFT1000 directory)
+            top_k: Phrases to keep per directory
+            batch_size: Files read per batch (bounds the text in memory)
+            capacity: Phrases tracked per directory before pruning
+            max_workers: Concurrent file readers (shared by all projects)
+            project_workers: Projects summarized at once by annotate()
+        """
+        path = Path(dataset_path)
+        self.nft1000_path = path / "NFT1000" if (path / "NFT1000").is_dir() else path
+        if not self.nft1000_path.is_dir():
+            raise ValueError(f"{dataset_path} is not a directory containing NFT1000/")
+        self.top_k = top_k
+        self.batch_size = batch_size
+        self.capacity = capacity
+        self.max_workers = max_workers
+        self.project_workers = project_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.files_read = 0
+        self._lock = threading.Lock()
+
+    def iter_texts(self, directory):
+        """Yield the texts of a directory's files, one batch at a time."""
+        for batch in iter_batches(directory, self.batch_size):
+            # One slice per reader rather than one task per (tiny) file
+            step = -(-len(batch) // self.max_workers)
+            slices = [batch[i:i + step] for i in range(0, len(batch), step)]
+            yield [text for texts in self.executor.map(read_texts, slices) for text in texts]
+
+    def summarize_directory(self, directory):
+        """{"files": n, "phrases": [[phrase, count], ...]}, or None for a missing/empty directory."""
+        counter = PhraseCounter(self.capacity)
+        files = 0
+        for texts in self.iter_texts(directory):
+            batch_counts = Counter()
+            for text in texts:
+                batch_counts.update(phrases(text))
+            counter.update(batch_counts)
+            files += len(texts)
+        if not files:
+            return None
+        with self._lock:
+            self.files_read += files
+        result = {"files": files, "phrases": [[phrase, count] for phrase, count in counter.top(self.top_k)]}
+        if counter.pruned:
+            result["approximate"] = True
+        return result
+
+    def summarize(self, project):
+        """{"captions": ..., "prompts": ...} for one project (only directories that have text)."""
+        summary = {}
+        for name in TEXT_DIRS:
+            result = self.summarize_directory(os.path.join(self.nft1000_path, project, name))
+            if result is not None:
+                summary[name] = result
+        return summary
+
+    def annotate(self, items, metrics=None):
+        """
+        Yield records in order, each with its project's summary as "token_text".
+
+        Up to project_workers projects are summarized at once while records
+        keep arriving, so the summaries overlap the fetch instead of holding
+        up every record in turn.
+
+        Args:
+            items: Records with a project_name, e.g. from iter_descriptions()
+            metrics: RunMetrics timing each summary as a token_text stage
+        """
+        def summarize(item):
+            if metrics is None:
+                return self.summarize(item["project_name"])
+            with metrics.stage("token_text"):
+                return self.summarize(item["project_name"])
+
+        def finish(item, future):
+            if future is not None:
+                item["token_text"] = future.result()
+            return item
+
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.project_workers) as executor:
+            for item in items:
+                # Records carried over from an earlier run keep their summary
+                future = None if "token_text" in item else executor.submit(summarize, item)
+                pending.append((item, future))
+                # Hand on finished records at once; wait only when the window is full
+                while pending and (pending[0][1] is None or pending[0][1].done()
+                                   or len(pending) > 2 * self.project_workers):
+                    yield finish(*pending.popleft())
+            while pending:
+                yield finish(*pending.popleft())
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
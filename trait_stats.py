@@ -0,0 +1,422 @@
+"""
+Trait frequency and rarity tables from the per-token metadata/ files.
+
+Every NFT1000 project in a local NFT-Net checkout has a metadata/ directory
+with one JSON file per token, listing its traits as
+``"attributes": [{"trait_type": "Fur", "value": "Golden"}, ...]``. That is
+millions of small files across the dataset, so TraitAggregator scans them
+once and keeps the counts in a store that later runs only read:
+
+1. the files of each stale project are listed with os.scandir, sorted and
+   handed to a process pool in chunks of chunk_files; each worker parses its
+   chunk and returns (trait, value) counts, so JSON parsing runs on every core
+2. the chunk counts are merged per project and written to the store
+   (trait_stats.bin): a JSON header with each project's token count and the
+   mtime of its metadata/ directory, an interned string table (every trait
+   name and value is stored once) and one array of (trait id, value id,
+   count) uint32 rows, ordered by project
+3. the store is opened with numpy.memmap, so a repeat query reads the header
+   and the rows it needs instead of the files; a project is rescanned only
+   when its metadata/ directory changed (a file added, removed or replaced)
+
+A value's rarity is the share of the project's tokens that have it. The
+fetch scripts add per-project figures to collection_metadata.txt
+(--trait-stats) and ``python trait_stats.py show PROJECT`` prints a full
+table. NumPy is imported when the store is read or written, not with the
+module.
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import Counter, deque
+from pathlib import Path
+
+from metadata_parser import parse_metadata
+from token_text import iter_batches
+
+
+DEFAULT_STORE_PATH = "trait_stats.bin"
+DEFAULT_CHUNK_FILES = 2000
+DEFAULT_TOP_K = 20
+MAGIC = b"NFTTRAIT"
+VERSION = 1
+ROW_DTYPE = [("trait", "<u4"), ("value", "<u4"), ("count", "<u4")]
+ROW_BYTES = 12
+
+
+def _align(n):
+    return -(-n // 8) * 8
+
+
+def _text(value):
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+
+def token_traits(metadata):
+    """{trait: value} of one token's metadata (attributes list or dict; "traits" also accepted)."""
+    attributes = metadata.get("attributes", metadata.get("traits")) if isinstance(metadata, dict) else None
+    if isinstance(attributes, dict):
+        return {_text(trait): _text(value) for trait, value in attributes.items() if value is not None}
+    traits = {}
+    if isinstance(attributes, list):
+        for attribute in attributes:
+            if not isinstance(attribute, dict):
+                continue
+            trait = attribute.get("trait_type")
+            value = attribute.get("value")
+            if trait is not None and value is not None:
+                traits[_text(trait)] = _text(value)
+    return traits
+
+
+def count_traits(paths):
+    """
+    Count the traits of a chunk of token files (runs in a worker process).
+
+    Returns:
+        (tokens, unreadable, Counter of (trait, value), Counter of traits per token);
+        files that are not a JSON object count as unreadable
+    """
+    pairs = Counter()
+    per_token = Counter()
+    tokens = unreadable = 0
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                metadata = parse_metadata(f.read())
+        except (OSError, ValueError):
+            unreadable += 1
+            continue
+        if not isinstance(metadata, dict):
+            # An array or scalar document is not token metadata
+            unreadable += 1
+            continue
+        traits = token_traits(metadata)
+        pairs.update(traits.items())
+        per_token[len(traits)] += 1
+        tokens += 1
+    return tokens, unreadable, pairs, per_token
+
+
+class TraitStore:
+    """Read-only, memory-mapped view of a trait_stats.bin file."""
+
+    def __init__(self, path):
+        import numpy as np
+
+        self.path = path
+        with open(path, 'rb') as f:
+            prefix = f.read(16)
+            if len(prefix) < 16 or prefix[:8] != MAGIC:
+                raise ValueError(f"{path} is not a trait statistics file")
+            length = int.from_bytes(prefix[8:], 'little')
+            header = json.loads(f.read(length))
+        if header.get("version") != VERSION:
+            raise ValueError(f"{path} has version {header.get('version')}, expected {VERSION}")
+        self.projects = header["projects"]
+        start = 16 + length
+        strings, blob_bytes, rows = header["strings"], header["blob_bytes"], header["rows"]
+        data = np.memmap(path, dtype=np.uint8, mode='r')
+        self.offsets = data[start:start + 8 * (strings + 1)].view('<i8')
+        start += 8 * (strings + 1)
+        self.blob = data[start:start + blob_bytes]
+        start = _align(start + blob_bytes)
+        self.rows = data[start:start + ROW_BYTES * rows].view(ROW_DTYPE)
+
+    def __contains__(self, project):
+        return project in self.projects
+
+    def string(self, index):
+        return bytes(self.blob[self.offsets[index]:self.offsets[index + 1]]).decode('utf-8')
+
+    def strings(self):
+        """The whole string table, in id order."""
+        blob = bytes(self.blob)
+        offsets = self.offsets.tolist()
+        return [blob[a:b].decode('utf-8') for a, b in zip(offsets, offsets[1:])]
+
+    def project_rows(self, project):
+        """The project's (trait, value, count) rows, by trait name and then descending count."""
+        start, stop = self.projects[project]["rows"]
+        return self.rows[start:stop]
+
+    def table(self, project):
+        """[(trait, value, count, share of tokens)] for one project."""
+        tokens = self.projects[project]["tokens"]
+        return [(self.string(trait), self.string(value), count, count / tokens)
+                for trait, value, count in self.project_rows(project).tolist()]
+
+    def rarest(self, project, k=DEFAULT_TOP_K):
+        """The k rarest [(trait, value, count, share)] of a project."""
+        import numpy as np
+
+        rows = self.project_rows(project)
+        tokens = self.projects[project]["tokens"]
+        order = np.argsort(rows["count"], kind="stable")[:k]
+        return [(self.string(trait), self.string(value), count, count / tokens)
+                for trait, value, count in rows[order].tolist()]
+
+    def figures(self, project):
+        """Summary figures of one project: tokens, traits, values and its rarest value."""
+        import numpy as np
+
+        info = self.projects[project]
+        rows = self.project_rows(project)
+        figures = {"tokens": info["tokens"], "unreadable": info["unreadable"],
+                   "traits": int(len(np.unique(rows["trait"]))), "values": int(len(rows))}
+        if len(rows):
+            figures["rarest"] = list(self.rarest(project, 1)[0][:3])
+        return figures
+
+
+def read_store(path=DEFAULT_STORE_PATH):
+    """The store at path, or None if there is none (or it is unreadable)."""
+    try:
+        return TraitStore(path)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_store(path, strings, projects):
+    """
+    Write a store atomically.
+
+    Args:
+        path: Store file
+        strings: String table (trait names and values, indexed by the row ids)
+        projects: {project: (info, rows)} - info is the header entry without
+            "rows", rows a ROW_DTYPE array
+    """
+    import numpy as np
+
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+    offsets[1:] = np.cumsum(np.fromiter(map(len, encoded), dtype='<i8', count=len(encoded)))
+    header_projects = {}
+    position = 0
+    for project, (info, rows) in projects.items():
+        header_projects[project] = dict(info, rows=[position, position + len(rows)])
+        position += len(rows)
+    header = json.dumps({"version": VERSION, "strings": len(encoded), "blob_bytes": int(offsets[-1]),
+                         "rows": position, "projects": header_projects}, ensure_ascii=False).encode('utf-8')
+    header += b" " * (_align(16 + len(header)) - 16 - len(header))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC + len(header).to_bytes(8, 'little') + header)
+        f.write(offsets.tobytes())
+        blob = b"".join(encoded)
+        f.write(blob + b"\0" * (_align(len(blob)) - len(blob)))
+        for _, rows in projects.values():
+            f.write(np.ascontiguousarray(rows, dtype=ROW_DTYPE).tobytes())
+    os.replace(tmp_path, path)
+
+
+class TraitAggregator:
+    """Keep the trait store of a local checkout up to date and summarize projects from it."""
+
+    def __init__(self, dataset_path, store_path=DEFAULT_STORE_PATH, max_workers=None,
+                 chunk_files=DEFAULT_CHUNK_FILES):
+        """
+        Args:
+            dataset_path: NFT-Net checkout (or its NFT1000 directory)
+            store_path: Trait statistics file, created or updated as needed
+            max_workers: Worker processes (default: one per CPU)
+            chunk_files: Token files parsed per task
+        """
+        path = Path(dataset_path)
+        self.nft1000_path = path / "NFT1000" if (path / "NFT1000").is_dir() else path
+        if not self.nft1000_path.is_dir():
+            raise ValueError(f"{dataset_path} is not a directory containing NFT1000/")
+        self.store_path = store_path
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_files = chunk_files
+        self.scanned = 0
+        self.files_read = 0
+        self.scan_seconds = 0.0
+
+    def metadata_dir(self, project):
+        return os.path.join(self.nft1000_path, project, "metadata")
+
+    def signature(self, project):
+        """mtime of the project's metadata/ directory (None if it has none)."""
+        try:
+            return os.stat(self.metadata_dir(project)).st_mtime_ns
+        except OSError:
+            return None
+
+    def scan(self, projects):
+        """{project: count_traits() totals} for projects, parsed in a process pool."""
+        from concurrent.futures import ProcessPoolExecutor
+
+        results = {project: [0, 0, Counter(), Counter()] for project in projects}
+
+        def merge(project, future):
+            tokens, unreadable, pairs, per_token = future.result()
+            totals = results[project]
+            totals[0] += tokens
+            totals[1] += unreadable
+            totals[2].update(pairs)
+            totals[3].update(per_token)
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            # A bounded window of chunks in flight, so the file lists never pile up
+            pending = deque()
+            for project in projects:
+                for paths in iter_batches(self.metadata_dir(project), self.chunk_files):
+                    pending.append((project, executor.submit(count_traits, paths)))
+                    if len(pending) >= 2 * self.max_workers:
+                        merge(*pending.popleft())
+            while pending:
+                merge(*pending.popleft())
+        self.scan_seconds += time.perf_counter() - start
+        self.scanned += len(projects)
+        self.files_read += sum(tokens + unreadable for tokens, unreadable, _, _ in results.values())
+        return results
+
+    def update(self, projects, force=False):
+        """
+        Bring the store up to date for projects, rescanning only what changed.
+
+        Projects already in the store and not asked for are kept as they are.
+
+        Returns:
+            The (re)opened TraitStore
+        """
+        import numpy as np
+
+        store = read_store(self.store_path)
+        known = store.projects if store is not None else {}
+        signatures = {project: self.signature(project) for project in projects}
+        stale = [project for project in projects
+                 if force or project not in known or known[project]["signature"] != signatures[project]]
+        if not stale:
+            return store
+
+        results = self.scan(stale)
+        strings = store.strings() if store is not None else []
+        ids = {string: index for index, string in enumerate(strings)}
+
+        def intern(string):
+            index = ids.get(string)
+            if index is None:
+                index = ids[string] = len(strings)
+                strings.append(string)
+            return index
+
+        entries = {project: ({key: value for key, value in info.items() if key != "rows"},
+                             np.array(store.project_rows(project)))
+                   for project, info in known.items() if project not in results}
+        for project, (tokens, unreadable, pairs, per_token) in results.items():
+            ordered = sorted(pairs.items(), key=lambda item: (item[0][0], -item[1], item[0][1]))
+            rows = np.array([(intern(trait), intern(value), count) for (trait, value), count in ordered],
+                            dtype=ROW_DTYPE)
+            entries[project] = ({"signature": signatures[project], "tokens": tokens, "unreadable": unreadable,
+                                 "traits_per_token": {str(k): n for k, n in sorted(per_token.items())}}, rows)
+        write_store(self.store_path, strings, dict(sorted(entries.items())))
+        return TraitStore(self.store_path)
+
+    def summary(self, projects):
+        """
+        Update the store and summarize projects from it.
+
+        Returns:
+            {"store", "scanned", "files", "seconds", "projects": {project: figures}}
+        """
+        start = time.perf_counter()
+        scanned, files = self.scanned, self.files_read
+        store = self.update(projects)
+        figures = {}
+        if store is not None:
+            figures = {project: store.figures(project) for project in projects if project in store}
+        return {"store": self.store_path, "scanned": self.scanned - scanned, "files": self.files_read - files,
+                "seconds": time.perf_counter() - start, "projects": figures}
+
+
+def format_trait_summary(summary):
+    """Lines of the TRAIT STATISTICS section of the metadata log."""
+    projects = summary["projects"]
+    cached = len(projects) - summary["scanned"]
+    lines = [f"Store: {summary['store']} ({summary['scanned']} projects scanned, {summary['files']:,} token "
+             f"files, {cached} read from the store; {summary['seconds']:.2f}s)"]
+    totals = [figures for figures in projects.values() if figures["tokens"]]
+    lines.append(f"Tokens: {sum(f['tokens'] for f in totals):,} in {len(totals)} projects, "
+                 f"{sum(f['values'] for f in totals):,} distinct trait values")
+    lines.append("")
+    for project, figures in projects.items():
+        if not figures["tokens"]:
+            continue
+        line = f"{project}: {figures['tokens']:,} tokens, {figures['traits']} traits, {figures['values']:,} values"
+        if "rarest" in figures:
+            trait, value, count = figures["rarest"]
+            line += f"; rarest {trait} = {value} ({count:,} tokens, {count / figures['tokens']:.2%})"
+        if figures["unreadable"]:
+            line += f"; {figures['unreadable']:,} unreadable files"
+        lines.append(line)
+    empty = [project for project, figures in projects.items() if not figures["tokens"]]
+    if empty:
+        lines.append(f"No token metadata: {', '.join(empty)}")
+    return lines
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Trait frequency and rarity tables from NFT1000 metadata/ files.")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH,
+                        help=f"trait statistics file (default {DEFAULT_STORE_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    scan = commands.add_parser("scan", help="scan a local checkout into the store")
+    scan.add_argument("dataset_path", help="NFT-Net checkout (containing NFT1000/)")
+    scan.add_argument("--projects", nargs="*", default=None,
+                      help="only these projects (default: every project in NFT1000/)")
+    scan.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    scan.add_argument("--chunk-files", type=int, default=DEFAULT_CHUNK_FILES,
+                      help=f"token files per task (default {DEFAULT_CHUNK_FILES})")
+    scan.add_argument("--force", action="store_true", help="rescan projects even if unchanged")
+    show = commands.add_parser("show", help="print a project's trait table from the store")
+    show.add_argument("project")
+    show.add_argument("--rarest", type=int, metavar="K", default=0,
+                      help="only the K rarest values instead of the full table")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Scan a checkout into the store, or show a project's table."""
+    args = parse_args(argv)
+    if args.command == "scan":
+        try:
+            aggregator = TraitAggregator(args.dataset_path, args.store, args.workers, args.chunk_files)
+        except ValueError as e:
+            print(f"✗ {e}")
+            return
+        projects = args.projects
+        if projects is None:
+            with os.scandir(aggregator.nft1000_path) as entries:
+                projects = sorted(entry.name for entry in entries if entry.is_dir())
+        store = aggregator.update(projects, force=args.force)
+        print(f"✓ {aggregator.scanned} of {len(projects)} projects scanned ({aggregator.files_read:,} files "
+              f"in {aggregator.scan_seconds:.2f}s); {len(store.projects) if store else 0} projects in {args.store}")
+        return
+
+    store = read_store(args.store)
+    if store is None or args.project not in store:
+        print(f"✗ {args.project} is not in {args.store} - run: python trait_stats.py scan <dataset_path>")
+        return
+    info = store.projects[args.project]
+    table = store.rarest(args.project, args.rarest) if args.rarest else store.table(args.project)
+    print(f"{'='*72}")
+    print(f"TRAITS: {args.project} ({info['tokens']:,} tokens)")
+    print(f"{'='*72}")
+    print(f"{'Trait':24s} {'Value':28s} {'Tokens':>9s} {'Share':>8s}")
+    print("-" * 72)
+    for trait, value, count, share in table:
+        print(f"{trait[:24]:24s} {value[:28]:28s} {count:9,d} {share:8.2%}")
+    per_token = ", ".join(f"{k}: {n:,}" for k, n in info["traits_per_token"].items())
+    print(f"\nTraits per token: {per_token}")
+
+
+if __name__ == "__main__":
+    main()